@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Benchmark the decoding of a synthetic task list of a large run: the transfer size with compression, the JSON
+decoders and the timestamp parsing.
+
+Usage: bench_decode.py [NUMBER_OF_TASKS]
+"""
+
+import sys
+import gzip
+import json
+import time
+import datetime
+
+from a01.models import Task
+from a01.models.run import parse_timestamp
+from a01.transport.codec import loads
+
+count = int(sys.argv[1]) if len(sys.argv) > 1 else 40000
+
+
+def make_task(index: int) -> dict:
+    identifier = f'azure.cli.command_modules.module{index % 50}.tests.latest.test_scenario.Test{index}.test_method'
+    return {
+        'id': index,
+        'run_id': 1,
+        'name': identifier,
+        'annotation': 'azure/cli',
+        'status': 'completed',
+        'result': 'Passed' if index % 10 else 'Failed',
+        'duration': index % 60000,
+        'settings': {
+            'ver': '1.0',
+            'execution': {'command': f'python -m pytest {identifier}'},
+            'classifier': {'identifier': identifier, 'type': 'Record'},
+        },
+        'result_details': {
+            'agent': f'pod-{index % 30}',
+            'a01.reserved.tasklogpath': f'https://storage.file.core.windows.net/k8slog/1/task_{index}.log',
+            'a01.reserved.taskrecordpath': f'https://storage.file.core.windows.net/k8slog/1/record_{index}.yaml',
+        },
+    }
+
+
+def measure(name: str, func, repeat: int = 3) -> None:
+    best = min(_timed(func) for _ in range(repeat))
+    print(f'{name:<40} {best * 1000:10.1f} ms')
+
+
+def _timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+body = json.dumps([make_task(i) for i in range(count)]).encode('utf-8')
+print(f'{count} tasks: {len(body) / 1024 / 1024:.1f} MB raw, '
+      f'{len(gzip.compress(body)) / 1024 / 1024:.1f} MB gzip\n')
+
+measure('json.loads', lambda: json.loads(body.decode('utf-8')))
+measure(f'{loads.__module__}.loads', lambda: loads(body.decode('utf-8')))
+measure('Task.from_dict', lambda: [Task.from_dict(each) for each in loads(body.decode('utf-8'))])
+
+stamps = [f'2018-03-{1 + i % 28:02d}T{i % 24:02d}:{i % 60:02d}:00Z' for i in range(count)]
+measure('datetime.strptime', lambda: [datetime.datetime.strptime(s, '%Y-%m-%dT%H:%M:%SZ') for s in stamps])
+measure('parse_timestamp', lambda: [parse_timestamp(s) for s in stamps])
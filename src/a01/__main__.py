@@ -1,5 +1,9 @@
+import sys
+
 import a01
 import a01.cli
+from a01.auth import AuthenticationError
+from a01.common import get_logger
 
 
 @a01.cli.cmd('version', desc='Print version information')
@@ -15,7 +19,11 @@ def main() -> None:
     parser = a01.cli.setup_commands()
 
     args = parser.parse_args()
-    args.func(args)
+    try:
+        args.func(args)
+    except AuthenticationError as err:
+        get_logger(__name__).error(str(err) or 'You need to login. Usage: a01 login.')
+        sys.exit(1)
 
 
 if __name__ == '__main__':
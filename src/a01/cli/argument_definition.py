@@ -36,6 +36,8 @@ class ArgumentDefinition(object):  # pylint: disable=too-few-public-methods
                 kwargs['nargs'] = '+' if self.positional else '*'
             elif annotation is int:
                 kwargs['type'] = int
+            elif annotation is float:
+                kwargs['type'] = float
             elif annotation is str:
                 kwargs['type'] = str
             else:
@@ -0,0 +1,105 @@
+from typing import List, AsyncIterator, Iterable, Tuple, Optional, Union
+
+from aiohttp import ClientError, TCPConnector
+
+from a01.auth import AuthSettings, AuthenticationError
+from a01.common import A01Config
+from a01.models import Run, Task
+from a01.operations import iter_runs_async, iter_run_tasks_async, query_tasks_async, iter_bounded, download_log_async
+from a01.transport import AsyncSession
+from a01.transport.codec import loads
+
+
+class A01ClientError(Exception):
+    pass
+
+
+class A01Client(object):
+    """The asynchronous client of the A01 task store for programmatic use. All the requests share one pooled session,
+    which is opened and closed by the async context manager. Errors are raised as A01ClientError.
+
+        async with A01Client() as client:
+            tasks = await client.get_tasks(['1', '2'])
+    """
+
+    def __init__(self, endpoint: str = None, concurrency: int = 8) -> None:
+        self.concurrency = concurrency
+        self._endpoint = endpoint
+        self._session = None  # type: AsyncSession
+
+    async def __aenter__(self) -> 'A01Client':
+        endpoint = self._endpoint
+        if not endpoint:
+            config = A01Config()
+            if 'endpoint' not in config:
+                raise A01ClientError('The endpoint is not configured. Run a01 login --endpoint <ENDPOINT>.')
+            endpoint = config.endpoint
+
+        if not AuthSettings().has_login:
+            raise A01ClientError('Credential is missing. Run a01 login.')
+
+        self._session = AsyncSession(endpoint_uri=f'https://{endpoint}/api',
+                                     connector=TCPConnector(limit=self.concurrency))
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self._session:
+            await self._session.close()
+            self._session = None
+
+    @property
+    def session(self) -> AsyncSession:
+        if not self._session:
+            raise A01ClientError('The client is not opened. Use it as an async context manager.')
+        return self._session
+
+    async def _get_json(self, path: str) -> Union[list, dict]:
+        try:
+            async with self.session.get(self.session.get_path(path), headers=self.session.get_headers()) as resp:
+                resp.raise_for_status()
+                return await resp.json(loads=loads)
+        except (ClientError, ValueError, AuthenticationError) as ex:
+            raise A01ClientError(f'Fail to get {path}: {ex}') from ex
+
+    async def get_run(self, run_id: str) -> Run:
+        return Run.from_dict(await self._get_json(f'run/{run_id}'))
+
+    async def get_task(self, task_id: str) -> Task:
+        return Task.from_dict(await self._get_json(f'task/{task_id}'))
+
+    async def get_tasks(self, ids: Iterable[str]) -> List[Task]:
+        """Returns the tasks in the order of the given ids."""
+        try:
+            return await query_tasks_async(list(ids), self.session, self.concurrency)
+        except (ClientError, ValueError, KeyError, AuthenticationError) as ex:
+            raise A01ClientError(f'Fail to get the tasks: {ex}') from ex
+
+    async def iter_runs(self, owner: str = None, page_size: int = 100) -> AsyncIterator[Run]:
+        """Iterate through the runs from the latest."""
+        try:
+            async for run in iter_runs_async(self.session, page_size=page_size, owner=owner):
+                yield run
+        except (ClientError, ValueError, AuthenticationError) as ex:
+            raise A01ClientError(f'Fail to list the runs: {ex}') from ex
+
+    async def iter_run_tasks(self, run_id: str) -> AsyncIterator[Task]:
+        try:
+            async for task in iter_run_tasks_async(run_id, self.session):
+                yield task
+        except (ClientError, ValueError, AuthenticationError) as ex:
+            raise A01ClientError(f'Fail to list the tasks of run {run_id}: {ex}') from ex
+
+    async def fetch_logs(self, tasks: Iterable[Task]) -> AsyncIterator[Tuple[Task, Optional[bytes]]]:
+        """Download the logs of the tasks concurrently. Yields the task and its log, or None if the log is not
+        available, as the downloads complete."""
+        async def _fetch(task: Task) -> Tuple[Task, Optional[bytes]]:
+            try:
+                return task, await download_log_async(task.log_resource_uri, self.session)
+            except ClientError as ex:
+                raise A01ClientError(f'Fail to download the log of task {task.id}: {ex}') from ex
+
+        async for result in iter_bounded((_fetch(task) for task in tasks), self.concurrency):
+            yield result
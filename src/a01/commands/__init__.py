@@ -7,3 +7,9 @@ from .repo_task import reproduce_task
 from .login import login
 from .logout import logout
 from .whoami import whoami
+from .logs import index_logs, query_logs
+from .export_run import export_run, export_tasks
+from .diff_runs import diff_runs
+from .dashboard import dashboard
+from .perf import perf_regressions
+from .bench import bench_store
@@ -0,0 +1,104 @@
+import sys
+import logging
+from typing import List
+
+from aiohttp import TCPConnector
+
+from a01.cli import cmd, arg
+from a01.operations import LoadGenerator, StepResult, LatencyHistogram, parse_mix, DEFAULT_MIX
+from a01.output import CommandOutput, SequentialOutput, TableOutput
+from a01.transport import AsyncSession
+
+
+def _format_ms(value: float) -> str:
+    return '--' if value is None else f'{value:.1f}'
+
+
+def _get_output(steps: List[StepResult]) -> CommandOutput:
+    output = SequentialOutput()
+    output.append(TableOutput([(f'{s.rate:g}', f'{s.throughput:.1f}', s.completed, s.error_count, s.dropped,
+                                _format_ms(s.latency.mean), _format_ms(s.latency.percentile(50)),
+                                _format_ms(s.latency.percentile(90)), _format_ms(s.latency.percentile(99)),
+                                _format_ms(s.latency.max), 'yes' if s.is_saturated() else 'no') for s in steps],
+                              headers=('Target(rps)', 'Achieved(rps)', 'Requests', 'Errors', 'Dropped', 'Mean(ms)',
+                                       'p50(ms)', 'p90(ms)', 'p99(ms)', 'Max(ms)', 'Saturated')))
+
+    saturated = next((s for s in steps if s.is_saturated()), None)
+    if saturated:
+        sustained = [s.rate for s in steps if s.rate < saturated.rate and not s.is_saturated()]
+        message = f'Saturated at {saturated.rate:g} requests/s'
+        if sustained:
+            message += f', sustained {max(sustained):g} requests/s'
+    else:
+        message = f'Not saturated up to {steps[-1].rate:g} requests/s'
+    output.append(TableOutput([(message,)], fmt='plain'))
+
+    total = LatencyHistogram()
+    workloads = {}
+    errors = {}
+    for step in steps:
+        total.merge(step.latency)
+        for name, histogram in step.workloads.items():
+            workloads.setdefault(name, LatencyHistogram()).merge(histogram)
+        for error, count in step.errors.items():
+            errors[error] = errors.get(error, 0) + count
+
+    output.append(TableOutput([(name, h.count, _format_ms(h.percentile(50)), _format_ms(h.percentile(90)),
+                                _format_ms(h.percentile(99)), _format_ms(h.max)) for name, h in workloads.items()],
+                              headers=('Workload', 'Requests', 'p50(ms)', 'p90(ms)', 'p99(ms)', 'Max(ms)')))
+    if errors:
+        output.append(TableOutput(sorted(errors.items(), key=lambda e: -e[1]), headers=('Error', 'Count')))
+    output.append(TableOutput(total.get_rows(), headers=('Latency(ms)', 'Requests', '')))
+    return output
+
+
+@cmd('bench store', desc='Generate read load on the task store at increasing request rates, mixing the requests of '
+                         'the CLI and the monitors, and report the latency, the throughput, the errors and the rate '
+                         'at which the store saturates. The load stops at the first saturated rate.')
+@arg('rates', help='The target request rates per second of the steps, comma separated. Default: 10,20,50,100.')
+@arg('duration', help='The seconds each step lasts. Default: 10.')
+@arg('mix', help='The weights of the workloads: runs (list runs), tasks (list the tasks of a run), task (get a task) '
+                 'and log (download a log). Default: runs=1,tasks=1,task=6,log=2.')
+@arg('max_inflight', option=['--max-inflight'],
+     help='The maximum number of outstanding requests. More requests are dropped and count as saturation. '
+          'Default: 200.')
+@arg('stub', help='Generate the load on a local stub task store instead of the configured one.')
+@arg('stub_capacity', option=['--stub-capacity'],
+     help='The number of requests the stub task store serves at the same time. Default: 8.')
+@arg('stub_latency', option=['--stub-latency'], help='The milliseconds the stub takes per request. Default: 5.')
+async def bench_store(rates: str = '10,20,50,100', duration: float = 10,  # pylint: disable=too-many-arguments
+                      mix: str = None, max_inflight: int = 200, stub: bool = False, stub_capacity: int = 8,
+                      stub_latency: float = 5) -> CommandOutput:
+    logger = logging.getLogger(__name__)
+
+    try:
+        step_rates = [float(each) for each in rates.split(',')]
+        if not step_rates or min(step_rates) <= 0:
+            raise ValueError('The rates must be positive.')
+        workloads = parse_mix(mix) if mix else DEFAULT_MIX
+
+        store = None
+        if stub:
+            from a01.operations.stub_store import StubStore
+            store = StubStore(capacity=stub_capacity, latency=stub_latency / 1000)
+            await store.start()
+
+        steps = []
+        try:
+            async with AsyncSession(endpoint_uri=store.endpoint if store else None, anonymous=bool(store),
+                                    connector=TCPConnector(limit=max_inflight)) as session:
+                generator = LoadGenerator(session, workloads, max_inflight)
+                await generator.discover()
+                for rate in step_rates:
+                    print(f'Generating {rate:g} requests/s for {duration}s ...', file=sys.stderr, flush=True)
+                    steps.append(await generator.run_step(rate, duration))
+                    if steps[-1].is_saturated():
+                        break
+        finally:
+            if store:
+                await store.stop()
+    except ValueError as err:
+        logger.error(err)
+        sys.exit(1)
+
+    return _get_output(steps)
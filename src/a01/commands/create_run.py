@@ -1,14 +1,160 @@
+import re
 import sys
+import asyncio
 import logging
+import statistics
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Tuple, Optional, Pattern
+
+import yaml
+import docker
+import docker.errors
+from aiohttp import ClientError
 
 import a01
 from a01.models import Run
 from a01.cli import arg, cmd
-from a01.auth import AuthSettings
+from a01.auth import AuthSettings, AuthenticationError
+from a01.operations import wait_run, expand_matrix, post_runs, ImageCache, query_image_durations_async
+from a01.output import ProgressBar, output_in_table
+from a01.output.progress_output import format_duration
+from a01.transport import AsyncSession
+from a01.commands.repo_task import ensure_image, get_test_index
+
+MATRIX_KEYS = ('image', 'mode', 'query', 'exclude', 'live', 'secret', 'parallelism', 'remark')
+
+
+def build_run_model(auth: AuthSettings, image: str, from_failures: str = None, live: bool = False,
+                    parallelism: int = 3, query: str = None, remark: str = '', email: bool = False,
+                    secret: str = None, mode: str = None, exclude: str = None, agent: str = 'latest') -> Run:
+    remark = remark or ''
+    creator = auth.get_user_name()
+    agent = agent.replace('.', '-')
+
+    reg, image_name = image.split('/', 1)
+    reg = reg.split('.')[0]
+
+    return Run(name=f'Run of {image_name} from {reg}',
+               settings={
+                   'a01.reserved.imagename': image,
+                   'a01.reserved.imagepullsecret': 'azureclidev-registry',
+                   'a01.reserved.secret': secret,
+                   'a01.reserved.storageshare': 'k8slog',
+                   'a01.reserved.testquery': query,
+                   'a01.reserved.testexcludequery': exclude,
+                   'a01.reserved.remark': remark,
+                   'a01.reserved.useremail': auth.user_id if email else '',
+                   'a01.reserved.initparallelism': parallelism,
+                   'a01.reserved.livemode': str(live),
+                   'a01.reserved.testmode': mode,
+                   'a01.reserved.fromrunfailure': from_failures,
+                   'a01.reserved.agentver': agent,
+               },
+               details={
+                   'a01.reserved.creator': creator,
+                   'a01.reserved.client': f'CLI {a01.__version__}'
+               },
+               owner=creator,
+               status='Initialized')
+
 
+def load_matrix(path: str) -> list:
+    """Load a run matrix from a YAML or JSON file."""
+    try:
+        with open(path, 'r') as matrix_file:
+            entries = expand_matrix(yaml.safe_load(matrix_file))
+    except (IOError, yaml.YAMLError) as ex:
+        raise ValueError(f'Fail to load the run matrix {path}: {ex}')
+
+    for entry in entries:
+        unknown = set(entry) - set(MATRIX_KEYS)
+        if unknown:
+            raise ValueError(f'Unknown keys in the run matrix: {", ".join(sorted(unknown))}. '
+                             f'Supported keys: {", ".join(MATRIX_KEYS)}.')
+        if 'image' not in entry:
+            raise ValueError(f'Missing image in the run matrix entry {entry}.')
+    return entries
+
+
+def _compile(pattern: str) -> Optional[Pattern]:
+    try:
+        return re.compile(pattern) if pattern else None
+    except re.error as ex:
+        raise ValueError(f'Invalid regular expression {pattern!r}: {ex}')
+
+
+def _get_test_index(client: docker.DockerClient, image: str, cache: ImageCache) -> List[str]:
+    try:
+        ensure_image(client, image)
+        return get_test_index(client, image, cache)
+    except (docker.errors.DockerException, ValueError, KeyError, TypeError) as ex:
+        raise ValueError(f'Fail to get the test index of {image}: {ex}')
+
+
+async def _query_durations_async(image: str, session: AsyncSession) -> Dict[str, float]:
+    try:
+        return await query_image_durations_async(image, session)
+    except (ClientError, ValueError, AuthenticationError) as ex:
+        logging.getLogger(__name__).warning(f'Fail to get the durations of the tests of {image}: {ex}')
+        return {}
 
-@cmd('create run', desc='Create a new run.')
-@arg('image', help='The droid image to run.', positional=True)
+
+async def _query_previews_async(images: List[str]) -> Tuple[List[List[str]], List[Dict[str, float]]]:
+    """Returns the test indexes and the test durations of the images. The images are pulled and indexed in threads
+    at the same time, while the durations are queried through one session."""
+    try:
+        client = docker.from_env()
+    except docker.errors.DockerException as ex:
+        raise ValueError(f'Fail to connect to Docker: {ex}')
+    cache = ImageCache()
+
+    loop = asyncio.get_event_loop()
+    with ThreadPoolExecutor(max_workers=min(len(images), 4) or 1) as executor:
+        indexes = asyncio.gather(*[loop.run_in_executor(executor, _get_test_index, client, image, cache)
+                                   for image in images])
+        async with AsyncSession() as session:
+            durations = await asyncio.gather(*[_query_durations_async(image, session) for image in images])
+        return await indexes, durations
+
+
+def preview_runs(run_models: List[Run]) -> List[Tuple]:
+    """Match the test index of the images with the query and the exclude regexes of the runs, anchored at the start
+    of the identifiers like get run --query, and estimate the runtimes with the durations of the tests in the latest
+    runs of the images. Tests without a known duration are assumed to take the median of the known ones."""
+    patterns = [(model.settings.get('a01.reserved.testquery', None),
+                 model.settings.get('a01.reserved.testexcludequery', None)) for model in run_models]
+    regexes = [(_compile(query), _compile(exclude)) for query, exclude in patterns]
+
+    images = list(OrderedDict.fromkeys(model.image for model in run_models))
+    indexes, durations = asyncio.get_event_loop().run_until_complete(_query_previews_async(images))
+    indexes, durations = dict(zip(images, indexes)), dict(zip(images, durations))
+
+    rows = []
+    for model, (query, exclude), (query_regex, exclude_regex) in zip(run_models, patterns, regexes):
+        image = model.image
+        matched = [identifier for identifier in indexes[image]
+                   if (not query_regex or query_regex.match(identifier)) and
+                   not (exclude_regex and exclude_regex.match(identifier))]
+
+        known = [durations[image][identifier] for identifier in matched if identifier in durations[image]]
+        estimate = None
+        if known:
+            total = sum(known) + statistics.median(known) * (len(matched) - len(known))
+            parallelism = max(int(model.settings.get('a01.reserved.initparallelism', 1)), 1)
+            estimate = max(total / parallelism, max(known)) / 1000
+
+        rows.append((image, query or '', exclude or '', f'{len(matched)}/{len(indexes[image])}',
+                     f'{len(known)}/{len(matched)}', format_duration(estimate)))
+    return rows
+
+
+@cmd('create run', desc='Create new runs. Multiple images, or a matrix file, create multiple runs at once.')
+@arg('image', help='The droid images to run. A run is created for each image.', positional=True, nargs='*')
+@arg('matrix', help='A YAML or JSON file of the runs to create. It is a mapping of the settings (image, mode, query, '
+                    'exclude, live, secret, parallelism and remark) to a value or a list of values. A run is created '
+                    'for each combination of the values. It can also be a list of such mappings. The options in the '
+                    'command line apply to the settings not specified in the file.')
 @arg('parallelism', option=('-p', '--parallelism'),
      help='The number of job to run in parallel. Can be scaled later through kubectl.')
 @arg('from_failures', option=['--from-failures'], help='Create the run base on the failed tasks of another run')
@@ -22,47 +168,81 @@ from a01.auth import AuthSettings
 @arg('email', help='Send an email to you after the job finishes.')
 @arg('secret', help='The name of the secret to be used. Default to the image\'s a01.product label.')
 @arg('agent', help='The version of the agent to be used. Default to latest.')
+@arg('retries', help='The number of times to retry creating a run when the task store is unreachable or answers 429 or '
+                    '503. Default: 2.')
+@arg('wait', help='Follow the run and show its progress till all the tasks complete. The command exits with 0 if all '
+                  'the tasks pass, or 2 if any task fails. Only applies when a single run is created.')
+@arg('fail_fast', option=['--fail-fast'], help='With --wait, stop waiting as soon as the given number of tasks fail.')
+@arg('timeout', help='With --wait, stop waiting after the given number of seconds and exit with 3.')
+@arg('preview', help='Show the number of tests the query and the exclude regexes select from the test index of each '
+                     'image, and the estimated runtime, without creating the runs. The test index is extracted from '
+                     'the image with Docker once per image digest and cached. The runtime is estimated with the test '
+                     'durations of the latest runs of the image. The regexes are evaluated with Python, whose syntax '
+                     'is mostly compatible with the droid\'s.')
 # pylint: disable=too-many-arguments, too-many-locals
-def create_run(image: str, from_failures: str = None, live: bool = False, parallelism: int = 3, query: str = None,
-               remark: str = '', email: bool = False, secret: str = None, mode: str = None, exclude: str = None,
-               agent: str = 'latest') -> None:
+def create_run(image: [str] = None, matrix: str = None, from_failures: str = None, live: bool = False,
+               parallelism: int = 3, query: str = None, remark: str = '', email: bool = False, secret: str = None,
+               mode: str = None, exclude: str = None, agent: str = 'latest', retries: int = 2, wait: bool = False,
+               fail_fast: int = None, timeout: float = None, preview: bool = False) -> None:
+    logger = logging.getLogger(__name__)
     auth = AuthSettings()
-    remark = remark or ''
-    creator = auth.get_user_name()
-    agent = agent.replace('.', '-')
-
-    reg, image_name = image.split('/', 1)
-    reg = reg.split('.')[0]
 
     try:
-        run_model = Run(name=f'Run of {image_name} from {reg}',
-                        settings={
-                            'a01.reserved.imagename': image,
-                            'a01.reserved.imagepullsecret': 'azureclidev-registry',
-                            'a01.reserved.secret': secret,
-                            'a01.reserved.storageshare': 'k8slog',
-                            'a01.reserved.testquery': query,
-                            'a01.reserved.testexcludequery': exclude,
-                            'a01.reserved.remark': remark,
-                            'a01.reserved.useremail': auth.user_id if email else '',
-                            'a01.reserved.initparallelism': parallelism,
-                            'a01.reserved.livemode': str(live),
-                            'a01.reserved.testmode': mode,
-                            'a01.reserved.fromrunfailure': from_failures,
-                            'a01.reserved.agentver': agent,
-                        },
-                        details={
-                            'a01.reserved.creator': creator,
-                            'a01.reserved.client': f'CLI {a01.__version__}'
-                        },
-                        owner=creator,
-                        status='Initialized')
-
-        run = run_model.post()
-        print(f'Published run {run.id}')
+        defaults = {'live': live, 'parallelism': parallelism, 'query': query, 'remark': remark, 'secret': secret,
+                    'mode': mode, 'exclude': exclude}
+        entries = [{'image': each} for each in image or []]
+        if matrix:
+            entries.extend(load_matrix(matrix))
+        if not entries:
+            raise ValueError('Specify at least one image or a matrix file.')
+        if wait and len(entries) > 1:
+            raise ValueError('--wait is only supported when a single run is created.')
+        if preview and from_failures:
+            raise ValueError('--preview is not supported with --from-failures.')
+        if timeout is not None and timeout <= 0:
+            raise ValueError('--timeout must be positive.')
+        if retries < 0:
+            raise ValueError('--retries must not be negative.')
+
+        run_models = [build_run_model(auth, from_failures=from_failures, email=email, agent=agent,
+                                      **dict(defaults, **entry)) for entry in entries]
+
+        if preview:
+            output_in_table(preview_runs(run_models),
+                            headers=('Image', 'Query', 'Exclude', 'Matched', 'Known Durations', 'Estimated Runtime'))
+            sys.exit(0)
+        results = post_runs(run_models, retries=retries)
+
+        if len(results) == 1:
+            _, run, error = results[0]
+            if not run:
+                raise ValueError(f'Failed to create run in the task store: {error}')
+            print(f'Published run {run.id}')
+        else:
+            output_in_table([(run.id if run else 'N/A', model.image, model.settings.get('a01.reserved.testmode', ''),
+                              model.settings.get('a01.reserved.testquery', ''), error or 'Published')
+                             for model, run, error in results],
+                            headers=('Id', 'Image', 'Mode', 'Query', 'Status'))
+
+        if any(run is None for _, run, _ in results):
+            sys.exit(1)
+
+        if wait:
+            progress_bar = ProgressBar()
+            try:
+                model, run, _ = results[0]
+                progress = wait_run(run.id, model.settings.get('a01.reserved.initparallelism', parallelism),
+                                    progress_bar.update, fail_fast, timeout)
+            except asyncio.TimeoutError:
+                progress = None
+            finally:
+                progress_bar.close()
+            if progress is None:
+                logger.error(f'Run {run.id} did not finish in {timeout:g} seconds.')
+                sys.exit(3)
+            sys.exit(0 if progress.succeeded else 2)
 
         sys.exit(0)
     except ValueError as ex:
-        logger = logging.getLogger(__name__)
         logger.error(ex)
         sys.exit(1)
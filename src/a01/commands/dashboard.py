@@ -0,0 +1,276 @@
+import sys
+import time
+import asyncio
+from collections import deque
+from typing import Deque, Tuple, List
+
+from aiohttp import ClientError
+
+from a01.cli import cmd, arg
+from a01.models import Run
+from a01.operations import TaskPoller, RunProgress, backoff_interval, MIN_POLL_INTERVAL, MAX_POLL_INTERVAL
+from a01.output.progress_output import format_duration
+from a01.transport import AsyncSession
+from a01.transport.events import EventStreamUnsupported
+
+THROUGHPUT_WINDOW = 600  # seconds
+
+
+class RunPanel(object):  # pylint: disable=too-many-instance-attributes
+    """Follows one run and renders its progress into a curses window. The window is only redrawn when the run
+    changes. A compact panel takes a single line."""
+
+    def __init__(self, run_id: str, max_failures: int) -> None:
+        self.run_id = run_id
+        self.max_failures = max_failures
+        self.run = None  # type: Run
+        self.poller = TaskPoller(run_id)
+        self.interval = MIN_POLL_INTERVAL
+        self.progress = None  # type: RunProgress
+        self.history = deque()  # type: Deque[Tuple[float, int]]
+        self.error = None
+        self.dirty = True
+        self.window = None
+        self.compact = False
+
+    @property
+    def height(self) -> int:
+        return 1 if self.compact else 4 + self.max_failures
+
+    @property
+    def throughput(self) -> float:
+        """The number of tasks completed per minute in the recent window."""
+        if len(self.history) < 2:
+            return 0
+        (start, start_count), (end, end_count) = self.history[0], self.history[-1]
+        return (end_count - start_count) * 60 / (end - start) if end > start else 0
+
+    async def follow(self, session: AsyncSession, delay: float) -> None:
+        """Follow the run by its event stream when the task store offers one, otherwise by polling. An authentication
+        failure is raised since no run can be followed without a login."""
+        await asyncio.sleep(delay)
+        subscribe = True
+        while True:
+            changed = False
+            try:
+                changed = await self.poller.poll(session)
+                # the run status is refreshed along since a canceled or failed run leaves its tasks unfinished
+                changed = await self._refresh_run(session) or changed
+                if self.error:
+                    self.error = None
+                    self.dirty = True
+            except (ClientError, ValueError, KeyError, TypeError) as ex:
+                # a failure is no progress, so the polls back off rather than hammer a failing task store
+                self.error = str(ex) or type(ex).__name__
+                self.dirty = True
+
+            self._update(changed)
+            if self.progress.is_finished:
+                return
+
+            if subscribe and not self.error:
+                followers = [asyncio.ensure_future(self._follow_events(session)),
+                             asyncio.ensure_future(self._follow_status(session))]
+                try:
+                    done, _ = await asyncio.wait(followers, return_when=asyncio.FIRST_COMPLETED)
+                    done.pop().result()
+                    if self.progress.is_finished:
+                        return
+                except EventStreamUnsupported:
+                    subscribe = False
+                except (ClientError, asyncio.TimeoutError) as ex:
+                    self.error = f'Subscription lost: {str(ex) or type(ex).__name__}'
+                    self.dirty = True
+                    subscribe = False
+                finally:
+                    for follower in followers:
+                        follower.cancel()
+                continue
+
+            self.interval = backoff_interval(self.interval, changed)
+            await asyncio.sleep(self.interval)
+
+    async def _refresh_run(self, session: AsyncSession) -> bool:
+        """Returns whether the run status changed."""
+        status = self.run.status if self.run else None
+        self.run = Run.from_dict(await session.get_json(f'run/{self.run_id}'))
+        return self.run.status != status
+
+    async def _follow_events(self, session: AsyncSession) -> None:
+        async for changed in self.poller.subscribe(session):
+            self._update(changed)
+            if self.progress.is_finished:
+                return
+
+    async def _follow_status(self, session: AsyncSession) -> None:
+        # the subscription only pushes the task changes, so the run status is polled at the longest interval
+        while not self.progress.is_finished:
+            await asyncio.sleep(MAX_POLL_INTERVAL)
+            try:
+                self._update(await self._refresh_run(session))
+            except (ClientError, ValueError, KeyError, TypeError):
+                pass  # the subscription goes on, the failure is reported by the next poll
+
+    def _update(self, changed: bool) -> None:
+        if not changed and self.progress:
+            return
+        parallelism = int(self.run.settings.get('a01.reserved.initparallelism', 1)) if self.run else 1
+        self.progress = RunProgress(self.poller.tasks, parallelism, self.run.status if self.run else None)
+        now = time.time()
+        self.history.append((now, self.progress.completed))
+        while len(self.history) > 2 and self.history[0][0] < now - THROUGHPUT_WINDOW:
+            self.history.popleft()
+        self.dirty = True
+
+    def render(self) -> None:
+        if not self.dirty or not self.window:
+            return
+        self.dirty = False
+
+        import curses
+        try:
+            if self.compact:
+                self._draw_line(self.window, curses.A_BOLD)
+            else:
+                self._draw(self.window, curses.A_BOLD)
+        except curses.error:
+            pass  # the terminal is too small
+        self.window.noutrefresh()
+
+    def _get_state(self) -> str:
+        progress = self.progress
+        eta = progress.eta
+        if self.throughput:
+            eta = (progress.total - progress.completed) * 60 / self.throughput
+        return 'finished' if progress.is_finished else f'ETA {format_duration(eta)}'
+
+    def _draw_line(self, window, bold: int) -> None:
+        width = window.getmaxyx()[1] - 1
+        window.erase()
+        title = f'Run {self.run_id} {self.run.name if self.run else ""}'
+        window.addnstr(0, 0, title, width, bold)
+        if self.error:
+            status = f'Error: {self.error}'
+        elif self.progress:
+            progress = self.progress
+            status = (f'{progress.completed}/{progress.total} | Pass: {progress.passed} | Fail: {progress.failed} | '
+                      f'Error: {progress.errors} | {self._get_state()}')
+        else:
+            return
+        if len(title) + 2 < width:
+            window.addnstr(0, len(title) + 2, status, width - len(title) - 2)
+
+    def _draw(self, window, bold: int) -> None:
+        width = window.getmaxyx()[1] - 1
+        window.erase()
+        name = self.run.name if self.run else ''
+        window.addnstr(0, 0, f'Run {self.run_id} {name}', width, bold)
+        if self.error:
+            window.addnstr(1, 0, f'Error: {self.error}', width, bold)
+
+        progress = self.progress
+        if progress:
+            state = self._get_state()
+            source = 'live' if self.poller.subscribed else f'polling every {self.interval:.0f}s'
+            window.addnstr(2, 0, f'{progress.completed}/{progress.total} completed | Pass: {progress.passed} | '
+                                 f'Fail: {progress.failed} | Error: {progress.errors} | '
+                                 f'{self.throughput:.1f} tasks/min | {state} | {source}', width)
+
+            failures = [t for t in self.poller.tasks if t.is_completed and t.result in ('Failed', 'Error')]
+            for line, task in enumerate(failures[:self.max_failures]):
+                window.addnstr(3 + line, 2, f'{task.id} {task.result} {task.identifier}', width - 2)
+            if len(failures) > self.max_failures:
+                window.addnstr(3 + self.max_failures, 2, f'... {len(failures) - self.max_failures} more', width - 2)
+
+
+def _layout(stdscr, panels: List[RunPanel], page: int) -> int:
+    """Give the panels on the page a window each. When the full panels don't fit in the terminal, every panel is
+    compacted to a line, and when the lines don't fit either the panels are paged with a footer telling how many runs
+    are hidden. Returns the number of pages."""
+    import curses
+    rows, columns = stdscr.getmaxyx()
+    compact = sum(4 + panel.max_failures for panel in panels) > rows
+    per_page = max(rows - 1, 1) if compact else len(panels)
+    pages = (len(panels) + per_page - 1) // per_page
+    page = min(page, pages - 1)
+
+    stdscr.erase()
+    top = 0
+    for index, panel in enumerate(panels):
+        panel.compact = compact
+        panel.window = None
+        if index // per_page == page:
+            panel.window = curses.newwin(panel.height, columns, top, 0)
+            panel.dirty = True
+            top += panel.height
+
+    if pages > 1:
+        first, last = page * per_page + 1, min((page + 1) * per_page, len(panels))
+        footer = (f'Runs {first}-{last} of {len(panels)}, {len(panels) - last + first - 1} hidden. '
+                  f'Press n or p for the next or the previous page, q to quit.')
+        try:
+            stdscr.addnstr(rows - 1, 0, footer, columns - 1, curses.A_REVERSE)
+        except curses.error:
+            pass  # the terminal is too small
+    stdscr.noutrefresh()
+    return pages
+
+
+@cmd('dashboard', desc='Watch the progress of runs live. When the runs don\'t fit in the terminal they are shown in a '
+                       'line each, and paged with n and p. Press q to quit.')
+@arg('run_ids', help='The ids of the runs to watch.', positional=True)
+@arg('failures', help='The maximum number of failed tasks listed for each run. Default: 5.')
+async def dashboard(run_ids: [str], failures: int = 5) -> None:
+    try:
+        import curses
+    except ImportError:
+        print('The dashboard requires the curses module.', file=sys.stderr)
+        sys.exit(1)
+
+    panels = [RunPanel(run_id, failures) for run_id in run_ids]
+
+    stdscr = curses.initscr()
+    try:
+        curses.noecho()
+        curses.cbreak()
+        curses.curs_set(0)
+        stdscr.nodelay(True)
+
+        page = 0
+        pages = _layout(stdscr, panels, page)
+
+        async with AsyncSession() as session:
+            # stagger the polls so the runs don't hit the task store at the same moment
+            followers = [asyncio.ensure_future(panel.follow(session, index * 5 / len(panels)))
+                         for index, panel in enumerate(panels)]
+            try:
+                while True:
+                    key = stdscr.getch()
+                    if key == ord('q'):
+                        break
+                    if key in (ord('n'), ord('p')) and pages > 1:
+                        page = (page + (1 if key == ord('n') else -1)) % pages
+                        _layout(stdscr, panels, page)
+                    elif key == curses.KEY_RESIZE:
+                        pages = _layout(stdscr, panels, page)
+                        page = min(page, pages - 1)
+
+                    for panel in panels:
+                        panel.render()
+                    curses.doupdate()
+
+                    # raised once the terminal is restored, e.g. an expired login is reported by the command line
+                    for follower in followers:
+                        if follower.done() and not follower.cancelled() and follower.exception():
+                            raise follower.exception()
+                    await asyncio.sleep(0.25)
+            finally:
+                for follower in followers:
+                    follower.cancel()
+                await asyncio.gather(*followers, return_exceptions=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        curses.nocbreak()
+        curses.echo()
+        curses.endwin()
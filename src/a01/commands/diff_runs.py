@@ -0,0 +1,63 @@
+import sys
+import asyncio
+import logging
+from typing import List
+
+from a01.cli import cmd, arg
+from a01.models import Task
+from a01.operations import RunDiff, iter_run_tasks_async
+from a01.output import CommandOutput, SequentialOutput, TableOutput, JsonOutput
+from a01.transport import AsyncSession
+
+
+async def query_run_tasks_async(run_id: str, session: AsyncSession) -> List[Task]:
+    return [task async for task in iter_run_tasks_async(run_id, session, brief=True)]
+
+
+@cmd('diff runs', desc='Compare the tasks of two runs. Reports the new failures, the fixes, the tests missing on '
+                       'either side and the tests became significantly slower.')
+@arg('base', help='The id of the base run, e.g. the last official run.', positional=True)
+@arg('head', help='The id of the run to be compared with the base.', positional=True)
+@arg('slower_ratio', option=['--slower-ratio'],
+     help='A test is reported as regressed when it is this many times slower than the base. Default: 1.5.')
+@arg('min_delta', option=['--min-delta'],
+     help='A test is reported as regressed only when it is slower by at least these milliseconds. Default: 10000.')
+@arg('output_format', option=('-o', '--output'), choices=('table', 'json'), help='The output format. Default: table.')
+async def diff_runs(base: str, head: str, slower_ratio: float = 1.5, min_delta: int = 10000,
+                    output_format: str = 'table') -> CommandOutput:
+    logger = logging.getLogger(__name__)
+
+    try:
+        async with AsyncSession() as session:
+            base_tasks, head_tasks = await asyncio.gather(query_run_tasks_async(base, session),
+                                                          query_run_tasks_async(head, session))
+    except ValueError as err:
+        logger.error(err)
+        sys.exit(1)
+
+    diff = RunDiff(base_tasks, head_tasks, slower_ratio=slower_ratio, min_delta=min_delta)
+
+    if output_format == 'json':
+        return JsonOutput(diff.to_dict())
+
+    output = SequentialOutput()
+    pair_headers = ('Identifier', 'Base Id', 'Base Result', 'Head Id', 'Head Result')
+    for title, pairs in (('New failures', diff.new_failures), ('Fixes', diff.fixes)):
+        output.append(TableOutput([(title, len(pairs))], fmt='plain'))
+        if pairs:
+            output.append(TableOutput([(h.identifier, b.id, b.result, h.id, h.result) for b, h in pairs],
+                                      headers=pair_headers))
+
+    output.append(TableOutput([('Duration regressions', len(diff.regressions))], fmt='plain'))
+    if diff.regressions:
+        output.append(TableOutput([(h.identifier, b.duration, h.duration, f'{h.duration / b.duration:.2f}x')
+                                   for b, h in diff.regressions],
+                                  headers=('Identifier', 'Base(ms)', 'Head(ms)', 'Ratio')))
+
+    for title, tasks in (('Missing in head', diff.missing_in_head), ('Missing in base', diff.missing_in_base)):
+        output.append(TableOutput([(title, len(tasks))], fmt='plain'))
+        if tasks:
+            output.append(TableOutput([(t.identifier, t.id, t.result) for t in tasks],
+                                      headers=('Identifier', 'Id', 'Result')))
+
+    return output
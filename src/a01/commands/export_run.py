@@ -0,0 +1,95 @@
+import sys
+import json
+import logging
+from typing import Tuple, Optional
+
+from a01.cli import cmd, arg
+from a01.models import Task, Run
+from a01.operations import (download_log_async, download_recording_content_async, get_recording_path, iter_bounded,
+                            iter_run_tasks_async, Archive, TaskTableWriter)
+from a01.transport import AsyncSession
+
+
+async def _download_task_files(task: Task, session: AsyncSession) -> Tuple[Task, Optional[bytes], Optional[bytes]]:
+    log = await download_log_async(task.log_resource_uri, session)
+    recording = await download_recording_content_async(task.record_resource_uri, session)
+    return task, log, recording
+
+
+@cmd('export run', desc='Export the logs and the recordings of all the tasks of a run into an archive, along with a '
+                        'manifest.json describing the run and its tasks.')
+@arg('run_id', help='The run id.', positional=True)
+@arg('to', help='The path of the archive. The format is decided by the extension: .zip, .tar, .tar.gz, .tgz, '
+                '.tar.bz2, .tar.xz or .tar.zst (requires the zstandard package).', required=True)
+@arg('concurrency', option=('-c', '--concurrency'), help='The number of tasks downloaded at the same time.')
+async def export_run(run_id: str, to: str, concurrency: int = 8) -> None:  # pylint: disable=invalid-name
+    logger = logging.getLogger(__name__)
+
+    try:
+        async with AsyncSession() as session:
+            run = Run.from_dict(await session.get_json(f'run/{run_id}'))
+            tasks = [task async for task in iter_run_tasks_async(run_id, session)]
+
+            manifest = []
+            with Archive(to) as archive:
+                async for task, log, recording in iter_bounded((_download_task_files(t, session) for t in tasks),
+                                                               concurrency):
+                    entry = {
+                        'id': task.id,
+                        'identifier': task.identifier,
+                        'status': task.status,
+                        'result': task.result,
+                        'agent': task.result_details.get('agent', None),
+                        'duration': task.duration,
+                        'log': None,
+                        'recording': None,
+                    }
+                    if log is not None:
+                        entry['log'] = f'logs/{task.identifier}.log'
+                        archive.add(entry['log'], log)
+                    if recording is not None:
+                        entry['recording'] = get_recording_path(task.identifier, az_mode=False).replace('\\', '/')
+                        archive.add(entry['recording'], recording)
+                    manifest.append(entry)
+
+                manifest.sort(key=lambda e: e['identifier'])
+                run_data = run.to_dict()
+                run_data['id'] = run.id
+                run_data['creation'] = run.creation.strftime('%Y-%m-%dT%H:%M:%SZ')
+                archive.add('manifest.json', json.dumps({'run': run_data, 'tasks': manifest}, indent=2).encode('utf-8'))
+
+            print(f'Exported {len(tasks)} tasks of run {run_id} to {to}')
+    except ValueError as err:
+        logger.error(err)
+        sys.exit(1)
+
+
+@cmd('export tasks', desc='Export the tasks of runs into a columnar file for analytics. Each row is a task along with '
+                          'its run. Requires the pyarrow package.')
+@arg('run_ids', help='The ids of the runs.', positional=True)
+@arg('to', help='The path of the file.', required=True)
+@arg('output_format', option=('-f', '--format'), choices=('parquet', 'arrow'),
+     help='The file format. The arrow format is the Arrow IPC stream. Default: parquet.')
+@arg('batch_size', option=('--batch-size',), help='The number of rows in each record batch. Default: 10000.')
+async def export_tasks(run_ids: [str], to: str, output_format: str = 'parquet',  # pylint: disable=invalid-name
+                       batch_size: int = 10000) -> None:
+    logger = logging.getLogger(__name__)
+    try:
+        from pyarrow import ArrowException
+    except ImportError:
+        # the writer reports the missing package
+        ArrowException = ValueError  # pylint: disable=invalid-name
+
+    try:
+        with TaskTableWriter(to, output_format, batch_size) as writer:
+            async with AsyncSession() as session:
+                # the runs are streamed one by one, so only a page of tasks and a record batch are held at a time
+                for run_id in run_ids:
+                    run = Run.from_dict(await session.get_json(f'run/{run_id}'))
+                    async for task in iter_run_tasks_async(run_id, session, brief=True):
+                        writer.add(run, task)
+
+        print(f'Exported {writer.rows} tasks of {len(run_ids)} run(s) to {to}')
+    except (ValueError, ArrowException) as err:
+        logger.error(err)
+        sys.exit(1)
@@ -1,12 +1,15 @@
 import sys
 import logging
 import re
+import itertools
 
 from a01.cli import cmd, arg
 from a01.output import (SequentialOutput, TaskBriefOutput, TaskLogOutput, JsonOutput, CommandOutput,
-                        TasksSummary, TasksOutput)
-from a01.models import Task, Run
-from a01.operations import download_recording_async, get_log_content_async
+                        TasksSummary, TasksOutput, TaskTreeOutput)
+from a01.models import Run
+from a01.operations import (download_recording_async, get_log_content_async, compile_filter, sort_tasks,
+                            query_run_summary_async, query_run_tasks_sorted_async, RunTaskCache, BlobStore,
+                            gather_bounded)
 from a01.transport import AsyncSession
 
 
@@ -16,29 +19,63 @@ from a01.transport import AsyncSession
 @arg('recording', option=('-r', '--recording'),
      help='Download the recording files in recording directory at current working directory. The recordings '
           'are flatten with the full test path as the file name if --az-mode is not specified. If --az-mode is '
-          'set, the recording files are arranged in directory structure mimic Azure CLI source code.')
+          'set, the recording files are arranged in directory structure mimic Azure CLI source code. The files are '
+          'copied from the local store ~/.a01/blobs, which skips downloading the recordings it already has.')
 @arg('include_success', option=['--include-success'], help='Include results of the succeed tasks.')
 @arg('recording_az_mode', option=['--az-mode'],
      help='When download the recording files the files are arranged in directory structure mimic Azure CLI '
           'source code.')
 @arg('query', help='Filter the tasks\'s identifiers. It is a regex.')
 @arg('raw', help='For debug.')
+@arg('group_by', option=['--group-by'],
+     help='Summarize the tasks in a tree of their identifiers with the pass, fail and error counts and the total '
+          'duration of each node. The value is module, class or depth=N, where N is the number of leading parts of '
+          'the identifier.')
+@arg('where', help='Filter the tasks with an expression, e.g. "result==\'Failed\' and duration>60000 and '
+                   'agent~\'pod-3\'". The fields are id, name, identifier, status, result, agent, duration and '
+                   'run_id. The operators are ==, !=, <, <=, >, >=, ~ (regex search), !~, and, or, not and '
+                   'parentheses. The matched tasks are listed whether they succeeded or not.')
+@arg('sort_by', option=['--sort-by'],
+     help='Sort the tasks by a field. Append :desc to the field to sort descending, e.g. --sort-by duration:desc.')
+@arg('limit', help='List only the first given number of tasks after sorting.')
+@arg('summary', help='Only show the number of tasks per status and per result.')
+@arg('link', help='With --recording, hardlink the recording files to the local store where the file system can\'t '
+                  'share the content of a copy, which saves the disk space. The linked files are read-only, since a '
+                  'change would alter the stored content.')
+# pylint: disable=too-many-locals
 async def get_run(run_id: str, log: bool = False, recording: bool = False, recording_az_mode: bool = False,
-                  include_success: bool = False, query: str = None, raw: bool = False) -> CommandOutput:
+                  include_success: bool = False, query: str = None, raw: bool = False, group_by: str = None,
+                  where: str = None, sort_by: str = None, limit: int = None, summary: bool = False,
+                  link: bool = False) -> CommandOutput:
     logger = logging.getLogger(__name__)
     output = SequentialOutput()
 
     try:
+        predicate = compile_filter(where) if where else None
         async with AsyncSession() as session:
-            tasks = [Task.from_dict(each) for each in await session.get_json(f'run/{run_id}/tasks')]
+            if summary and not (query or where):
+                statuses, results = await query_run_summary_async(run_id, session, RunTaskCache(session.endpoint))
+                return TasksSummary(statuses=statuses, results=results)
+
+            tasks = await query_run_tasks_sorted_async(run_id, session, brief=not (log or recording))
+
             if query:
                 regex = re.compile(query)
-                tasks = [each for each in tasks if regex.match(each.identifier)]
-            tasks = sorted(tasks, key=lambda t: t.identifier)
+                tasks = (each for each in tasks if regex.match(each.identifier))
+            if predicate:
+                tasks = (each for each in tasks if predicate(each))
+                include_success = True
+            if summary:
+                return TasksSummary(tasks)
+            if sort_by in (None, 'identifier', 'identifier:asc'):
+                # the tasks already arrive in this order
+                tasks = list(itertools.islice(tasks, limit))
+            else:
+                tasks = sort_tasks(tasks, sort_by, limit)
 
             tasks_output = TasksOutput(tasks, include_success)
 
-            output.append(tasks_output)
+            output.append(TaskTreeOutput(tasks, group_by) if group_by else tasks_output)
             output.append(TasksSummary(tasks))
 
             if log:
@@ -52,11 +89,10 @@ async def get_run(run_id: str, log: bool = False, recording: bool = False, recor
                 output.append(JsonOutput(run.to_dict()))
 
             if recording:
-                for task in tasks:
-                    await download_recording_async(task.record_resource_uri,
-                                                   task.identifier,
-                                                   recording_az_mode,
-                                                   session)
+                with BlobStore(link=link) as store:
+                    await gather_bounded(download_recording_async(task.record_resource_uri, task.identifier,
+                                                                  recording_az_mode, session, store)
+                                         for task in tasks)
 
             return output
     except ValueError as err:
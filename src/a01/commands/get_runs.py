@@ -1,10 +1,40 @@
 import logging
 import sys
+from typing import Dict, Tuple, Optional
+
+from aiohttp import ClientError
 
 from a01.auth import AuthSettings, AuthenticationError
 from a01.cli import cmd, arg
-from a01.operations import query_runs
+from a01.models import RunsView
+from a01.operations import query_runs_async, query_run_summary_async, iter_bounded, RunTaskCache
 from a01.output import output_in_table
+from a01.transport import AsyncSession
+
+
+async def _query_summaries_async(runs: RunsView, session: AsyncSession,
+                                 concurrency: int) -> Dict[str, Optional[Tuple[dict, dict]]]:
+    """Fetch the summaries of all the runs at the same time. The progress is reported on stderr as they arrive. A
+    summary failed to fetch is None."""
+    cache = RunTaskCache(session.endpoint)
+
+    async def _query(run_id: str) -> Tuple[str, Optional[Tuple[dict, dict]]]:
+        try:
+            return run_id, await query_run_summary_async(run_id, session, cache)
+        except (ClientError, ValueError) as ex:
+            logging.getLogger(__name__).info(f'Fail to summarize run {run_id}: {ex}')
+            return run_id, None
+
+    summaries = {}
+    interactive = sys.stderr.isatty()
+    async for run_id, summary in iter_bounded((_query(run.id) for run in runs.runs), concurrency):
+        summaries[run_id] = summary
+        if interactive:
+            sys.stderr.write(f'\rSummarized {len(summaries)}/{len(runs.runs)} runs')
+            sys.stderr.flush()
+    if interactive and summaries:
+        sys.stderr.write('\r\033[K')
+    return summaries
 
 
 @cmd('get runs', desc='Retrieve the runs.')
@@ -12,8 +42,11 @@ from a01.output import output_in_table
 @arg('me', help='Query runs created by me.')
 @arg('last', help='Returns the last NUMBER of records. Default: 20.')
 @arg('skip', help='Returns the records after skipping given number of records at the bottom. Default: 0.')
-def get_runs(me: bool = False, last: int = 20, skip: int = 0,  # pylint: disable=invalid-name
-             owner: str = None) -> None:
+@arg('summary', help='Include the task progress and the pass, fail and error counts of each run.')
+@arg('concurrency', option=('-c', '--concurrency'),
+     help='The number of runs summarized at the same time with --summary. Default: 20.')
+async def get_runs(me: bool = False, last: int = 20, skip: int = 0,  # pylint: disable=invalid-name
+                   owner: str = None, summary: bool = False, concurrency: int = 20) -> None:
     logger = logging.getLogger(__name__)
     try:
         if me and owner:
@@ -21,8 +54,10 @@ def get_runs(me: bool = False, last: int = 20, skip: int = 0,  # pylint: disable
         elif me:
             owner = AuthSettings().get_user_name()
 
-        runs = query_runs(owner=owner, last=last, skip=skip)
-        output_in_table(runs.get_table_view(), headers=runs.get_table_header())
+        async with AsyncSession() as session:
+            runs = await query_runs_async(session, owner=owner, last=last, skip=skip)
+            summaries = await _query_summaries_async(runs, session, concurrency) if summary else None
+        output_in_table(runs.get_table_view(summaries), headers=runs.get_table_header(summary))
     except ValueError as err:
         logger.error(err)
         sys.exit(1)
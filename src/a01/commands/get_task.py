@@ -1,7 +1,7 @@
 import a01.cli
 import a01.models
 from a01.output import TaskBriefOutput, TaskLogOutput, SequentialOutput, CommandOutput
-from a01.operations import query_tasks_async, download_recording_async, get_log_content_async
+from a01.operations import query_tasks_async, download_recording_async, get_log_content_async, BlobStore
 from a01.transport import AsyncSession
 
 
@@ -11,28 +11,40 @@ from a01.transport import AsyncSession
 @a01.cli.arg('recording', option=('-r', '--recording'),
              help='Download the recording files in recording directory at current working directory. The recordings '
                   'are flatten with the full test path as the file name if --az-mode is not specified. If --az-mode is '
-                  'set, the recording files are arranged in directory structure mimic Azure CLI source code.')
+                  'set, the recording files are arranged in directory structure mimic Azure CLI source code. The '
+                  'files are copied from the local store ~/.a01/blobs, which skips downloading the recordings it '
+                  'already has.')
 @a01.cli.arg('recording_az_mode', option=['--az-mode'],
              help='When download the recording files the files are arranged in directory structure mimic Azure CLI '
                   'source code.')
+@a01.cli.arg('link', help='With --recording, hardlink the recording files to the local store where the file system '
+                          'can\'t share the content of a copy, which saves the disk space. The linked files are '
+                          'read-only, since a change would alter the stored content.')
 async def get_task(ids: [str],
                    log: bool = False,
                    recording: bool = False,
-                   recording_az_mode: bool = False) -> CommandOutput:
+                   recording_az_mode: bool = False,
+                   link: bool = False) -> CommandOutput:
     tasks = await query_tasks_async(ids)
     output = SequentialOutput()
 
-    async with AsyncSession() as session:
-        for task in tasks:
-            output.append(TaskBriefOutput(task))
+    store = BlobStore(link=link) if recording else None
+    try:
+        async with AsyncSession() as session:
+            for task in tasks:
+                output.append(TaskBriefOutput(task))
 
-            if log:
-                output.append(TaskLogOutput(await get_log_content_async(task.log_resource_uri, session)))
+                if log:
+                    output.append(TaskLogOutput(await get_log_content_async(task.log_resource_uri, session)))
 
-            if recording:
-                await download_recording_async(task.record_resource_uri,
-                                               task.identifier,
-                                               recording_az_mode,
-                                               session)
+                if recording:
+                    await download_recording_async(task.record_resource_uri,
+                                                   task.identifier,
+                                                   recording_az_mode,
+                                                   session,
+                                                   store)
+    finally:
+        if store:
+            store.close()
 
     return output
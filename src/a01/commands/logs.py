@@ -0,0 +1,56 @@
+import sys
+import logging
+
+from a01.cli import cmd, arg
+from a01.models import Task
+from a01.output import CommandOutput, TableOutput
+from a01.operations import LogIndex, download_log_async, iter_bounded, iter_run_tasks_async
+from a01.transport import AsyncSession
+
+
+@cmd('logs index', desc='Download the logs of the runs and add them to the local full-text index. Only the logs of '
+                        'the completed tasks are indexed, since the log of a running task is partial. The logs '
+                        'already indexed are skipped, so the command can be repeated as the runs progress.')
+@arg('run_ids', help='The run ids.', positional=True)
+@arg('concurrency', option=('-c', '--concurrency'), help='The number of logs downloaded at the same time.')
+async def index_logs(run_ids: [str], concurrency: int = 8) -> None:
+    logger = logging.getLogger(__name__)
+
+    async def _download(task: Task, session: AsyncSession):
+        return task, await download_log_async(task.log_resource_uri, session)
+
+    try:
+        with LogIndex() as index:
+            async with AsyncSession() as session:
+                for run_id in run_ids:
+                    indexed = index.get_indexed_task_ids(run_id)
+                    tasks = [t async for t in iter_run_tasks_async(run_id, session)
+                             if t.log_resource_uri and t.id not in indexed]
+                    # a running task's log is still growing, it is indexed once the task completes
+                    running = sum(1 for t in tasks if not t.is_completed)
+                    tasks = [t for t in tasks if t.is_completed]
+
+                    count = 0
+                    async for task, content in iter_bounded((_download(t, session) for t in tasks), concurrency):
+                        if content is not None:
+                            index.add(task, content)
+                            count += 1
+                    index.commit()
+
+                    print(f'Run {run_id}: indexed {count} new logs, {len(indexed)} already indexed, '
+                          f'{running} of running tasks skipped.')
+    except ValueError as err:
+        logger.error(err)
+        sys.exit(1)
+
+
+@cmd('logs query', desc='Search the locally indexed logs. All the terms must appear on the same line. A quoted term '
+                        'of several words is matched as a phrase.')
+@arg('terms', help='The terms to search.', positional=True)
+@arg('run', help='Only search the logs of the given run.')
+@arg('limit', help='The maximum number of lines to return. Default: 100.')
+def query_logs(terms: [str], run: str = None, limit: int = 100) -> CommandOutput:
+    with LogIndex() as index:
+        results = index.query(terms, run_id=run, limit=limit)
+
+    return TableOutput(results, headers=('Id', 'Identifier', 'Line', 'Content'))
@@ -0,0 +1,47 @@
+import sys
+import logging
+
+from a01.cli import cmd, arg
+from a01.operations import (query_image_runs_async, gather_bounded, find_duration_regressions, RunTaskCache,
+                            query_run_tasks_cached_async)
+from a01.output import CommandOutput, TableOutput
+from a01.transport import AsyncSession
+
+
+@cmd('perf regressions', desc='Find the tests became slower across the recent runs of an image. A test is reported '
+                              'when the median of its durations shifted up from a run onward.')
+@arg('image', help='The image of the runs. Without a tag, the runs of all the tags are considered.', required=True)
+@arg('runs', help='The number of recent runs to examine. Default: 10.')
+@arg('ratio', help='A test is reported when it is this many times slower than before. Default: 1.5.')
+@arg('min_delta', option=['--min-delta'],
+     help='A test is reported only when it is slower by at least these milliseconds. Default: 10000.')
+@arg('min_samples', option=['--min-samples'],
+     help='The minimum number of passed runs of a test needed before and after the shift. Default: 3.')
+@arg('concurrency', option=('-c', '--concurrency'), help='The number of runs fetched at the same time. Default: 8.')
+@arg('max_scan', option=['--max-scan'],
+     help='The maximum number of recent runs of all the images looked through for the runs of the image. Default: 200.')
+async def perf_regressions(image: str, runs: int = 10, ratio: float = 1.5, min_delta: int = 10000,
+                           min_samples: int = 3, concurrency: int = 8, max_scan: int = 200) -> CommandOutput:
+    logger = logging.getLogger(__name__)
+
+    try:
+        async with AsyncSession() as session:
+            selected = await query_image_runs_async(session, image, runs, max_scan)
+            if not selected:
+                raise ValueError(f'No run of image {image} is found in the latest {max_scan} runs.')
+
+            # the finished runs never change, so they are read from the local cache after the first time
+            cache = RunTaskCache(session.endpoint)
+            selected.reverse()
+            tasks = await gather_bounded((query_run_tasks_cached_async(run.id, session, cache) for run in selected),
+                                         concurrency)
+    except ValueError as err:
+        logger.error(err)
+        sys.exit(1)
+
+    regressions = find_duration_regressions(list(zip(selected, tasks)), ratio, min_delta, min_samples)
+    if not regressions:
+        print(f'No regression is found in the {len(selected)} runs.', file=sys.stderr)
+    return TableOutput([(r.identifier, int(r.before), int(r.after), f'{r.ratio:.2f}x', r.first_run.id,
+                         r.first_run.creation.strftime('%Y-%m-%d'), r.samples) for r in regressions],
+                       headers=('Identifier', 'Before(ms)', 'After(ms)', 'Ratio', 'Since Run', 'Since', 'Samples'))
@@ -1,5 +1,11 @@
 import sys
+import json
 import base64
+import asyncio
+import threading
+from collections import defaultdict, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Tuple
 
 import yaml
 import docker
@@ -11,89 +17,242 @@ from kubernetes import client as kube_client
 from tabulate import tabulate
 
 import a01.cli
-from a01.operations import query_tasks_async, query_run_async
+from a01.models import Task, Run
+from a01.operations import query_tasks_async, query_run_async, ImageCache, SecretCache
 
 
-# pylint: disable=too-many-statements
+# pylint: disable=too-many-statements, too-many-locals
 
 
-@a01.cli.cmd('repo task', desc="Rerun a task locally")
-@a01.cli.arg('task_id', positional=True)
+def ensure_image(client: docker.DockerClient, image: str) -> None:
+    if not client.images.list(image):
+        print(f'Pulling the test image {image} ...')
+        client.images.pull(*(image.split(':')))
+    else:
+        print(f'Image {image} exists locally.')
+
+
+def get_metadata(client: docker.DockerClient, image: str, cache: ImageCache = None) -> dict:
+    digest = client.images.get(image).id
+    if cache:
+        metadata = cache.get(digest, 'metadata')
+        if metadata is not None:
+            print(f'Use cached metadata of {image}')
+            return metadata
+
+    print(f'Retrieve metadata of {image}')
+    metadata = yaml.load(client.containers.run(image, 'cat /app/metadata.yml', remove=True))
+    if cache:
+        cache.put(image, digest, 'metadata', metadata)
+    return metadata
+
+
+def get_test_index(client: docker.DockerClient, image: str, cache: ImageCache = None) -> List[str]:
+    """Returns the identifiers of the tests in the image, listed by its /app/get_index program."""
+    digest = client.images.get(image).id
+    if cache:
+        index = cache.get(digest, 'index')
+        if index is not None:
+            print(f'Use cached test index of {image}', file=sys.stderr)
+            return index
+
+    print(f'Retrieve test index of {image}', file=sys.stderr)
+    output = client.containers.run(image, '/app/get_index', remove=True)
+    index = [each['classifier']['identifier'] for each in json.loads(output.decode('utf-8'))]
+    if cache:
+        cache.put(image, digest, 'index', index)
+    return index
+
+
+def get_secret_data(product: str, cache: SecretCache = None) -> Dict[str, str]:
+    data = cache.get(product) if cache else None
+    if data is not None:
+        print(f'Use cached secrets of {product}')
+        return data
+
+    print(f'Get secrets of {product} from the Kubernetes cluster')
+    kube_config.load_kube_config()
+    kapi = kube_client.CoreV1Api()
+    data = kapi.read_namespaced_secret(product, 'a01-prod').data
+    if cache:
+        cache.put(product, data)
+    return data
+
+
+def get_environment(metadata: dict, secret_data: Dict[str, str], live: bool, mode: str) -> Dict[str, str]:
+    repo_environment_variables = {}
+
+    for env in metadata['environments']:
+        if env['type'] == 'secret':
+            value = secret_data[env['value']]
+            value = base64.b64decode(value).decode('utf-8')
+
+            repo_environment_variables[env["name"]] = value
+        elif env['type'] == 'argument-switch-live':
+            if live:
+                repo_environment_variables[env["name"]] = env["value"]
+        elif env['type'] == 'argument-value-mode':
+            if mode:
+                repo_environment_variables[env['name']] = mode
+
+    return repo_environment_variables
+
+
+class ContainerOutput(object):
+    """Writes the output lines of the containers to stdout, and to the tee file if given. Shared among threads."""
+
+    def __init__(self, tee_path: str = None) -> None:
+        self._lock = threading.Lock()
+        self._tee = open(tee_path, 'w', encoding='utf-8') if tee_path else None
+
+    def write(self, prefix: str, line: bytes) -> None:
+        text = line.decode('utf-8', errors='replace')
+        with self._lock:
+            print(f'{prefix}{colorama.Fore.LIGHTYELLOW_EX}{text}{colorama.Fore.RESET}', flush=True)
+            if self._tee:
+                self._tee.write(f'{prefix}{text}\n')
+                self._tee.flush()
+
+    def close(self) -> None:
+        if self._tee:
+            self._tee.close()
+
+
+def run_task_container(client: docker.DockerClient, image: str, task: Task, environment: Dict[str, str],
+                       prefix: str, output: ContainerOutput, timeout: int = None) -> str:
+    """Run the task in a container and stream its output as it is produced. The container is killed if it runs longer
+    than the timeout in seconds. Returns the result of the task."""
+    command = f'/bin/bash -c "if [ -e /app/prepare_pod ]; then /app/prepare_pod; fi; {task.command}"'
+    cont = client.containers.run(image, command, environment=environment, detach=True)
+
+    timed_out = threading.Event()
+
+    def _kill() -> None:
+        timed_out.set()
+        try:
+            cont.kill()
+        except docker.errors.APIError:
+            pass
+
+    timer = threading.Timer(timeout, _kill) if timeout else None
+    try:
+        if timer:
+            timer.start()
+
+        pending = b''
+        for chunk in cont.logs(stream=True, follow=True):
+            lines = (pending + chunk).split(b'\n')
+            pending = lines.pop()
+            for line in lines:
+                output.write(prefix, line)
+        if pending:
+            output.write(prefix, pending)
+
+        exit_code = cont.wait().get('StatusCode', 1)
+        if timed_out.is_set():
+            output.write(prefix, f'Killed after {timeout} seconds.'.encode('utf-8'))
+            return 'Timeout'
+        return 'Passed' if exit_code == 0 else f'Failed ({exit_code})'
+    finally:
+        if timer:
+            timer.cancel()
+        cont.remove(force=True)
+
+
+@a01.cli.cmd('repo task', desc="Rerun tasks locally")
+@a01.cli.arg('task_ids', help='The task ids. Support multiple IDs.', positional=True)
 @a01.cli.arg('live', help='Rerun in live env')
-@a01.cli.arg('interactive', option=['-i', '--interactive'], help='Start the container in interactive mode')
+@a01.cli.arg('interactive', option=['-i', '--interactive'],
+             help='Start the container in interactive mode. Only supported for a single task.')
 @a01.cli.arg('shell', help='The shell to use for interactive mode')
 @a01.cli.arg('mode', help='Need a mode')
-async def reproduce_task(task_id: str, live: bool = False, interactive: bool = False, shell: str = '/bin/bash',
-                         mode: str = None) -> None:
-    task = (await query_tasks_async([task_id]))[0]
-    run = await query_run_async(task.run_id)
+@a01.cli.arg('jobs', option=('-j', '--jobs'), help='The number of containers to run at the same time. Default: 4.')
+@a01.cli.arg('no_cache', option=['--no-cache'],
+             help='Do not use the cached image metadata and secrets. The image metadata is cached by the image digest. '
+                  'The secrets are cached for 10 minutes (A01_SECRET_CACHE_TTL, in seconds) on disk when the '
+                  'cryptography package is installed, encrypted with a key in the OS keyring when the keyring package '
+                  'is installed, otherwise only obfuscated with a key file readable by the user alone.')
+@a01.cli.arg('tee', help='Also write the output of the containers to the given file.')
+@a01.cli.arg('timeout', help='Kill the container of a task if it runs longer than the given number of seconds.')
+async def reproduce_task(task_ids: [str], live: bool = False, interactive: bool = False, shell: str = '/bin/bash',
+                         mode: str = None, jobs: int = 4, no_cache: bool = False, tee: str = None,
+                         timeout: int = None) -> None:
+    if interactive and len(task_ids) > 1:
+        print('Interactive mode supports a single task only.', file=sys.stderr)
+        sys.exit(1)
 
-    summary = {
-        'name': task.name,
-        'image': run.image,
-        'command': task.command,
-    }
+    tasks = await query_tasks_async(task_ids)
+    run_ids = sorted({task.run_id for task in tasks})
+    runs = dict(zip(run_ids, await asyncio.gather(*[query_run_async(r) for r in run_ids])))  # type: Dict[str, Run]
+
+    groups = defaultdict(list)  # type: Dict[Tuple[str, str], List[Task]]
+    for task in tasks:
+        run = runs[task.run_id]
+        groups[(run.image, run.product)].append(task)
 
     print('\nBrief\n')
-    print(tabulate(summary.items(), tablefmt='plain'))
+    print(tabulate([(task.id, task.name, runs[task.run_id].image, task.command) for task in tasks],
+                   headers=('Id', 'Name', 'Image', 'Command'), tablefmt='plain'))
     print()
 
+    image = None
     try:
         client = docker.from_env()
 
-        if not client.images.list(run.image):
-            print('Pulling the test image ...')
-            client.images.pull(*(run.image.split(':')))
-        else:
-            print(f'Image {run.image} exists locally.')
-
-        print('Retrieve metadata')
-        metadata = client.containers.run(run.image, 'cat /app/metadata.yml', remove=True)
-        metadata = yaml.load(metadata)
-
-        print('Get secrets from the Kubernetes cluster')
-        kube_config.load_kube_config()
-        kapi = kube_client.CoreV1Api()
-
-        secret = kapi.read_namespaced_secret(run.product, 'a01-prod')
-        repo_environment_variables = {}
-
-        for env in metadata['environments']:
-            if env['type'] == 'secret':
-                value = secret.data[env['value']]
-                value = base64.b64decode(value).decode('utf-8')
-
-                repo_environment_variables[env["name"]] = value
-            elif env['type'] == 'argument-switch-live':
-                if live:
-                    repo_environment_variables[env["name"]] = env["value"]
-            elif env['type'] == 'argument-value-mode':
-                if mode:
-                    repo_environment_variables[env['name']] = mode
+        image_cache = None if no_cache else ImageCache()
+        secret_cache = None if no_cache else SecretCache()
+        metadata = {}  # type: Dict[str, dict]
+        secrets = {}  # type: Dict[str, Dict[str, str]]
+        environments = {}  # type: Dict[Tuple[str, str], Dict[str, str]]
+        for image, product in groups:
+            if image not in metadata:
+                ensure_image(client, image)
+                metadata[image] = get_metadata(client, image, image_cache)
+            if product not in secrets:
+                secrets[product] = get_secret_data(product, secret_cache)
 
-        print('Environment:')
-        print(tabulate(repo_environment_variables.items(), tablefmt='plain') + '\n')
+            environments[(image, product)] = get_environment(metadata[image], secrets[product], live, mode)
+            print(f'Environment of {image}:')
+            print(tabulate(environments[(image, product)].items(), tablefmt='plain') + '\n')
 
         if interactive:
+            task = tasks[0]
+            image = runs[task.run_id].image
             print('Start the container in interactive mode ...\n')
-            cont = client.containers.run(run.image, shell, environment=repo_environment_variables, auto_remove=True,
-                                         detach=True, tty=True, stdin_open=True)
+            cont = client.containers.run(image, shell, environment=environments[(image, runs[task.run_id].product)],
+                                         auto_remove=True, detach=True, tty=True, stdin_open=True)
             print(f'\n\nRun following command to enter the container\'s shell:')
             print(f'\n{colorama.Fore.YELLOW}docker attach {cont.name}{colorama.Fore.RESET}\n')
             print(f'\nRun following command in the container to rerun the task:')
             print(f'\n{colorama.Fore.YELLOW}{task.command}{colorama.Fore.RESET}\n\n')
+            return
 
-        else:
-            print('Run task in local container ...\n')
+        print('Run tasks in local containers ...\n')
+        output = ContainerOutput(tee)
+        loop = asyncio.get_event_loop()
+        try:
+            with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+                futures = OrderedDict()
+                for (image, product), group in groups.items():
+                    for task in group:
+                        prefix = f'[{task.id}] ' if len(tasks) > 1 else ''
+                        futures[task.id] = loop.run_in_executor(executor, run_task_container, client, image, task,
+                                                                environments[(image, product)], prefix, output,
+                                                                timeout)
+                results = dict(zip(futures.keys(), await asyncio.gather(*futures.values(), return_exceptions=True)))
+        finally:
+            output.close()
 
-            command = f'/bin/bash -c "if [ -e /app/prepare_pod ]; then /app/prepare_pod; fi; {task.command}"'
-            cont = client.containers.run(run.image, command, environment=repo_environment_variables, detach=True)
-            cont.wait()
-            print('\nRun finished ...\n')
+        print('\nRun finished ...\n')
+        summary = []
+        for task in tasks:
+            result = results[task.id]
+            summary.append((task.id, task.name, f'Error: {result}' if isinstance(result, Exception) else result))
+        print(tabulate(summary, headers=('Id', 'Name', 'Result'), tablefmt='simple'))
 
-            print(colorama.Fore.LIGHTYELLOW_EX + cont.logs().decode('utf-8') + colorama.Fore.RESET)
-            cont.remove()
+        if any(result != 'Passed' for _, _, result in summary):
+            sys.exit(1)
 
     except requests.HTTPError:
-        print(f'Please login the docker container registry {run.image.split("/")[0]}')
+        print(f'Please login the docker container registry {image.split("/")[0] if image else ""}')
         sys.exit(1)
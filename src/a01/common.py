@@ -14,6 +14,9 @@ RESOURCE_ID = '00000002-0000-0000-c000-000000000000'
 CONFIG_DIR = os.path.expanduser('~/.a01')
 CONFIG_FILE = os.path.join(CONFIG_DIR, 'a01.ini')
 TOKEN_FILE = os.path.join(CONFIG_DIR, 'token.json')
+LOG_INDEX_DIR = os.path.join(CONFIG_DIR, 'logs')
+CACHE_DIR = os.path.join(CONFIG_DIR, 'cache')
+BLOB_DIR = os.path.join(CONFIG_DIR, 'blobs')
 
 IS_WINDOWS = sys.platform.lower() in ['windows', 'win32']
 
@@ -1,6 +1,14 @@
 import requests
 from a01.auth import A01Auth
+from a01.transport.cassette import get_cassette, CassetteAdapter
 
 
 session = requests.Session()  # pylint: disable=invalid-name
 session.auth = A01Auth()
+
+_CASSETTE = get_cassette()
+if _CASSETTE:
+    session.mount('http://', CassetteAdapter(_CASSETTE))
+    session.mount('https://', CassetteAdapter(_CASSETTE))
+    if _CASSETTE.replaying:
+        session.auth = None
@@ -1,6 +1,6 @@
 import json
 import datetime
-from typing import List, Tuple, Generator
+from typing import List, Tuple, Generator, Dict, Optional
 
 import colorama
 from requests import HTTPError
@@ -9,6 +9,18 @@ from a01.communication import session
 from a01.common import get_logger, A01Config
 
 
+def parse_timestamp(value: str) -> datetime.datetime:
+    """Parse the timestamp in the %Y-%m-%dT%H:%M:%SZ format the task store uses. The fixed layout is sliced directly
+    instead of going through strptime."""
+    if len(value) == 20 and value[4] == '-' and value[10] == 'T' and value[19] == 'Z':
+        try:
+            return datetime.datetime(int(value[0:4]), int(value[5:7]), int(value[8:10]),
+                                     int(value[11:13]), int(value[14:16]), int(value[17:19]))
+        except ValueError:
+            pass
+    return datetime.datetime.strptime(value, '%Y-%m-%dT%H:%M:%SZ')
+
+
 class Run(object):
     logger = get_logger('Run')
 
@@ -82,7 +94,7 @@ class Run(object):
                      owner=data.get('owner', None),
                      status=data.get('status', 'N/A'))
         result.id = data['id']
-        result.creation = datetime.datetime.strptime(data['creation'], '%Y-%m-%dT%H:%M:%SZ')
+        result.creation = parse_timestamp(data['creation'])
 
         return result
 
@@ -97,7 +109,9 @@ class RunsView(object):
     def __init__(self, runs: List[Run]) -> None:
         self.runs = runs
 
-    def get_table_view(self) -> Generator[List, None, None]:
+    def get_table_view(self, summaries: Dict[str, Optional[Tuple[dict, dict]]] = None) -> Generator[List, None, None]:
+        """The summaries map the run ids to the number of tasks per status and per result. When they are given, the
+        progress and the pass, fail and error counts are added to the rows."""
         for run in self.runs:
             time = (run.creation - datetime.timedelta(hours=8)).strftime('%Y-%m-%d %H:%M PST')
             remark = run.details.get('remark', None) or run.settings.get('a01.reserved.remark', '')
@@ -105,6 +119,8 @@ class RunsView(object):
             status = run.status
 
             row = [run.id, run.name, time, status, remark, owner]
+            if summaries is not None:
+                row.extend(self._get_summary_columns(summaries.get(run.id, None)))
             if remark and remark.lower() == 'official':
                 for i, column in enumerate(row):
                     row[i] = colorama.Style.BRIGHT + str(column) + colorama.Style.RESET_ALL
@@ -112,5 +128,15 @@ class RunsView(object):
             yield row
 
     @staticmethod
-    def get_table_header() -> Tuple:
+    def _get_summary_columns(summary: Optional[Tuple[dict, dict]]) -> List:
+        if summary is None:
+            return ['?'] * 4
+        statuses, results = summary
+        return [f'{statuses.get("completed", 0)}/{sum(statuses.values())}', results.get('Passed', 0),
+                results.get('Failed', 0), results.get('Error', 0)]
+
+    @staticmethod
+    def get_table_header(summary: bool = False) -> Tuple:
+        if summary:
+            return 'Id', 'Name', 'Creation', 'Status', 'Remark', 'Owner', 'Tasks', 'Pass', 'Fail', 'Error'
         return 'Id', 'Name', 'Creation', 'Status', 'Remark', 'Owner'
@@ -6,6 +6,10 @@ from a01.common import get_logger
 class Task(object):  # pylint: disable=too-many-instance-attributes
     logger = get_logger('Task')
 
+    # The fields needed to list and summarize the tasks. They are requested as a projection of the task list.
+    BRIEF_FIELDS = ('id', 'name', 'annotation', 'status', 'result', 'duration', 'run_id',
+                    'settings.classifier.identifier', 'result_details.agent')
+
     def __init__(self, name: str, annotation: str, settings: dict) -> None:
         self.name = name
         self.annotation = annotation
@@ -26,6 +30,10 @@ class Task(object):  # pylint: disable=too-many-instance-attributes
     def command(self) -> str:
         return self.settings['execution']['command']
 
+    @property
+    def is_completed(self) -> bool:
+        return self.status == 'completed'
+
     @property
     def log_resource_uri(self):
         return self.result_details.get('a01.reserved.tasklogpath', None)
@@ -55,6 +63,22 @@ class Task(object):  # pylint: disable=too-many-instance-attributes
 
         return result
 
+    @staticmethod
+    def from_dict_brief(data: dict) -> 'Task':
+        """Parse only the BRIEF_FIELDS. The rest of the settings and the result details are dropped whether the task
+        store honored the projection or not."""
+        classifier = (data.get('settings') or {}).get('classifier') or {}
+        result = Task(name=data.get('name', None), annotation=data.get('annotation', None),
+                      settings={'classifier': {'identifier': classifier.get('identifier', None)}})
+        result.id = str(data['id'])
+        result.status = data.get('status', None)
+        result.result_details = {'agent': (data.get('result_details') or {}).get('agent', None)}
+        result.result = data.get('result', None)
+        result.duration = data.get('duration', None)
+        result.run_id = str(data['run_id']) if data.get('run_id', None) is not None else None
+
+        return result
+
     def get_table_view(self) -> Tuple[str, ...]:
         return self.id, self.name, self.status, self.result, self.result_details.get('agent', None), self.duration
 
@@ -1,4 +1,22 @@
 # pylint: disable=unused-import
 from .query_tasks import (query_tasks, query_tasks_by_run, query_tasks_by_run_async, query_tasks_async,
-                          get_log_content_async, download_recording_async)
-from .query_runs import query_run, query_runs, query_run_async, query_runs_async
+                          get_log_content_async, download_log_async, download_recording_async,
+                          download_recording_content_async, get_recording_path, query_tasks_by_run_brief_async,
+                          query_run_summary_async)
+from .query_runs import (query_run, query_runs, query_run_async, query_runs_async, iter_runs_async, match_image,
+                         query_image_runs_async)
+from .log_index import LogIndex
+from .pool import gather_bounded, iter_bounded
+from .archive import Archive
+from .diff_runs import RunDiff
+from .watch_run import (RunProgress, TaskPoller, backoff_interval, watch_run_async, wait_run, MIN_POLL_INTERVAL,
+                        MAX_POLL_INTERVAL)
+from .create_runs import expand_matrix, post_runs_async, post_runs
+from .local_cache import ImageCache, SecretCache
+from .task_filter import compile_filter, sort_tasks, FilterSyntaxError
+from .paged_tasks import iter_run_task_pages_async, iter_run_tasks_async, query_run_tasks_sorted_async
+from .task_table import TaskTableWriter
+from .run_cache import RunTaskCache, query_run_tasks_cached_async, query_image_durations_async
+from .perf_regressions import find_duration_regressions, find_median_shift, DurationRegression
+from .load_test import LoadGenerator, StepResult, LatencyHistogram, parse_mix, DEFAULT_MIX
+from .blob_store import BlobStore
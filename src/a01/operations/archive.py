@@ -0,0 +1,66 @@
+import io
+import tarfile
+import time
+import zipfile
+from contextlib import ExitStack
+
+TAR_MODES = {
+    '.tar': 'w|',
+    '.tar.gz': 'w|gz',
+    '.tgz': 'w|gz',
+    '.tar.bz2': 'w|bz2',
+    '.tar.xz': 'w|xz',
+    '.tar.zst': 'w|',
+}
+
+
+class Archive(object):
+    """A write-only archive which streams each entry to the file as it is added. The format is decided by the file
+    extension. Tar archives are written in stream mode, so the entries are never staged on disk."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._stack = ExitStack()
+        self._tar = None
+        self._zip = None
+
+        if path.endswith('.zip'):
+            self._zip = self._stack.enter_context(zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED))
+            return
+
+        mode = next((m for ext, m in TAR_MODES.items() if path.endswith(ext)), None)
+        if not mode:
+            raise ValueError(f'Unsupported archive format {path}. Supported extensions: '
+                             f'{", ".join(sorted(TAR_MODES))}, .zip')
+
+        zstandard = None
+        if path.endswith('.tar.zst'):
+            try:
+                import zstandard
+            except ImportError:
+                raise ValueError('The zstandard package is required to write .tar.zst archive.')
+
+        fileobj = self._stack.enter_context(open(path, 'wb'))
+        if zstandard:
+            fileobj = self._stack.enter_context(zstandard.ZstdCompressor().stream_writer(fileobj))
+
+        self._tar = self._stack.enter_context(tarfile.open(fileobj=fileobj, mode=mode))
+
+    def __enter__(self) -> 'Archive':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def add(self, name: str, content: bytes) -> None:
+        if self._zip:
+            self._zip.writestr(name, content)
+            return
+
+        info = tarfile.TarInfo(name)
+        info.size = len(content)
+        info.mtime = time.time()
+        self._tar.addfile(info, io.BytesIO(content))
+
+    def close(self) -> None:
+        self._stack.close()
@@ -0,0 +1,134 @@
+import os
+import base64
+import shutil
+import sqlite3
+import hashlib
+from typing import Optional
+
+from a01.common import get_logger, BLOB_DIR
+from a01.transport import AsyncSession
+
+FICLONE = 0x40049409  # the Linux ioctl cloning a file on copy-on-write file systems, e.g. btrfs and xfs
+
+
+def _clone(source: str, target: str, link: bool = False) -> None:
+    """Make target a reflink of the source if the file system supports it, otherwise a copy, or a hardlink if link is
+    set. A reflink or a copy is an independent file, while a hardlink shares the source."""
+    try:
+        import fcntl
+        with open(source, 'rb') as source_file, open(target, 'wb') as target_file:
+            fcntl.ioctl(target_file.fileno(), FICLONE, source_file.fileno())
+        return
+    except (ImportError, OSError):
+        if os.path.exists(target):
+            os.remove(target)
+
+    if link:
+        try:
+            os.link(source, target)
+            return
+        except OSError:
+            pass
+    shutil.copyfile(source, target)
+
+
+class BlobStore(object):
+    """A local content-addressed store of the downloaded files, e.g. the recordings, which are mostly identical across
+    the runs. The files are stored once by their sha256 and materialized as writable reflinks where the file system
+    supports them, otherwise as copies. With link set they are materialized as hardlinks instead, which are read-only
+    since editing one would change the stored content. A sqlite index remembers the digest of every URI and
+    Content-MD5 seen, so a download is skipped when the store already holds the content."""
+
+    def __init__(self, root: str = BLOB_DIR, link: bool = False) -> None:
+        self.root = root
+        self.link = link
+        self.logger = get_logger(__class__.__name__)
+
+        os.makedirs(self.root, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(self.root, 'index.db'))
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS uris (uri TEXT PRIMARY KEY, etag TEXT, digest TEXT);
+            CREATE TABLE IF NOT EXISTS md5s (md5 TEXT PRIMARY KEY, digest TEXT) WITHOUT ROWID;
+        """)
+
+    def __enter__(self) -> 'BlobStore':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._db.close()
+
+    def get_path(self, digest: str) -> str:
+        return os.path.join(self.root, 'sha256', digest[:2], digest[2:])
+
+    def has(self, digest: Optional[str]) -> bool:
+        return bool(digest) and os.path.exists(self.get_path(digest))
+
+    def put(self, content: bytes) -> str:
+        digest = hashlib.sha256(content).hexdigest()
+        path = self.get_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(f'{path}.tmp', 'wb') as blob_file:
+                blob_file.write(content)
+            os.chmod(f'{path}.tmp', 0o444)
+            os.replace(f'{path}.tmp', path)
+
+        md5 = base64.b64encode(hashlib.md5(content).digest()).decode('ascii')
+        with self._db:
+            self._db.execute('INSERT OR REPLACE INTO md5s VALUES (?, ?)', (md5, digest))
+        return digest
+
+    def _lookup(self, uri: str, etag: Optional[str], md5: Optional[str]) -> Optional[str]:
+        row = self._db.execute('SELECT etag, digest FROM uris WHERE uri = ?', (uri,)).fetchone()
+        if row and etag and row[0] == etag and self.has(row[1]):
+            return row[1]
+        row = self._db.execute('SELECT digest FROM md5s WHERE md5 = ?', (md5,)).fetchone() if md5 else None
+        if row and self.has(row[0]):
+            return row[0]
+        return None
+
+    def _remember(self, uri: str, etag: Optional[str], digest: str) -> None:
+        with self._db:
+            self._db.execute('INSERT OR REPLACE INTO uris VALUES (?, ?, ?)', (uri, etag, digest))
+
+    async def fetch_async(self, uri: str, session: AsyncSession) -> Optional[str]:
+        """Returns the digest of the content at the URI, or None if it is not available. The content is only
+        downloaded when the ETag or the Content-MD5 returned by a HEAD request is not known to the store."""
+        if not uri:
+            return None
+
+        async with session.head(uri) as resp:
+            if resp.status == 404:
+                return None
+            etag, md5 = resp.headers.get('ETag', None), resp.headers.get('Content-MD5', None)
+        digest = self._lookup(uri, etag, md5) if resp.status == 200 else None
+        if digest:
+            self.logger.debug(f'Skip downloading {uri}, the content is {digest}')
+            self._remember(uri, etag, digest)
+            return digest
+
+        async with session.get(uri) as resp:
+            if resp.status != 200:
+                return None
+            etag = resp.headers.get('ETag', etag)
+            content = await resp.read()
+
+        digest = self.put(content)
+        self._remember(uri, etag, digest)
+        return digest
+
+    def materialize(self, digest: str, path: str) -> None:
+        """Place the content at the path, replacing the existing file."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.lexists(path):
+            try:
+                os.remove(path)
+            except PermissionError:  # a read-only file can't be removed on Windows
+                os.chmod(path, 0o644)
+                os.remove(path)
+        _clone(self.get_path(digest), path, self.link)
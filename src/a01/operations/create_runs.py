@@ -0,0 +1,64 @@
+import asyncio
+import itertools
+from typing import List, Tuple, Optional
+
+from aiohttp import ClientError, ClientConnectorError, ClientResponseError
+
+from a01.common import get_logger
+from a01.models import Run
+from a01.operations.pool import gather_bounded
+from a01.transport import AsyncSession
+
+RETRIABLE_STATUS = (429, 503)
+
+
+def expand_matrix(matrix: dict) -> List[dict]:
+    """Expands a run matrix into a list of run settings. The matrix is either a mapping of setting names to a value or
+    a list of values, which is expanded to the cartesian product of the lists, or a list of such mappings."""
+    if isinstance(matrix, list):
+        return [each for item in matrix for each in expand_matrix(item)]
+    if not isinstance(matrix, dict):
+        raise ValueError('A run matrix must be a mapping or a list of mappings.')
+
+    keys = list(matrix.keys())
+    values = [value if isinstance(value, list) else [value] for value in matrix.values()]
+    return [dict(zip(keys, combination)) for combination in itertools.product(*values)]
+
+
+def _is_retriable(error: Exception) -> bool:
+    """Whether the creation surely didn't happen and the task store can be tried again. A run isn't idempotent, so a
+    request which may have reached the store, e.g. one timed out after it was sent or one failed with 500, is never
+    retried."""
+    if isinstance(error, ClientConnectorError):
+        return True
+    return isinstance(error, ClientResponseError) and error.status in RETRIABLE_STATUS
+
+
+async def post_runs_async(runs: List[Run], retries: int = 2,
+                          concurrency: int = 8) -> List[Tuple[Run, Optional[Run], Optional[str]]]:
+    """Create the runs through one session. Returns (the requested run, the created run or None, the error or None)
+    for every run in the input order. A creation failed to connect, or rejected with 429 or 503, is retried with
+    exponential back off."""
+    if retries < 0:
+        raise ValueError('The number of retries must not be negative.')
+    logger = get_logger(__name__)
+
+    async def _post(run: Run, session: AsyncSession) -> Tuple[Run, Optional[Run], Optional[str]]:
+        for attempt in range(retries + 1):
+            if attempt:
+                await asyncio.sleep(2 ** attempt)
+            try:
+                return run, Run.from_dict(await session.post_json('run', run.to_dict())), None
+            except (ClientError, asyncio.TimeoutError, KeyError, TypeError, ValueError) as ex:
+                logger.debug('Fail to create run %s', run.name, exc_info=True)
+                if attempt == retries or not _is_retriable(ex):
+                    return run, None, str(ex) or type(ex).__name__
+        return run, None, None
+
+    async with AsyncSession() as session:
+        return await gather_bounded((_post(run, session) for run in runs), concurrency)
+
+
+def post_runs(runs: List[Run], retries: int = 2,
+              concurrency: int = 8) -> List[Tuple[Run, Optional[Run], Optional[str]]]:
+    return asyncio.get_event_loop().run_until_complete(post_runs_async(runs, retries, concurrency))
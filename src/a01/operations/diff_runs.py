@@ -0,0 +1,62 @@
+from typing import List, Tuple, Dict
+
+from a01.models import Task
+
+FAILED_RESULTS = ('Failed', 'Error')
+
+
+class RunDiff(object):  # pylint: disable=too-few-public-methods
+    """Compares the tasks of two runs. The tasks are joined on their identifiers through a hash table built on the
+    base run, so the comparison is linear to the number of tasks."""
+
+    def __init__(self, base: List[Task], head: List[Task], slower_ratio: float = 1.5, min_delta: int = 10000) -> None:
+        self.new_failures = []  # type: List[Tuple[Task, Task]]
+        self.fixes = []  # type: List[Tuple[Task, Task]]
+        self.regressions = []  # type: List[Tuple[Task, Task]]
+        self.missing_in_head = []  # type: List[Task]
+        self.missing_in_base = []  # type: List[Task]
+
+        base_table = {task.identifier: task for task in base}  # type: Dict[str, Task]
+        for head_task in head:
+            base_task = base_table.pop(head_task.identifier, None)
+            if base_task is None:
+                self.missing_in_base.append(head_task)
+                continue
+
+            if base_task.result == 'Passed' and head_task.result in FAILED_RESULTS:
+                self.new_failures.append((base_task, head_task))
+            elif base_task.result in FAILED_RESULTS and head_task.result == 'Passed':
+                self.fixes.append((base_task, head_task))
+
+            if base_task.duration and head_task.duration and \
+                    head_task.duration - base_task.duration >= min_delta and \
+                    head_task.duration >= base_task.duration * slower_ratio:
+                self.regressions.append((base_task, head_task))
+
+        self.missing_in_head = list(base_table.values())
+
+        for pairs in (self.new_failures, self.fixes):
+            pairs.sort(key=lambda pair: pair[1].identifier)
+        self.regressions.sort(key=lambda pair: pair[0].duration - pair[1].duration)
+        self.missing_in_head.sort(key=lambda task: task.identifier)
+        self.missing_in_base.sort(key=lambda task: task.identifier)
+
+    def to_dict(self) -> dict:
+        def _pair(pair: Tuple[Task, Task]) -> dict:
+            base_task, head_task = pair
+            return {
+                'identifier': head_task.identifier,
+                'base': {'id': base_task.id, 'result': base_task.result, 'duration': base_task.duration},
+                'head': {'id': head_task.id, 'result': head_task.result, 'duration': head_task.duration},
+            }
+
+        def _single(task: Task) -> dict:
+            return {'identifier': task.identifier, 'id': task.id, 'result': task.result, 'duration': task.duration}
+
+        return {
+            'new_failures': [_pair(each) for each in self.new_failures],
+            'fixes': [_pair(each) for each in self.fixes],
+            'regressions': [_pair(each) for each in self.regressions],
+            'missing_in_head': [_single(each) for each in self.missing_in_head],
+            'missing_in_base': [_single(each) for each in self.missing_in_base],
+        }
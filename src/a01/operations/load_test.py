@@ -0,0 +1,207 @@
+"""Generates read load on the task store through AsyncSession, mixing the requests the CLI and the monitors send. The
+load is open loop: the requests are issued on a fixed schedule whether or not the earlier ones have completed, and the
+latency is measured from the scheduled time, so a slow store shows up as latency instead of a lower request rate."""
+import math
+import random
+import asyncio
+from collections import OrderedDict
+from typing import Dict, List, Tuple, Optional
+
+from aiohttp import ClientError
+
+from a01.transport import AsyncSession
+from a01.transport.codec import loads
+
+WORKLOADS = ('runs', 'tasks', 'task', 'log')
+DEFAULT_MIX = OrderedDict([('runs', 1), ('tasks', 1), ('task', 6), ('log', 2)])
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    """Parse the weights of the workloads in the form of runs=1,tasks=1,task=6,log=2."""
+    mix = OrderedDict()
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in WORKLOADS or not weight.strip().isdigit():
+            raise ValueError(f'Invalid workload {part!r}. The workloads are {", ".join(WORKLOADS)}, e.g. task=6,log=2.')
+        mix[name] = int(weight)
+    if not any(mix.values()):
+        raise ValueError('At least one workload needs a positive weight.')
+    return mix
+
+
+class LatencyHistogram(object):
+    """Latencies in milliseconds counted in buckets growing by a fixed ratio. The memory is constant and a percentile
+    is accurate to the width of a bucket."""
+
+    def __init__(self, ratio: float = 1.25, minimum: float = 0.5) -> None:
+        self.ratio = ratio
+        self.minimum = minimum
+        self.buckets = {}  # type: Dict[int, int]
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def _get_bucket(self, value: float) -> int:
+        return 0 if value <= self.minimum else int(math.ceil(math.log(value / self.minimum, self.ratio)))
+
+    def get_upper_bound(self, bucket: int) -> float:
+        return self.minimum * self.ratio ** bucket
+
+    def add(self, value: float) -> None:
+        bucket = self._get_bucket(value)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def merge(self, other: 'LatencyHistogram') -> None:
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def percentile(self, percent: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = max(int(math.ceil(self.count * percent / 100)), 1)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(self.get_upper_bound(bucket), self.max)
+        return self.max
+
+    def get_rows(self, width: int = 40) -> List[Tuple[str, int, str]]:
+        """The non-empty buckets as rows of the upper bound, the count and a bar."""
+        if not self.count:
+            return []
+        peak = max(self.buckets.values())
+        return [(f'<= {self.get_upper_bound(bucket):.1f}', count, '#' * max(int(width * count / peak), 1))
+                for bucket, count in sorted(self.buckets.items())]
+
+
+class StepResult(object):  # pylint: disable=too-few-public-methods
+    def __init__(self, rate: float) -> None:
+        self.rate = rate
+        self.elapsed = 0
+        self.dropped = 0
+        self.latency = LatencyHistogram()
+        self.workloads = OrderedDict()  # type: Dict[str, LatencyHistogram]
+        self.errors = OrderedDict()  # type: Dict[str, int]
+
+    @property
+    def completed(self) -> int:
+        return self.latency.count
+
+    @property
+    def error_count(self) -> int:
+        return sum(self.errors.values())
+
+    @property
+    def throughput(self) -> float:
+        """The number of successful requests per second."""
+        return (self.completed - self.error_count) / self.elapsed if self.elapsed else 0
+
+    def record(self, workload: str, latency: float, error: str = None) -> None:
+        self.latency.add(latency)
+        self.workloads.setdefault(workload, LatencyHistogram()).add(latency)
+        if error:
+            self.errors[error] = self.errors.get(error, 0) + 1
+
+    def is_saturated(self, max_error_rate: float = 0.01, min_throughput: float = 0.9) -> bool:
+        """The store is saturated when it can't keep up with the target rate or starts to fail the requests."""
+        issued = self.completed + self.dropped
+        return bool(issued) and (self.dropped > 0 or self.error_count > issued * max_error_rate or
+                                 self.throughput < self.rate * min_throughput)
+
+
+class LoadGenerator(object):
+    """Issues the mix of workloads at a target rate. The targets are discovered from the store before the load. They
+    are kept per workload: the run ids for tasks, the task ids for task and the log URIs for log."""
+
+    def __init__(self, session: AsyncSession, mix: Dict[str, int] = None, max_inflight: int = 200,
+                 seed_runs: int = 5, timeout: float = 30) -> None:
+        self.session = session
+        self.mix = mix or DEFAULT_MIX
+        self.max_inflight = max_inflight
+        self.seed_runs = seed_runs
+        self.timeout = timeout
+        self.targets = {'tasks': [], 'task': [], 'log': []}  # type: Dict[str, List[str]]
+
+    async def discover(self) -> None:
+        runs = await self.session.get_json(f'runs?last={self.seed_runs}')
+        self.targets['tasks'] = [str(run['id']) for run in runs or []]
+        if not self.targets['tasks']:
+            raise ValueError('The task store has no run to generate load with.')
+
+        for run_id in self.targets['tasks']:
+            for task in await self.session.get_json(f'run/{run_id}/tasks?skip=0&limit=1000') or []:
+                self.targets['task'].append(str(task['id']))
+                log_uri = (task.get('result_details') or {}).get('a01.reserved.tasklogpath', None)
+                if log_uri:
+                    self.targets['log'].append(log_uri)
+
+        if not self.targets['task']:
+            raise ValueError('The runs in the task store have no task to generate load with.')
+        if not self.targets['log'] and self.mix.get('log', 0):
+            self.mix = OrderedDict((name, weight) for name, weight in self.mix.items() if name != 'log')
+
+    def _get_request(self, workload: str) -> Tuple[str, bool]:
+        """Returns the URL of a request of the workload and whether it is a request to the task store."""
+        if workload == 'runs':
+            return self.session.get_path(f'runs?last={self.seed_runs}'), True
+        target = random.choice(self.targets[workload])
+        if workload == 'tasks':
+            return self.session.get_path(f'run/{target}/tasks'), True
+        if workload == 'task':
+            return self.session.get_path(f'task/{target}'), True
+        return target, False
+
+    async def _issue(self, workload: str, scheduled: float, result: StepResult) -> None:
+        url, store = self._get_request(workload)
+        loop = asyncio.get_event_loop()
+        error = None
+        try:
+            headers = self.session.get_headers() if store else None
+            async with self.session.get(url, headers=headers, timeout=self.timeout) as resp:
+                body = await resp.read()
+                if resp.status >= 400:
+                    error = f'HTTP {resp.status}'
+                elif store:
+                    loads(body.decode('utf-8'))
+        except (ClientError, asyncio.TimeoutError, ValueError) as ex:
+            error = type(ex).__name__
+        result.record(workload, (loop.time() - scheduled) * 1000, error)
+
+    async def run_step(self, rate: float, duration: float) -> StepResult:
+        """Issue the requests at the rate for the duration in seconds, then wait for the outstanding requests. A
+        request is dropped instead of issued when max_inflight requests are outstanding."""
+        loop = asyncio.get_event_loop()
+        result = StepResult(rate)
+        workloads, weights = list(self.mix.keys()), list(self.mix.values())
+        pending = set()
+
+        start = loop.time()
+        for index in range(int(rate * duration)):
+            scheduled = start + index / rate
+            delay = scheduled - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            if len(pending) >= self.max_inflight:
+                result.dropped += 1
+                continue
+            future = asyncio.ensure_future(self._issue(random.choices(workloads, weights)[0], scheduled, result))
+            pending.add(future)
+            future.add_done_callback(pending.discard)
+
+        if pending:
+            await asyncio.wait(pending)
+        result.elapsed = loop.time() - start
+        return result
@@ -0,0 +1,159 @@
+import os
+import json
+import shutil
+import threading
+from typing import Any, Optional, Dict
+
+from a01.common import get_logger, CACHE_DIR
+
+
+class ImageCache(object):
+    """Caches data extracted from the test images, e.g. the metadata. The entries are keyed by the image digest, so
+    they are invalidated when the image behind a tag changes. The entries can be put from several threads."""
+
+    def __init__(self, root: str = os.path.join(CACHE_DIR, 'images')) -> None:
+        self.root = root
+        self.logger = get_logger(__class__.__name__)
+        self._digests_file = os.path.join(self.root, 'digests.json')
+        self._lock = threading.Lock()
+
+    def _load_digests(self) -> Dict[str, str]:
+        try:
+            with open(self._digests_file, 'r') as handler:
+                return json.load(handler)
+        except (IOError, ValueError):
+            return {}
+
+    def _get_path(self, digest: str, name: str) -> str:
+        return os.path.join(self.root, digest.replace(':', '_'), f'{name}.json')
+
+    def get(self, digest: str, name: str) -> Optional[Any]:
+        try:
+            with open(self._get_path(digest, name), 'r') as handler:
+                return json.load(handler)
+        except (IOError, ValueError):
+            return None
+
+    def put(self, image: str, digest: str, name: str, value: Any) -> None:
+        try:
+            with self._lock:
+                digests = self._load_digests()
+                previous = digests.get(image, None)
+                if previous and previous != digest and previous not in set(v for k, v in digests.items()
+                                                                            if k != image):
+                    shutil.rmtree(os.path.dirname(self._get_path(previous, name)), ignore_errors=True)
+                digests[image] = digest
+
+                path = self._get_path(digest, name)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'w') as handler:
+                    json.dump(value, handler)
+                # replaced at once so a concurrent reader never sees a partial file
+                with open(f'{self._digests_file}.tmp', 'w') as handler:
+                    json.dump(digests, handler)
+                os.replace(f'{self._digests_file}.tmp', self._digests_file)
+        except IOError:
+            self.logger.warning(f'Fail to write the image cache {self.root}', exc_info=True)
+
+
+DEFAULT_SECRET_TTL = 600  # seconds
+KEYRING_SERVICE = 'a01'
+KEYRING_USERNAME = 'secret-cache-key'
+
+
+def get_secret_ttl() -> int:
+    """The seconds the secrets are cached, from the A01_SECRET_CACHE_TTL environment variable."""
+    value = os.environ.get('A01_SECRET_CACHE_TTL', None)
+    if value is None:
+        return DEFAULT_SECRET_TTL
+    try:
+        return int(value)
+    except ValueError:
+        get_logger(__name__).warning(f'Invalid A01_SECRET_CACHE_TTL {value!r}. Use {DEFAULT_SECRET_TTL} seconds.')
+        return DEFAULT_SECRET_TTL
+
+
+class SecretCache(object):
+    """Caches the secret data of the products for a short time. The data is kept in memory, and on disk encrypted
+    when the cryptography package is available. Without it, nothing is written to disk.
+
+    The encryption key is kept in the OS keyring when the keyring package is installed and a keyring is available.
+    Otherwise the key is kept in a file next to the encrypted data, which only obfuscates the secrets: anyone who can
+    read the cache directory can decrypt them. Both files are then only readable by the user."""
+
+    def __init__(self, root: str = os.path.join(CACHE_DIR, 'secrets'), ttl: int = None) -> None:
+        self.root = root
+        self.ttl = get_secret_ttl() if ttl is None else ttl
+        self.logger = get_logger(__class__.__name__)
+        self._memory = {}  # type: Dict[str, Dict[str, str]]
+        self._fernet = self._get_fernet() if self.ttl > 0 else None
+
+    def _get_keyring_key(self, generate_key) -> Optional[bytes]:
+        try:
+            import keyring
+            import keyring.errors
+        except ImportError:
+            return None
+
+        try:
+            key = keyring.get_password(KEYRING_SERVICE, KEYRING_USERNAME)
+            if not key:
+                key = generate_key().decode('ascii')
+                keyring.set_password(KEYRING_SERVICE, KEYRING_USERNAME, key)
+            return key.encode('ascii')
+        except (keyring.errors.KeyringError, RuntimeError):
+            self.logger.info('The keyring is not available. The secret cache key is kept in a file.', exc_info=True)
+            return None
+
+    def _get_file_key(self, generate_key) -> bytes:
+        key_file = os.path.join(self.root, 'secret.key')
+        if not os.path.exists(key_file):
+            with os.fdopen(os.open(key_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), 'wb') as handler:
+                handler.write(generate_key())
+        os.chmod(key_file, 0o600)
+        with open(key_file, 'rb') as handler:
+            return handler.read()
+
+    def _get_fernet(self):
+        try:
+            from cryptography.fernet import Fernet
+        except ImportError:
+            self.logger.info('Package cryptography is missing. Secrets are not cached on disk.')
+            return None
+
+        try:
+            os.makedirs(self.root, mode=0o700, exist_ok=True)
+            os.chmod(self.root, 0o700)
+            return Fernet(self._get_keyring_key(Fernet.generate_key) or self._get_file_key(Fernet.generate_key))
+        except (IOError, ValueError):
+            self.logger.warning('Fail to load the secret cache key. Secrets are not cached on disk.', exc_info=True)
+            return None
+
+    def get(self, product: str) -> Optional[Dict[str, str]]:
+        if product in self._memory:
+            return self._memory[product]
+        if not self._fernet:
+            return None
+
+        from cryptography.fernet import InvalidToken
+        try:
+            with open(os.path.join(self.root, f'{product}.bin'), 'rb') as handler:
+                data = json.loads(self._fernet.decrypt(handler.read(), ttl=self.ttl).decode('utf-8'))
+        except (IOError, ValueError, InvalidToken):
+            return None
+
+        self._memory[product] = data
+        return data
+
+    def put(self, product: str, data: Dict[str, str]) -> None:
+        self._memory[product] = data
+        if not self._fernet:
+            return
+
+        path = os.path.join(self.root, f'{product}.bin')
+        try:
+            with os.fdopen(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'wb') as handler:
+                handler.write(self._fernet.encrypt(json.dumps(data).encode('utf-8')))
+            os.chmod(path, 0o600)  # O_CREAT doesn't change the mode of an existing file
+        except IOError:
+            self.logger.warning(f'Fail to write the secret cache {path}', exc_info=True)
@@ -0,0 +1,106 @@
+import gzip
+import os
+import re
+import sqlite3
+from typing import Iterable, List, Tuple, Set, Dict
+
+from a01.common import get_logger, LOG_INDEX_DIR
+from a01.models import Task
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def tokenize(text: str) -> List[str]:
+    return [token.lower() for token in TOKEN_PATTERN.findall(text)]
+
+
+class LogIndex(object):
+    """A local inverted index over task logs. The logs are kept gzip compressed next to a sqlite database which maps
+    every token to the (task, line) postings it appears in."""
+
+    def __init__(self, root: str = LOG_INDEX_DIR) -> None:
+        self.root = root
+        self.logger = get_logger(__class__.__name__)
+
+        os.makedirs(self.root, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(self.root, 'index.db'))
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS logs (task_id TEXT PRIMARY KEY, run_id TEXT, identifier TEXT, path TEXT);
+            CREATE TABLE IF NOT EXISTS postings (token TEXT, task_id TEXT, line INTEGER,
+                                                 PRIMARY KEY (token, task_id, line)) WITHOUT ROWID;
+        """)
+
+    def __enter__(self) -> 'LogIndex':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._db.close()
+
+    def get_indexed_task_ids(self, run_id: str) -> Set[str]:
+        return {row[0] for row in self._db.execute('SELECT task_id FROM logs WHERE run_id = ?', (run_id,))}
+
+    def add(self, task: Task, content: bytes) -> None:
+        """Store the log of the task and add its lines to the index. The change is committed by commit()."""
+        path = os.path.join(self.root, task.run_id, f'{task.id}.log.gz')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with gzip.open(path, 'wb') as log_file:
+            log_file.write(content)
+
+        postings = set()
+        for line_number, line in enumerate(content.decode('utf-8', errors='replace').split('\n')):
+            for token in tokenize(line):
+                postings.add((token, task.id, line_number))
+
+        self._db.execute('DELETE FROM postings WHERE task_id = ?', (task.id,))
+        self._db.executemany('INSERT INTO postings VALUES (?, ?, ?)', postings)
+        self._db.execute('INSERT OR REPLACE INTO logs VALUES (?, ?, ?, ?)',
+                         (task.id, task.run_id, task.identifier, path))
+
+    def commit(self) -> None:
+        self._db.commit()
+
+    def query(self, terms: Iterable[str], run_id: str = None,
+              limit: int = None) -> List[Tuple[str, str, int, str]]:
+        """Returns the (task id, identifier, line number, line) of the lines matching all the terms. A term of several
+        words is a phrase and only matches when the words appear consecutively."""
+        phrases = [tokenize(term) for term in terms]
+        phrases = [phrase for phrase in phrases if phrase]
+        tokens = sorted({token for phrase in phrases for token in phrase})
+        if not tokens:
+            return []
+
+        sql = ' INTERSECT '.join(['SELECT task_id, line FROM postings WHERE token = ?'] * len(tokens))
+        params = list(tokens)
+        sql = f'SELECT logs.task_id, logs.identifier, matches.line, logs.path FROM ({sql}) AS matches ' \
+              f'JOIN logs ON logs.task_id = matches.task_id'
+        if run_id:
+            sql += ' WHERE logs.run_id = ?'
+            params.append(run_id)
+        sql += ' ORDER BY logs.identifier, matches.line'
+
+        results = []
+        lines_cache = {}  # type: Dict[str, List[str]]
+        for task_id, identifier, line_number, path in self._db.execute(sql, params):
+            if path not in lines_cache:
+                lines_cache.clear()
+                lines_cache[path] = self._read_lines(path)
+            line = lines_cache[path][line_number]
+            if all(self._contains_phrase(tokenize(line), phrase) for phrase in phrases if len(phrase) > 1):
+                results.append((task_id, identifier, line_number, line))
+                if limit and len(results) >= limit:
+                    break
+
+        return results
+
+    @staticmethod
+    def _read_lines(path: str) -> List[str]:
+        with gzip.open(path, 'rb') as log_file:
+            return log_file.read().decode('utf-8', errors='replace').split('\n')
+
+    @staticmethod
+    def _contains_phrase(tokens: List[str], phrase: List[str]) -> bool:
+        size = len(phrase)
+        return any(tokens[i:i + size] == phrase for i in range(len(tokens) - size + 1))
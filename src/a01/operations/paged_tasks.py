@@ -0,0 +1,89 @@
+import heapq
+import asyncio
+from collections import deque
+from typing import List, AsyncIterator, Iterator, Deque
+
+from aiohttp import ClientError
+
+from a01.common import get_logger
+from a01.models import Task
+from a01.transport import AsyncSession
+
+DEFAULT_PAGE_SIZE = 5000
+PAGING_CAPABILITY = 'tasks.paging'
+
+
+async def _fetch_page(session: AsyncSession, run_id: str, skip: int, limit: int, brief: bool,
+                      retries: int) -> List[Task]:
+    path = f'run/{run_id}/tasks?skip={skip}&limit={limit}'
+    if brief:
+        path += '&fields=' + ','.join(Task.BRIEF_FIELDS)
+    parse = Task.from_dict_brief if brief else Task.from_dict
+
+    for attempt in range(retries + 1):
+        try:
+            return [parse(each) for each in await session.get_json(path)]
+        except (ClientError, asyncio.TimeoutError):
+            if attempt == retries:
+                raise
+            get_logger(__name__).info(f'Retry page {skip}-{skip + limit} of run {run_id}', exc_info=True)
+            await asyncio.sleep(2 ** attempt)
+    return []
+
+
+async def iter_run_task_pages_async(run_id: str, session: AsyncSession, page_size: int = DEFAULT_PAGE_SIZE,
+                                    window: int = 4, brief: bool = False,
+                                    retries: int = 3) -> AsyncIterator[List[Task]]:
+    """Fetch the tasks of the run page by page, with up to window pages in flight, and yield the pages in order. A
+    failed page is retried alone. The listing ends at the first short page. Unless the task store advertises paging,
+    the first page is fetched alone. If the task store ignores the paging parameters the whole list arrives in the
+    first page and is yielded as is."""
+    pending = deque()  # type: Deque[asyncio.Future]
+    next_skip = 0
+
+    def _schedule() -> None:
+        nonlocal next_skip
+        pending.append(asyncio.ensure_future(_fetch_page(session, run_id, next_skip, page_size, brief, retries)))
+        next_skip += page_size
+
+    try:
+        # a task store ignoring the paging parameters returns the whole list for every page, so unless the store
+        # advertises paging the window is opened only after the first page turns out to be a page
+        for _ in range(max(window, 1) if PAGING_CAPABILITY in await session.get_capabilities() else 1):
+            _schedule()
+
+        first_id = None
+        while pending:
+            page = await pending.popleft()
+            if first_id is not None and page and page[0].id == first_id:
+                return  # the paging parameters are ignored and the same list is returned again
+            yield page
+
+            if len(page) != page_size:
+                return  # the last page, or the whole list of a store ignoring the paging parameters
+            if first_id is None:
+                first_id = page[0].id
+                while len(pending) < max(window, 1) - 1:
+                    _schedule()
+            _schedule()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+async def iter_run_tasks_async(run_id: str, session: AsyncSession, **kwargs) -> AsyncIterator[Task]:
+    """Iterate through the tasks of the run in the order of the task store. See iter_run_task_pages_async."""
+    async for page in iter_run_task_pages_async(run_id, session, **kwargs):
+        for task in page:
+            yield task
+
+
+async def query_run_tasks_sorted_async(run_id: str, session: AsyncSession, **kwargs) -> Iterator[Task]:
+    """Returns an iterator of the tasks of the run sorted by their identifiers. Each page is sorted in place as it
+    arrives and the pages are lazily merged, so the tasks are not copied into another list."""
+    pages = []
+    async for page in iter_run_task_pages_async(run_id, session, **kwargs):
+        page.sort(key=lambda t: t.identifier)
+        pages.append(page)
+
+    return heapq.merge(*pages, key=lambda t: t.identifier)
@@ -0,0 +1,89 @@
+"""Detects the tests whose duration shifted up across a series of runs. For each test the durations are split at the run
+which best separates them into two levels, and the shift between the medians of the two sides is tested. A median
+shift is insensitive to the occasional slow outlier caused by a busy agent."""
+from bisect import insort
+from collections import defaultdict
+from typing import List, Tuple, Optional, Dict
+
+from a01.models import Run, Task
+
+
+def _median(ordered: List[float]) -> float:
+    middle = len(ordered) // 2
+    return ordered[middle] if len(ordered) % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def _running_medians(values: List[float]) -> List[float]:
+    """Returns the median of each prefix of the values, i.e. result[k] is the median of values[:k + 1]."""
+    ordered = []  # type: List[float]
+    result = []
+    for value in values:
+        insort(ordered, value)
+        result.append(_median(ordered))
+    return result
+
+
+def find_median_shift(values: List[float], ratio: float = 1.5, min_delta: float = 10000,
+                      min_samples: int = 3) -> Optional[Tuple[int, float, float]]:
+    """Returns the index where the values shift up, and the medians before and after it, or None if there is no
+    significant shift. Both sides need at least min_samples values. The shift must be at least the ratio, the delta and
+    three times the median absolute deviation of the values before it."""
+    count = len(values)
+    if count < 2 * min_samples:
+        return None
+
+    prefix = _running_medians(values)
+    suffix = _running_medians(values[::-1])[::-1]
+
+    # the split is placed where the values deviate the least from the medians of their sides
+    best, best_cost = None, None
+    for split in range(min_samples, count - min_samples + 1):
+        before, after = prefix[split - 1], suffix[split]
+        cost = sum(abs(value - before) for value in values[:split]) + \
+            sum(abs(value - after) for value in values[split:])
+        if best_cost is None or cost < best_cost:
+            best, best_cost = (split, before, after), cost
+
+    split, before, after = best
+    if after < before * ratio or after - before < min_delta:
+        return None
+
+    deviation = _median(sorted(abs(value - before) for value in values[:split]))
+    if after - before <= 3 * 1.4826 * deviation:
+        return None
+
+    return best
+
+
+class DurationRegression(object):  # pylint: disable=too-few-public-methods
+    def __init__(self, identifier: str, first_run: Run, before: float, after: float, samples: int) -> None:
+        self.identifier = identifier
+        self.first_run = first_run
+        self.before = before
+        self.after = after
+        self.samples = samples
+
+    @property
+    def ratio(self) -> float:
+        return self.after / self.before if self.before else float('inf')
+
+
+def find_duration_regressions(runs: List[Tuple[Run, List[Task]]], ratio: float = 1.5, min_delta: float = 10000,
+                              min_samples: int = 3) -> List[DurationRegression]:
+    """Find the tests became slower. The runs are ordered from the oldest. Only the passed tasks are considered, since
+    a failure often ends a test early. The regressions are sorted by the added duration, the largest first."""
+    series = defaultdict(list)  # type: Dict[str, List[Tuple[int, int]]]
+    for index, (_, tasks) in enumerate(runs):
+        for task in tasks:
+            if task.result == 'Passed' and task.duration:
+                series[task.identifier].append((index, task.duration))
+
+    results = []
+    for identifier, points in series.items():
+        shift = find_median_shift([duration for _, duration in points], ratio, min_delta, min_samples)
+        if shift:
+            split, before, after = shift
+            results.append(DurationRegression(identifier, runs[points[split][0]][0], before, after, len(points)))
+
+    results.sort(key=lambda r: r.after - r.before, reverse=True)
+    return results
@@ -0,0 +1,38 @@
+import asyncio
+from typing import Awaitable, Iterable, List, AsyncIterator, Any
+
+DEFAULT_CONCURRENCY = 8
+
+
+async def gather_bounded(coroutines: Iterable[Awaitable], limit: int = DEFAULT_CONCURRENCY) -> List[Any]:
+    """Await the coroutines with at most limit of them in flight. Results are returned in the input order."""
+    semaphore = asyncio.Semaphore(limit)
+
+    async def _run(coroutine: Awaitable) -> Any:
+        async with semaphore:
+            return await coroutine
+
+    return await asyncio.gather(*[_run(each) for each in coroutines])
+
+
+async def iter_bounded(coroutines: Iterable[Awaitable], limit: int = DEFAULT_CONCURRENCY) -> AsyncIterator[Any]:
+    """Await the coroutines with at most limit of them in flight and yield the results as they complete. The pending
+    coroutines are cancelled when the iteration stops early, e.g. the consumer breaks out or one of them fails."""
+    semaphore = asyncio.Semaphore(limit)
+
+    async def _run(coroutine: Awaitable) -> Any:
+        try:
+            async with semaphore:
+                return await coroutine
+        except asyncio.CancelledError:
+            if asyncio.iscoroutine(coroutine):
+                coroutine.close()  # it may never have started
+            raise
+
+    futures = [asyncio.ensure_future(_run(each)) for each in coroutines]
+    try:
+        for future in asyncio.as_completed(futures):
+            yield await future
+    finally:
+        for future in futures:
+            future.cancel()
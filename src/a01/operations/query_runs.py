@@ -1,4 +1,5 @@
 from urllib.parse import urlencode
+from typing import AsyncIterator, List
 
 import asyncio
 
@@ -11,19 +12,59 @@ async def query_run_async(run_id: str) -> Run:
         return Run.from_dict(await session.get_json(f'run/{run_id}'))
 
 
-async def query_runs_async(**kwargs) -> RunsView:
-    async with AsyncSession() as session:
-        url = 'runs'
-        query = {}
-        for key, value in kwargs.items():
-            if value is not None:
-                query[key] = value
+def _get_runs_path(**kwargs) -> str:
+    url = 'runs'
+    query = {}
+    for key, value in kwargs.items():
+        if value is not None:
+            query[key] = value
+
+    if query:
+        url = f'{url}?{urlencode(query)}'
+    return url
+
+
+async def query_runs_async(session: AsyncSession = None, **kwargs) -> RunsView:
+    if session is None:
+        async with AsyncSession() as new_session:
+            return await query_runs_async(new_session, **kwargs)
+
+    json_body = await session.get_json(_get_runs_path(**kwargs))
+    return RunsView(runs=[Run.from_dict(each) for each in json_body])
+
+
+async def iter_runs_async(session: AsyncSession, page_size: int = 100, **kwargs) -> AsyncIterator[Run]:
+    """Iterate through all the runs matching the query, from the latest, one page at a time."""
+    skip = 0
+    while True:
+        json_body = await session.get_json(_get_runs_path(last=page_size, skip=skip, **kwargs))
+        for each in json_body:
+            yield Run.from_dict(each)
+
+        if len(json_body) < page_size:
+            return
+        skip += page_size
+
+
+def match_image(run: Run, image: str) -> bool:
+    """An image without a tag matches the runs of any tag of the image."""
+    run_image = run.settings.get('a01.reserved.imagename', '')
+    return run_image == image or (':' not in image.rsplit('/', 1)[-1] and run_image.split(':')[0] == image)
 
-        if query:
-            url = f'{url}?{urlencode(query)}'
 
-        json_body = await session.get_json(url)
-        return RunsView(runs=[Run.from_dict(each) for each in json_body])
+async def query_image_runs_async(session: AsyncSession, image: str, count: int, max_scan: int = None) -> List[Run]:
+    """Returns the latest runs of the image, up to the count. At most max_scan runs are looked through if given."""
+    runs = []
+    scanned = 0
+    async for run in iter_runs_async(session):
+        if match_image(run, image):
+            runs.append(run)
+            if len(runs) == count:
+                break
+        scanned += 1
+        if max_scan and scanned >= max_scan:
+            break
+    return runs
 
 
 def query_run(run_id: str) -> Run:
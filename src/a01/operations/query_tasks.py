@@ -1,61 +1,152 @@
 import asyncio
 import os
-from typing import List, Tuple
+from collections import Counter
+from typing import List, Tuple, Optional, Dict
 
+from aiohttp import ClientResponseError
+
+from a01.common import get_logger
 from a01.models import Task
+from a01.operations.paged_tasks import iter_run_tasks_async
+from a01.operations.pool import gather_bounded
+from a01.operations.blob_store import BlobStore
+from a01.operations.run_cache import RunTaskCache, query_run_tasks_cached_async
 from a01.transport import AsyncSession
 
+BATCH_CAPABILITY = 'tasks.batch'
+SUMMARY_CAPABILITY = 'tasks.summary'
+BATCH_IDS_LENGTH = 1500  # keeps the URL well below the common 2k limit
+
+
+def _chunk_ids(ids: List[str], max_length: int = BATCH_IDS_LENGTH) -> List[List[str]]:
+    chunks = [[]]  # type: List[List[str]]
+    length = 0
+    for task_id in ids:
+        if chunks[-1] and length + len(task_id) + 1 > max_length:
+            chunks.append([])
+            length = 0
+        chunks[-1].append(task_id)
+        length += len(task_id) + 1
+    return chunks if chunks[0] else []
+
+
+async def query_tasks_async(ids: List[str], session: AsyncSession = None, concurrency: int = 8) -> List[Task]:
+    """Returns the tasks in the order of the ids. If the task store supports the batch lookup, the ids are sent in a
+    few chunked tasks?ids= requests, otherwise each task is looked up individually with bounded concurrency."""
+    if session is None:
+        async with AsyncSession() as new_session:
+            return await query_tasks_async(ids, new_session, concurrency)
+
+    unique_ids = list(dict.fromkeys(str(task_id) for task_id in ids))
+    if BATCH_CAPABILITY in await session.get_capabilities():
+        async def _get_chunk(chunk: List[str]) -> List[Task]:
+            return [Task.from_dict(each) for each in await session.get_json(f'tasks?ids={",".join(chunk)}')]
+
+        tasks = [task for chunk in await gather_bounded((_get_chunk(c) for c in _chunk_ids(unique_ids)), concurrency)
+                 for task in chunk]
+    else:
+        async def _get_one(task_id: str) -> Task:
+            return Task.from_dict(await session.get_json(f'task/{task_id}'))
 
-async def query_tasks_async(ids: List[str]) -> List[Task]:
-    results = []
-    async with AsyncSession() as session:
-        for task_id in ids:
-            results.append(Task.from_dict(await session.get_json(f'task/{task_id}')))
+        tasks = await gather_bounded((_get_one(task_id) for task_id in unique_ids), concurrency)
 
-    return results
+    by_id = {task.id: task for task in tasks}
+    missing = [task_id for task_id in unique_ids if task_id not in by_id]
+    if missing:
+        get_logger(__name__).warning(f'Tasks not found: {", ".join(missing)}')
+    return [by_id[str(task_id)] for task_id in ids if str(task_id) in by_id]
 
 
 async def query_tasks_by_run_async(run_id: str) -> List[Task]:
     async with AsyncSession() as session:
-        return [Task.from_dict(each) for each in await session.get_json(f'run/{run_id}/tasks')]
-
-
-async def download_recording_async(recording_uri: str,
-                                   task_identifier: str,
-                                   az_mode: bool,
-                                   session: AsyncSession) -> None:
+        return [task async for task in iter_run_tasks_async(run_id, session)]
+
+
+async def query_tasks_by_run_brief_async(run_id: str, session: AsyncSession) -> List[Task]:
+    """Query the tasks of the run with only the fields needed to list and summarize them."""
+    return [task async for task in iter_run_tasks_async(run_id, session, brief=True)]
+
+
+async def query_run_summary_async(run_id: str, session: AsyncSession,
+                                  cache: RunTaskCache = None) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """Returns the number of tasks of the run per status and per result. A finished run in the cache is counted
+    locally. Otherwise use the summary request if the task store supports it, or count the brief task list. Raises
+    ValueError if the task store reports the run is not found."""
+    tasks = cache.get(run_id) if cache else None
+    if tasks is None and SUMMARY_CAPABILITY in await session.get_capabilities():
+        try:
+            summary = await session.get_json_if_supported(f'run/{run_id}/tasks/summary')
+        except ClientResponseError as ex:
+            if ex.status == 404:
+                raise ValueError(f'Run {run_id} is not found.')
+            raise
+        if summary is not None:
+            return summary.get('statuses', {}), summary.get('results', {})
+
+    if tasks is None:
+        if cache:
+            tasks = await query_run_tasks_cached_async(run_id, session, cache)
+        else:
+            tasks = await query_tasks_by_run_brief_async(run_id, session)
+    return Counter(t.status for t in tasks), Counter(t.result for t in tasks)
+
+
+async def download_recording_content_async(recording_uri: str, session: AsyncSession) -> Optional[bytes]:
+    """Returns the raw content of the recording, or None if the recording is not available."""
     if not recording_uri:
-        return
-
+        return None
     async with session.get(recording_uri) as resp:
         if resp.status != 200:
-            return
-        content = await resp.read()
+            return None
+        return await resp.read()
+
 
+def get_recording_path(task_identifier: str, az_mode: bool) -> str:
     path_paths = task_identifier.split('.')
     if az_mode:
         module_name = path_paths[3]
         method_name = path_paths[-1]
         profile_name = path_paths[-4]
-        recording_path = os.path.join('recording', f'azure-cli-{module_name}', 'azure', 'cli', 'command_modules',
-                                      module_name, 'tests', profile_name, 'recordings', f'{method_name}.yaml')
-    else:
-        path_paths[-1] = path_paths[-1] + '.yaml'
-        path_paths.insert(0, 'recording')
-        recording_path = os.path.join(*path_paths)
+        return os.path.join('recording', f'azure-cli-{module_name}', 'azure', 'cli', 'command_modules',
+                            module_name, 'tests', profile_name, 'recordings', f'{method_name}.yaml')
 
-    os.makedirs(os.path.dirname(recording_path), exist_ok=True)
-    with open(recording_path, 'wb') as recording_file:
-        recording_file.write(content)
+    path_paths[-1] = path_paths[-1] + '.yaml'
+    path_paths.insert(0, 'recording')
+    return os.path.join(*path_paths)
 
 
-async def get_log_content_async(log_uri: str, session: AsyncSession) -> List[Tuple[str, str]]:
+async def download_recording_async(recording_uri: str,
+                                   task_identifier: str,
+                                   az_mode: bool,
+                                   session: AsyncSession,
+                                   store: BlobStore = None) -> None:
+    """Place the recording in the recording directory. The content is kept in the blob store, which skips the download
+    when it already holds the content, and the file is copied from there."""
+    if store is None:
+        with BlobStore() as new_store:
+            return await download_recording_async(recording_uri, task_identifier, az_mode, session, new_store)
+
+    digest = await store.fetch_async(recording_uri, session)
+    if digest:
+        store.materialize(digest, get_recording_path(task_identifier, az_mode))
+
+
+async def download_log_async(log_uri: str, session: AsyncSession) -> Optional[bytes]:
+    """Returns the raw content of the log, or None if the log doesn't exist."""
     if not log_uri:
-        return []
+        return None
     async with session.get(log_uri) as resp:
         if resp.status == 404:
-            return [('>', 'Log not found (task might still be running, or storage was not setup for this run)\n')]
-        content = await resp.read()
+            return None
+        return await resp.read()
+
+
+async def get_log_content_async(log_uri: str, session: AsyncSession) -> List[Tuple[str, str]]:
+    if not log_uri:
+        return []
+    content = await download_log_async(log_uri, session)
+    if content is None:
+        return [('>', 'Log not found (task might still be running, or storage was not setup for this run)\n')]
 
     results = []
     for index, line in enumerate(content.decode('utf-8').split('\n')):
@@ -0,0 +1,86 @@
+import os
+import gzip
+import json
+import hashlib
+import statistics
+from collections import defaultdict
+from typing import List, Optional, Dict
+
+from a01.common import get_logger, CACHE_DIR
+from a01.models import Task
+from a01.operations.paged_tasks import iter_run_tasks_async
+from a01.operations.pool import gather_bounded
+from a01.operations.query_runs import query_image_runs_async
+from a01.transport import AsyncSession
+from a01.transport.codec import loads
+
+
+def _to_brief_dict(task: Task) -> dict:
+    return {
+        'id': task.id,
+        'name': task.name,
+        'annotation': task.annotation,
+        'status': task.status,
+        'result': task.result,
+        'duration': task.duration,
+        'run_id': task.run_id,
+        'settings': {'classifier': {'identifier': task.identifier}},
+        'result_details': {'agent': task.result_details.get('agent', None)},
+    }
+
+
+class RunTaskCache(object):
+    """Caches the brief tasks of the finished runs, which never change. The entries are kept per task store endpoint
+    as compressed JSON."""
+
+    def __init__(self, endpoint: str, root: str = os.path.join(CACHE_DIR, 'runs')) -> None:
+        self.root = os.path.join(root, hashlib.sha1(endpoint.encode('utf-8')).hexdigest()[:16])
+        self.logger = get_logger(__class__.__name__)
+
+    def _get_path(self, run_id: str) -> str:
+        return os.path.join(self.root, f'{run_id}.json.gz')
+
+    def get(self, run_id: str) -> Optional[List[Task]]:
+        try:
+            with gzip.open(self._get_path(run_id), 'rb') as handler:
+                return [Task.from_dict_brief(each) for each in loads(handler.read())]
+        except (IOError, ValueError, EOFError):
+            return None
+
+    def put(self, run_id: str, tasks: List[Task]) -> None:
+        path = self._get_path(run_id)
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            # write aside and rename so a concurrent reader never sees a partial file
+            with gzip.open(f'{path}.tmp', 'wt', encoding='utf-8') as handler:
+                json.dump([_to_brief_dict(task) for task in tasks], handler)
+            os.replace(f'{path}.tmp', path)
+        except IOError:
+            self.logger.warning(f'Fail to write the run cache {self.root}', exc_info=True)
+
+
+async def query_run_tasks_cached_async(run_id: str, session: AsyncSession,
+                                       cache: RunTaskCache = None) -> List[Task]:
+    """Returns the brief tasks of the run. The tasks of a finished run are read from and saved to the cache."""
+    cache = cache or RunTaskCache(session.endpoint)
+    tasks = cache.get(run_id)
+    if tasks is not None:
+        return tasks
+
+    tasks = [task async for task in iter_run_tasks_async(run_id, session, brief=True)]
+    if tasks and all(task.is_completed for task in tasks):
+        cache.put(run_id, tasks)
+    return tasks
+
+
+async def query_image_durations_async(image: str, session: AsyncSession, runs: int = 3,
+                                      max_scan: int = 200) -> Dict[str, float]:
+    """Returns the median duration in milliseconds of each test in the latest runs of the image."""
+    cache = RunTaskCache(session.endpoint)
+    selected = await query_image_runs_async(session, image, runs, max_scan)
+    durations = defaultdict(list)
+    for tasks in await gather_bounded(query_run_tasks_cached_async(run.id, session, cache) for run in selected):
+        for task in tasks:
+            if task.is_completed and task.duration:
+                durations[task.identifier].append(task.duration)
+    return {identifier: statistics.median(values) for identifier, values in durations.items()}
@@ -0,0 +1,141 @@
+"""A local stand-in of the task store serving synthetic runs, tasks and logs. It serves the read requests of the CLI,
+so the client side can be exercised and benchmarked offline. The capacity and the latency of the store are simulated:
+at most `capacity` requests are served at the same time, each taking `latency` seconds."""
+import socket
+import asyncio
+import random
+
+from aiohttp import web
+
+RUN_SETTINGS = {'a01.reserved.imagename': 'azureclidev.azurecr.io/stub:latest', 'a01.reserved.initparallelism': 8}
+
+
+class StubStore(object):
+    def __init__(self, runs: int = 5, tasks: int = 2000, capacity: int = 8, latency: float = 0.005) -> None:
+        self.runs = runs
+        self.tasks = tasks
+        self.capacity = capacity
+        self.latency = latency
+        self._base = None
+        self._runner = None
+        self._semaphore = None
+
+    @property
+    def endpoint(self) -> str:
+        return f'{self._base}/api' if self._base else None
+
+    async def __aenter__(self) -> 'StubStore':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        await self.stop()
+
+    async def start(self) -> None:
+        self._semaphore = asyncio.Semaphore(self.capacity)
+        app = web.Application()
+        app.router.add_get('/api/runs', self._get_runs)
+        app.router.add_get('/api/run/{run_id}', self._get_run)
+        app.router.add_get('/api/run/{run_id}/tasks', self._get_run_tasks)
+        app.router.add_get('/api/task/{task_id}', self._get_task)
+        app.router.add_get('/logs/{task_id}.log', self._get_log)
+
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        # the server keeps the socket bound to a free port, so no other process can take the port in between
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        await web.SockSite(self._runner, sock).start()
+        self._base = f'http://127.0.0.1:{sock.getsockname()[1]}'
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _serve(self) -> None:
+        async with self._semaphore:
+            if self.latency:
+                await asyncio.sleep(random.uniform(0.5, 1.5) * self.latency)
+
+    def _make_run(self, run_id: int) -> dict:
+        return {
+            'id': run_id,
+            'name': f'stub run {run_id}',
+            'settings': RUN_SETTINGS,
+            'details': {'a01.reserved.product': 'stub', 'a01.reserved.creator': 'stub'},
+            'owner': 'stub',
+            'status': 'Completed',
+            'creation': f'2018-03-{1 + run_id % 28:02d}T08:00:00Z',
+        }
+
+    def _make_task(self, task_id: int) -> dict:
+        run_id = task_id // self.tasks
+        identifier = f'stub.tests.test_module{task_id % 50}.StubTest{task_id % 200}.test_{task_id}'
+        return {
+            'id': task_id,
+            'run_id': run_id,
+            'name': identifier,
+            'annotation': 'stub',
+            'status': 'completed',
+            'result': 'Passed' if task_id % 10 else 'Failed',
+            'duration': (task_id * 7919) % 60000,
+            'settings': {
+                'execution': {'command': f'python -m pytest {identifier}'},
+                'classifier': {'identifier': identifier, 'type': 'Record'},
+            },
+            'result_details': {
+                'agent': f'pod-{task_id % 30}',
+                'a01.reserved.tasklogpath': f'{self._base}/logs/{task_id}.log',
+            },
+        }
+
+    def _get_task_id(self, request: web.Request) -> int:
+        try:
+            task_id = int(request.match_info['task_id'])
+        except ValueError:
+            raise web.HTTPNotFound()
+        if not self.tasks <= task_id < (self.runs + 1) * self.tasks:
+            raise web.HTTPNotFound()
+        return task_id
+
+    def _get_run_id(self, request: web.Request) -> int:
+        try:
+            run_id = int(request.match_info['run_id'])
+        except ValueError:
+            raise web.HTTPNotFound()
+        if not 1 <= run_id <= self.runs:
+            raise web.HTTPNotFound()
+        return run_id
+
+    async def _get_runs(self, request: web.Request) -> web.Response:
+        await self._serve()
+        last = int(request.query.get('last', 10))
+        skip = int(request.query.get('skip', 0))
+        run_ids = range(self.runs - skip, max(self.runs - skip - last, 0), -1)
+        return web.json_response([self._make_run(run_id) for run_id in run_ids])
+
+    async def _get_run(self, request: web.Request) -> web.Response:
+        run_id = self._get_run_id(request)
+        await self._serve()
+        return web.json_response(self._make_run(run_id))
+
+    async def _get_run_tasks(self, request: web.Request) -> web.Response:
+        run_id = self._get_run_id(request)
+        await self._serve()
+        skip = int(request.query.get('skip', 0))
+        limit = int(request.query.get('limit', self.tasks))
+        first = run_id * self.tasks
+        return web.json_response([self._make_task(task_id) for task_id in
+                                  range(first + skip, first + min(skip + limit, self.tasks))])
+
+    async def _get_task(self, request: web.Request) -> web.Response:
+        task_id = self._get_task_id(request)
+        await self._serve()
+        return web.json_response(self._make_task(task_id))
+
+    async def _get_log(self, request: web.Request) -> web.Response:
+        task_id = self._get_task_id(request)
+        await self._serve()
+        lines = [f'{index:05d} stub output line of task {task_id}' for index in range(200)]
+        return web.Response(text='\n'.join(lines))
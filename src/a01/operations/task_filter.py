@@ -0,0 +1,178 @@
+import re
+import heapq
+import operator
+from typing import Callable, List, Any, Iterable, Tuple
+
+from a01.models import Task
+
+FIELDS = {
+    'id': lambda t: t.id,
+    'name': lambda t: t.name,
+    'identifier': lambda t: t.identifier,
+    'status': lambda t: t.status,
+    'result': lambda t: t.result,
+    'agent': lambda t: t.result_details.get('agent', None),
+    'duration': lambda t: t.duration,
+    'run_id': lambda t: t.run_id,
+}
+
+COMPARISONS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+TOKEN_PATTERN = re.compile(r"""\s*(?:
+    (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")|
+    (?P<number>-?\d+(?:\.\d+)?)|
+    (?P<op>==|!=|<=|>=|!~|<|>|~|\(|\))|
+    (?P<word>[A-Za-z_][A-Za-z0-9_]*)
+)""", re.VERBOSE)
+
+Predicate = Callable[[Task], bool]
+
+
+class FilterSyntaxError(ValueError):
+    pass
+
+
+def _tokenize(expression: str) -> List[Tuple[str, Any]]:
+    tokens = []
+    position = 0
+    expression = expression.rstrip()
+    while position < len(expression):
+        match = TOKEN_PATTERN.match(expression, position)
+        if not match:
+            raise FilterSyntaxError(f'Unexpected character at {position} in filter: {expression[position:]}')
+        position = match.end()
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'string':
+            value = re.sub(r'\\(.)', r'\1', value[1:-1])
+        elif kind == 'number':
+            value = float(value) if '.' in value else int(value)
+        elif kind == 'word' and value in ('and', 'or', 'not'):
+            kind = 'op'
+        elif kind == 'word' and value in ('null', 'None'):
+            kind, value = 'literal', None
+        tokens.append((kind, value))
+    return tokens
+
+
+class _Parser(object):  # pylint: disable=too-few-public-methods
+    """A recursive descent parser compiling a filter expression into a predicate made of closures.
+
+        expression := conjunction ('or' conjunction)*
+        conjunction := negation ('and' negation)*
+        negation := 'not' negation | '(' expression ')' | FIELD OP VALUE
+    """
+
+    def __init__(self, expression: str) -> None:
+        self.expression = expression
+        self.tokens = _tokenize(expression)
+        self.position = 0
+
+    def _peek(self) -> Tuple[str, Any]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def _next(self) -> Tuple[str, Any]:
+        token = self._peek()
+        if token[0] is None:
+            raise FilterSyntaxError(f'Unexpected end of filter: {self.expression}')
+        self.position += 1
+        return token
+
+    def parse(self) -> Predicate:
+        predicate = self._expression()
+        if self.position != len(self.tokens):
+            raise FilterSyntaxError(f'Unexpected {self._peek()[1]} in filter: {self.expression}')
+        return predicate
+
+    def _expression(self) -> Predicate:
+        operands = [self._conjunction()]
+        while self._peek() == ('op', 'or'):
+            self._next()
+            operands.append(self._conjunction())
+        return operands[0] if len(operands) == 1 else lambda t: any(p(t) for p in operands)
+
+    def _conjunction(self) -> Predicate:
+        operands = [self._negation()]
+        while self._peek() == ('op', 'and'):
+            self._next()
+            operands.append(self._negation())
+        return operands[0] if len(operands) == 1 else lambda t: all(p(t) for p in operands)
+
+    def _negation(self) -> Predicate:
+        kind, value = self._next()
+        if (kind, value) == ('op', 'not'):
+            operand = self._negation()
+            return lambda t: not operand(t)
+        if (kind, value) == ('op', '('):
+            predicate = self._expression()
+            if self._next() != ('op', ')'):
+                raise FilterSyntaxError(f'Missing ) in filter: {self.expression}')
+            return predicate
+        if kind != 'word' or value not in FIELDS:
+            raise FilterSyntaxError(f'Unknown field {value}. Accepted fields: {", ".join(sorted(FIELDS))}.')
+        return self._comparison(FIELDS[value])
+
+    def _comparison(self, field: Callable[[Task], Any]) -> Predicate:
+        kind, op = self._next()
+        if kind != 'op' or (op not in COMPARISONS and op not in ('~', '!~')):
+            raise FilterSyntaxError(f'Expect a comparison operator but get {op} in filter: {self.expression}')
+        kind, literal = self._next()
+        if kind not in ('string', 'number', 'literal'):
+            raise FilterSyntaxError(f'Expect a value but get {literal} in filter: {self.expression}')
+
+        if op in ('~', '!~'):
+            try:
+                regex = re.compile(str(literal))
+            except re.error as ex:
+                raise FilterSyntaxError(f'Invalid regular expression {literal!r} in filter: {ex}') from ex
+            negate = op == '!~'
+            return lambda t: (field(t) is not None and regex.search(str(field(t))) is not None) != negate
+
+        compare = COMPARISONS[op]
+        if op in ('==', '!='):
+            return lambda t: compare(field(t), literal)
+
+        def _ordered(task: Task) -> bool:
+            value = field(task)
+            try:
+                return value is not None and compare(value, literal)
+            except TypeError:
+                return False
+        return _ordered
+
+
+def compile_filter(expression: str) -> Predicate:
+    """Compile a filter expression, e.g. "result=='Failed' and duration>60000 and agent~'pod-3'", into a predicate
+    over tasks. The fields are id, name, identifier, status, result, agent, duration and run_id. The operators are
+    ==, !=, <, <=, >, >=, ~ (regex search), !~, and, or, not and parentheses."""
+    return _Parser(expression).parse()
+
+
+def sort_tasks(tasks: Iterable[Task], sort_by: str, limit: int = None) -> List[Task]:
+    """Sort the tasks by the field, given as field, field:asc or field:desc. Tasks missing the field are placed last.
+    With a limit only the top tasks are selected through a heap rather than sorting all the tasks."""
+    name, _, order = sort_by.partition(':')
+    if order not in ('', 'asc', 'desc'):
+        raise ValueError(f'Unknown sort order {order}. Use {name}:asc or {name}:desc.')
+    descending = order == 'desc'
+    if name not in FIELDS:
+        raise ValueError(f'Unknown sort field {name}. Accepted fields: {", ".join(sorted(FIELDS))}.')
+    field = FIELDS[name]
+
+    if descending:
+        key = lambda t: (field(t) is not None, field(t))
+        if limit is not None:
+            return heapq.nlargest(limit, tasks, key=key)
+        return sorted(tasks, key=key, reverse=True)
+
+    key = lambda t: (field(t) is None, field(t))
+    if limit is not None:
+        return heapq.nsmallest(limit, tasks, key=key)
+    return sorted(tasks, key=key)
@@ -0,0 +1,124 @@
+"""Columnar export of the tasks. The rows are buffered in columns and written in record batches, so the size of the
+export doesn't bound the memory. The pyarrow package is required."""
+from typing import List, Optional
+
+from a01.models import Run, Task
+
+FORMATS = ('parquet', 'arrow')
+
+# (column, dictionary encoded)
+COLUMNS = (
+    ('run_id', True),
+    ('run_name', True),
+    ('run_image', True),
+    ('run_owner', True),
+    ('run_product', True),
+    ('run_creation', False),
+    ('task_id', False),
+    ('identifier', False),
+    ('module', True),
+    ('class', True),
+    ('method', False),
+    ('status', True),
+    ('result', True),
+    ('agent', True),
+    ('duration', False),
+)
+
+
+def split_identifier(identifier: Optional[str]) -> List[Optional[str]]:
+    """Returns the module, the class and the method of a test identifier."""
+    parts = (identifier or '').split('.')
+    if len(parts) < 3:
+        return [None, None, identifier]
+    return ['.'.join(parts[:-2]), parts[-2], parts[-1]]
+
+
+class TaskTableWriter(object):
+    """Writes task rows into a Parquet file, or an Arrow IPC stream. The Arrow stream format is used instead of the
+    file format because it allows each record batch to carry its own dictionaries."""
+
+    def __init__(self, path: str, fmt: str = 'parquet', batch_size: int = 10000) -> None:
+        if fmt not in FORMATS:
+            raise ValueError(f'Unsupported format {fmt}. Use one of {", ".join(FORMATS)}.')
+        try:
+            import pyarrow
+        except ImportError:
+            raise ValueError('The pyarrow package is required to export the tasks in columnar formats.')
+
+        self.batch_size = batch_size
+        self.rows = 0
+        self._columns = {name: [] for name, _ in COLUMNS}
+
+        string = pyarrow.string()
+        dictionary = pyarrow.dictionary(pyarrow.int32(), string)
+        types = {'run_creation': pyarrow.timestamp('s'), 'duration': pyarrow.int64()}
+        self.schema = pyarrow.schema([pyarrow.field(name, dictionary if encoded else types.get(name, string))
+                                      for name, encoded in COLUMNS])
+
+        self._sink = None
+        if fmt == 'parquet':
+            import pyarrow.parquet
+            self._writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+            self._write = lambda batch: self._writer.write_table(pyarrow.Table.from_batches([batch]))
+        else:
+            self._sink = pyarrow.OSFile(path, 'wb')
+            self._writer = pyarrow.ipc.new_stream(self._sink, self.schema)
+            self._write = self._writer.write_batch
+
+    def __enter__(self) -> 'TaskTableWriter':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def add(self, run: Run, task: Task) -> None:
+        columns = self._columns
+        # the ids are integers in the task store while the columns are strings
+        columns['run_id'].append(str(run.id))
+        columns['run_name'].append(run.name)
+        columns['run_image'].append(run.settings.get('a01.reserved.imagename', None))
+        columns['run_owner'].append(run.owner)
+        columns['run_product'].append(run.details.get('a01.reserved.product', None))
+        columns['run_creation'].append(run.creation)
+        columns['task_id'].append(str(task.id))
+        columns['identifier'].append(task.identifier)
+        module, cls, method = split_identifier(task.identifier)
+        columns['module'].append(module)
+        columns['class'].append(cls)
+        columns['method'].append(method)
+        columns['status'].append(task.status)
+        columns['result'].append(task.result)
+        columns['agent'].append(task.result_details.get('agent', None))
+        columns['duration'].append(task.duration)
+
+        self.rows += 1
+        if len(columns['task_id']) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._columns['task_id']:
+            return
+
+        import pyarrow
+        arrays = []
+        for field in self.schema:
+            values = self._columns[field.name]
+            if pyarrow.types.is_dictionary(field.type):
+                arrays.append(pyarrow.array(values, type=pyarrow.string()).dictionary_encode())
+            else:
+                arrays.append(pyarrow.array(values, type=field.type))
+            values.clear()
+
+        self._write(pyarrow.RecordBatch.from_arrays(arrays, schema=self.schema))
+
+    def close(self) -> None:
+        if self._writer is None:
+            return
+        try:
+            self.flush()
+        finally:
+            self._writer.close()
+            self._writer = None
+            if self._sink:
+                self._sink.close()
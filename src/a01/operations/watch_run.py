@@ -0,0 +1,223 @@
+import asyncio
+import time
+from logging import getLogger
+from typing import List, Callable, AsyncIterator, Optional
+
+from aiohttp import ClientError
+
+from a01.models import Task
+from a01.transport import AsyncSession
+from a01.transport.codec import loads
+from a01.transport.events import subscribe_async, EventStreamUnsupported
+
+FINISHED_RUN_STATUSES = ('Completed', 'Canceled', 'Failed')
+MIN_POLL_INTERVAL = 5  # seconds
+MAX_POLL_INTERVAL = 60  # seconds
+
+
+class RunProgress(object):  # pylint: disable=too-few-public-methods
+    def __init__(self, tasks: List[Task], parallelism: int = 1, run_status: str = None) -> None:
+        self.run_status = run_status
+        self.total = len(tasks)
+        self.completed = 0
+        self.passed = 0
+        self.failed = 0
+        self.errors = 0
+        completed_duration = 0
+
+        for task in tasks:
+            if not task.is_completed:
+                continue
+            self.completed += 1
+            completed_duration += task.duration or 0
+            if task.result == 'Passed':
+                self.passed += 1
+            elif task.result == 'Failed':
+                self.failed += 1
+            elif task.result == 'Error':
+                self.errors += 1
+
+        # The estimation assumes the remaining tasks take as long as the completed ones in average and the run keeps
+        # executing at its configured parallelism.
+        self.eta = None  # seconds
+        if self.completed:
+            average = completed_duration / self.completed / 1000
+            self.eta = average * (self.total - self.completed) / max(parallelism, 1)
+
+    @property
+    def is_finished(self) -> bool:
+        """Whether all the tasks completed. A run without tasks is finished once its own status is."""
+        return self.run_status in FINISHED_RUN_STATUSES or (self.total > 0 and self.completed == self.total)
+
+    @property
+    def failures(self) -> int:
+        return self.failed + self.errors
+
+    @property
+    def succeeded(self) -> bool:
+        return self.is_finished and self.completed == self.total and self.failures == 0
+
+
+def backoff_interval(interval: float, changed: bool, minimum: float = MIN_POLL_INTERVAL,
+                     maximum: float = MAX_POLL_INTERVAL, factor: float = 1.5) -> float:
+    """The next polling interval. It starts short and backs off while nothing changes, any progress resets it."""
+    return minimum if changed else min(interval * factor, maximum)
+
+
+class TaskPoller(object):
+    """Follows the tasks of a run. It subscribes to the task changes when the task store offers the event stream,
+    otherwise it polls with conditional requests so unchanged task list is neither transferred nor parsed."""
+
+    UPDATE_FIELDS = ('status', 'result', 'duration', 'result_details')
+
+    def __init__(self, run_id: str) -> None:
+        self.run_id = run_id
+        self.etag = None
+        self.tasks = []  # type: List[Task]
+        self.last_poll = None
+        self.last_event_id = None
+        self.subscribed = False
+        self._index = {}
+
+    async def poll(self, session: AsyncSession) -> bool:
+        """Refresh the tasks. Returns True if the tasks changed."""
+        self.last_poll = time.time()
+        etag, body = await session.get_json_if_changed(f'run/{self.run_id}/tasks', self.etag)
+        if body is None:
+            return False
+
+        tasks = [Task.from_dict(each) for each in body]
+        changed = etag is None or [(t.status, t.result) for t in tasks] != [(t.status, t.result) for t in self.tasks]
+        self.etag = etag
+        self.tasks = tasks
+        self._index = {task.id: task for task in tasks}
+        return changed
+
+    def apply(self, data: dict) -> Optional[bool]:
+        """Apply a task change received from the event stream. Returns whether the task changed, or None if the change
+        can't be applied and the tasks need a refresh."""
+        task = self._index.get(str(data.get('id', None)))
+        if task is None:
+            try:
+                task = Task.from_dict(data)
+            except (KeyError, TypeError):
+                return None
+            self.tasks.append(task)
+            self._index[task.id] = task
+            return True
+
+        before = (task.status, task.result)
+        for field in self.UPDATE_FIELDS:
+            if field in data:
+                setattr(task, field, (data[field] or {}) if field == 'result_details' else data[field])
+        return (task.status, task.result) != before
+
+    async def subscribe(self, session: AsyncSession) -> AsyncIterator[bool]:
+        """Yields whether the tasks changed each time the task store pushes a change. The tasks are refreshed by a
+        conditional poll after a reconnect. Raises EventStreamUnsupported if the task store has no event stream."""
+        try:
+            async for event in subscribe_async(session, f'run/{self.run_id}/events', self.last_event_id):
+                self.subscribed = True
+                if event is None:
+                    yield await self.poll(session)
+                    continue
+
+                self.last_event_id = event.id
+                if event.name not in ('message', 'task'):
+                    continue
+                try:
+                    changed = self.apply(loads(event.data))
+                except (ValueError, AttributeError):
+                    changed = None
+                yield changed if changed is not None else await self.poll(session)
+        finally:
+            self.subscribed = False
+
+
+async def watch_run_async(run_id: str, session: AsyncSession, parallelism: int = 1,
+                          on_progress: Callable[[RunProgress], None] = None, fail_fast: int = None,
+                          min_interval: float = MIN_POLL_INTERVAL, max_interval: float = MAX_POLL_INTERVAL,
+                          max_empty_polls: int = 20) -> RunProgress:
+    """Follow the run till all its tasks complete, the run itself finishes, or the number of failures reaches
+    fail_fast. The task changes are pushed by the task store when it supports the subscription, otherwise the tasks
+    are polled. The run status is polled along since a canceled or failed run leaves its tasks unfinished. The watch
+    gives up after max_empty_polls polls without a task."""
+    poller = TaskPoller(run_id)
+    interval = min_interval
+    run_status = None
+    empty_polls = 0
+    subscribe = True
+
+    async def _refresh_status() -> None:
+        nonlocal run_status
+        run_status = (await session.get_json(f'run/{run_id}') or {}).get('status', None)
+
+    async def _poll() -> bool:
+        nonlocal empty_polls
+        changed = await poller.poll(session)
+        await _refresh_status()
+        if not poller.tasks:
+            empty_polls += 1
+        return changed
+
+    def _report() -> Optional[RunProgress]:
+        progress = RunProgress(poller.tasks, parallelism, run_status)
+        if on_progress:
+            on_progress(progress)
+        if progress.is_finished or (fail_fast and progress.failures >= fail_fast):
+            return progress
+        if empty_polls >= max_empty_polls:
+            getLogger(__name__).warning(f'Run {run_id} has no task after {empty_polls} polls. Stop watching it.')
+            return progress
+        return None
+
+    async def _follow_events() -> Optional[RunProgress]:
+        async for event_changed in poller.subscribe(session):
+            result = _report() if event_changed else None
+            if result:
+                return result
+        return None
+
+    async def _follow_status() -> RunProgress:
+        while run_status not in FINISHED_RUN_STATUSES:
+            await asyncio.sleep(max_interval)
+            await _refresh_status()
+        return _report()
+
+    while True:
+        changed = await _poll()
+        result = _report()
+        if result:
+            return result
+
+        # a subscription only pushes the changes of the tasks, so it waits for the run to have some and the run status
+        # is polled along at the longest interval
+        if subscribe and poller.tasks:
+            followers = [asyncio.ensure_future(_follow_events()), asyncio.ensure_future(_follow_status())]
+            try:
+                done, _ = await asyncio.wait(followers, return_when=asyncio.FIRST_COMPLETED)
+                result = done.pop().result()
+                if result:
+                    return result
+            except EventStreamUnsupported:
+                pass
+            except (ClientError, asyncio.TimeoutError) as ex:
+                getLogger(__name__).warning(f'Lost the subscription to run {run_id}: {ex!r}. Polling instead.')
+            finally:
+                for follower in followers:
+                    follower.cancel()
+            subscribe = False
+
+        interval = backoff_interval(interval, changed, min_interval, max_interval)
+        await asyncio.sleep(interval)
+
+
+def wait_run(run_id: str, parallelism: int = 1, on_progress: Callable[[RunProgress], None] = None,
+             fail_fast: int = None, timeout: float = None) -> RunProgress:
+    """Follow the run till it finishes. Raises asyncio.TimeoutError if it doesn't finish in the timeout seconds."""
+    async def _wait() -> RunProgress:
+        async with AsyncSession() as session:
+            return await asyncio.wait_for(watch_run_async(run_id, session, parallelism, on_progress, fail_fast),
+                                          timeout)
+
+    return asyncio.get_event_loop().run_until_complete(_wait())
@@ -6,3 +6,5 @@ from .task_output import TaskBriefOutput, TaskLogOutput, TasksSummary, TasksOutp
 from .table_output import TableOutput
 from .sequential_output import SequentialOutput
 from .json_output import JsonOutput
+from .progress_output import ProgressBar
+from .task_tree_output import TaskTreeOutput
@@ -0,0 +1,35 @@
+import sys
+
+import colorama
+
+
+def format_duration(seconds: float) -> str:
+    if seconds is None:
+        return '--'
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f'{hours}h{minutes:02d}m' if hours else f'{minutes}m{seconds:02d}s'
+
+
+class ProgressBar(object):
+    """Renders the progress of a run on a single line of stderr."""
+
+    def __init__(self, width: int = 30, stream=None) -> None:
+        self.width = width
+        self.stream = stream or sys.stderr
+        self._rendered = False
+
+    def update(self, progress: 'a01.operations.RunProgress') -> None:
+        done = int(self.width * progress.completed / progress.total) if progress.total else 0
+        gauge = '#' * done + '.' * (self.width - done)
+        self.stream.write(f'\r[{gauge}] {progress.completed}/{progress.total} '
+                          f'{colorama.Fore.GREEN}Pass: {progress.passed}{colorama.Fore.RESET} | '
+                          f'{colorama.Fore.RED}Fail: {progress.failed}{colorama.Fore.RESET} | '
+                          f'Error: {progress.errors} | ETA: {format_duration(progress.eta)}  ')
+        self.stream.flush()
+        self._rendered = True
+
+    def close(self) -> None:
+        if self._rendered:
+            self.stream.write('\n')
+            self.stream.flush()
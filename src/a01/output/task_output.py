@@ -1,5 +1,5 @@
 from itertools import zip_longest
-from typing import List, Tuple, Generator
+from typing import List, Tuple, Generator, Dict
 from collections import defaultdict
 
 import colorama
@@ -24,10 +24,11 @@ class TaskLogOutput(TableOutput):
 
 
 class TasksSummary(TableOutput):
-    def __init__(self, tasks: List[Task]):
-        statuses = defaultdict(lambda: 0)
-        results = defaultdict(lambda: 0)
-        for task in tasks:
+    def __init__(self, tasks: List[Task] = None, statuses: Dict[str, int] = None, results: Dict[str, int] = None):
+        """Summarize the tasks, or the counts of the tasks per status and per result."""
+        statuses = defaultdict(lambda: 0, statuses or {})
+        results = defaultdict(lambda: 0, results or {})
+        for task in tasks or []:
             statuses[task.status] = statuses[task.status] + 1
             results[task.result] = results[task.result] + 1
 
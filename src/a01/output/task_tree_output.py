@@ -0,0 +1,82 @@
+import re
+from typing import List, Tuple, Callable, Dict, Generator
+
+from a01.output.table_output import TableOutput
+from a01.models import Task
+
+
+class TaskTreeNode(object):  # pylint: disable=too-few-public-methods
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.children = {}  # type: Dict[str, TaskTreeNode]
+        self.total = 0
+        self.passed = 0
+        self.failed = 0
+        self.errors = 0
+        self.duration = 0
+
+    def add(self, task: Task) -> None:
+        self.total += 1
+        self.duration += task.duration or 0
+        if task.result == 'Passed':
+            self.passed += 1
+        elif task.result == 'Failed':
+            self.failed += 1
+        elif task.result == 'Error':
+            self.errors += 1
+
+
+def get_group_depth(group_by: str) -> Callable[[List[str]], int]:
+    """Returns a function giving the number of leading identifier parts to group a task by. The module of a test is
+    its identifier without the class and the method, the class is the identifier without the method."""
+    if group_by == 'module':
+        return lambda parts: max(len(parts) - 2, 1)
+    if group_by == 'class':
+        return lambda parts: max(len(parts) - 1, 1)
+
+    match = re.match(r'^depth=(\d+)$', group_by or '')
+    if match and int(match.group(1)) > 0:
+        depth = int(match.group(1))
+        return lambda parts: min(depth, len(parts))
+
+    raise ValueError(f'Invalid group {group_by}. Accepted values: module, class and depth=N.')
+
+
+class TaskTreeOutput(TableOutput):
+    """Rolls up the tasks into a tree of their dotted identifiers, cut at the group level. A chain of single child
+    nodes without tasks of their own is collapsed into one row."""
+
+    def __init__(self, tasks: List[Task], group_by: str) -> None:
+        self.root = TaskTreeNode('')
+        group_depth = get_group_depth(group_by)
+
+        for task in tasks:
+            parts = task.identifier.split('.')
+            node = self.root
+            node.add(task)
+            for part in parts[:group_depth(parts)]:
+                child = node.children.get(part, None)
+                if child is None:
+                    child = node.children[part] = TaskTreeNode(part)
+                child.add(task)
+                node = child
+
+        super(TaskTreeOutput, self).__init__(list(self.get_table_view()), self.get_table_header())
+
+    def get_table_view(self) -> Generator[Tuple, None, None]:
+        stack = [(child, 0) for child in sorted(self.root.children.values(), key=lambda n: n.name, reverse=True)]
+        while stack:
+            node, level = stack.pop()
+            name = node.name
+            # a node with tasks of its own, i.e. cut at it by the group level, keeps its row so they are counted
+            while len(node.children) == 1 and next(iter(node.children.values())).total == node.total:
+                node = next(iter(node.children.values()))
+                name = f'{name}.{node.name}'
+
+            yield ('  ' * level + name, node.total, node.passed, node.failed, node.errors, node.duration)
+            stack.extend((child, level + 1)
+                         for child in sorted(node.children.values(), key=lambda n: n.name, reverse=True))
+
+    @staticmethod
+    def get_table_header() -> Tuple[str, ...]:
+        return 'Group', 'Tasks', 'Pass', 'Fail', 'Error', 'Duration(ms)'
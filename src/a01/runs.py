@@ -1,25 +1,130 @@
-from a01.common import get_logger, A01Config
+import sys
+import datetime
+from typing import List
+
+from aiohttp import ClientError
+
+from a01.common import get_logger
 from a01.cli import cmd, arg
-from a01.communication import session
+from a01.models import Run, RunsView
+from a01.operations import iter_runs_async, iter_bounded
+from a01.output import output_in_table
+from a01.transport import AsyncSession
 
 # pylint: disable=too-many-arguments, invalid-name
 
 logger = get_logger(__name__)
 
 
+async def select_runs_async(session: AsyncSession, owner: str = None, older_than: int = None,
+                            status: str = None) -> List[Run]:
+    """Page through the runs and returns those match all the given selectors."""
+    threshold = datetime.datetime.utcnow() - datetime.timedelta(days=older_than) if older_than is not None else None
+    results = []
+    async for run in iter_runs_async(session, owner=owner):
+        if threshold and run.creation >= threshold:
+            continue
+        if status and (run.status or '').lower() != status.lower():
+            continue
+        results.append(run)
+    return results
+
+
+def _confirm(message: str) -> bool:
+    try:
+        return input(f'{message} [y/N] ').strip().lower() in ('y', 'yes')
+    except EOFError:
+        return False
+
+
+async def apply_to_runs_async(method: str, path_format: str, verb: str, run_ids: List[str], owner: str,
+                              older_than: int, status: str, dry_run: bool, yes: bool, concurrency: int) -> None:
+    selectors = owner or older_than is not None or status
+    if older_than is not None and older_than <= 0:
+        logger.error('--older-than must be a positive number of days.')
+        sys.exit(1)
+    if run_ids and selectors:
+        logger.error('Run ids and --owner, --older-than or --status are mutually exclusive.')
+        sys.exit(1)
+    elif not run_ids and not selectors:
+        logger.error('Specify the run ids, or select the runs through --owner, --older-than or --status.')
+        sys.exit(1)
+
+    async with AsyncSession() as session:
+        if selectors:
+            runs = await select_runs_async(session, owner, older_than, status)
+            run_ids = [run.id for run in runs]
+            if dry_run or not yes:
+                view = RunsView(runs)
+                output_in_table(view.get_table_view(), headers=view.get_table_header())
+        elif dry_run:
+            output_in_table([(run_id,) for run_id in run_ids], headers=('Id',))
+
+        if dry_run:
+            print(f'\n{len(run_ids)} runs would be {verb}.')
+            return
+
+        # the selected runs are only known at this point, so they are confirmed before any is changed
+        if selectors and run_ids and not yes:
+            if not sys.stdin.isatty():
+                logger.error(f'{len(run_ids)} runs are selected. Add --yes to confirm, or --dry-run to only list them.')
+                sys.exit(1)
+            if not _confirm(f'\n{len(run_ids)} runs will be {verb}. Continue?'):
+                sys.exit(1)
+
+        async def _apply(run_id: str):
+            try:
+                await session.send(method, path_format.format(run_id))
+                return run_id, None
+            except ClientError as ex:
+                return run_id, str(ex) or type(ex).__name__
+
+        failures = []
+        done = 0
+        async for run_id, error in iter_bounded((_apply(run_id) for run_id in run_ids), concurrency):
+            done += 1
+            if error:
+                failures.append((run_id, error))
+            sys.stderr.write(f'\r{verb.capitalize()} {done - len(failures)}/{len(run_ids)} runs. '
+                             f'Failures: {len(failures)}')
+            sys.stderr.flush()
+        sys.stderr.write('\n')
+
+        if failures:
+            output_in_table(sorted(failures), headers=('Id', 'Error'))
+            sys.exit(1)
+
 
-@cmd('restart run', desc='Restart a run. This command is used when the Kubernetes Job behaves abnormally. It will '
-                         'create new group of controller job and test job with the same settings.')
-@arg('run_id', help='Then run to restart', positional=True)
-def restart_run(run_id: str):
-    config = A01Config()
-    resp = session.post(f'{config.endpoint_uri}/run/{run_id}/restart')
-    resp.raise_for_status()
+@cmd('restart run', desc='Restart runs. This command is used when the Kubernetes Job behaves abnormally. It will '
+                         'create new group of controller job and test job with the same settings. The runs are given '
+                         'by their ids or selected through --owner, --older-than and --status, which asks for a '
+                         'confirmation unless --yes is given.')
+@arg('run_ids', help='The runs to restart.', positional=True, nargs='*')
+@arg('owner', help='Select the runs of the owner.')
+@arg('older_than', option=['--older-than'], help='Select the runs created more than the given number of days ago.')
+@arg('status', help='Select the runs in the given status.')
+@arg('dry_run', option=['--dry-run'], help='List the runs to be restarted without restarting them.')
+@arg('yes', option=('-y', '--yes'),
+     help='Restart the runs selected through --owner, --older-than or --status without a confirmation prompt.')
+@arg('concurrency', option=('-c', '--concurrency'), help='The number of runs restarted at the same time.')
+async def restart_run(run_ids: [str] = None, owner: str = None, older_than: int = None, status: str = None,
+                      dry_run: bool = False, yes: bool = False, concurrency: int = 8) -> None:
+    await apply_to_runs_async('POST', 'run/{}/restart', 'restarted', run_ids, owner, older_than, status, dry_run,
+                              yes, concurrency)
 
 
-@cmd('delete run', desc='Delete a run as well as the tasks associate with it.')
-@arg('run_id', help='Ids of the run to be deleted.', positional=True)
-def delete_run(run_id: str) -> None:
-    config = A01Config()
-    resp = session.delete(f'{config.endpoint_uri}/run/{run_id}')
-    resp.raise_for_status()
+@cmd('delete run', desc='Delete runs as well as the tasks associate with them. The runs are given by their ids or '
+                        'selected through --owner, --older-than and --status, which asks for a confirmation unless '
+                        '--yes is given.')
+@arg('run_ids', help='Ids of the run to be deleted.', positional=True, nargs='*')
+@arg('owner', help='Select the runs of the owner.')
+@arg('older_than', option=['--older-than'], help='Select the runs created more than the given number of days ago.')
+@arg('status', help='Select the runs in the given status.')
+@arg('dry_run', option=['--dry-run'], help='List the runs to be deleted without deleting them.')
+@arg('yes', option=('-y', '--yes'),
+     help='Delete the runs selected through --owner, --older-than or --status without a confirmation prompt.')
+@arg('concurrency', option=('-c', '--concurrency'), help='The number of runs deleted at the same time.')
+async def delete_run(run_ids: [str] = None, owner: str = None, older_than: int = None, status: str = None,
+                     dry_run: bool = False, yes: bool = False, concurrency: int = 8) -> None:
+    await apply_to_runs_async('DELETE', 'run/{}', 'deleted', run_ids, owner, older_than, status, dry_run, yes,
+                              concurrency)
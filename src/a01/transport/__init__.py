@@ -1,33 +1,122 @@
-import sys
 from logging import getLogger
-from typing import Union, List
+from typing import Union, List, Tuple, Optional, Set
 
-from aiohttp import ClientSession, ContentTypeError
+from aiohttp import ClientSession, ClientResponseError, ContentTypeError
 
-from a01.auth import AuthSettings
+from a01.auth import AuthSettings, AuthenticationError
 from a01.common import A01Config
+from a01.transport.cassette import get_cassette, CassetteRequest
+from a01.transport.codec import loads, ACCEPT_ENCODING
 
 
 class AsyncSession(ClientSession):
-    def __init__(self) -> None:
-        super(AsyncSession, self).__init__()
+    def __init__(self, endpoint_uri: str = None, anonymous: bool = False, **kwargs) -> None:
+        """An anonymous session sends no credential, e.g. to a local stub task store."""
+        super(AsyncSession, self).__init__(**kwargs)
+        self.anonymous = anonymous
         self.auth = AuthSettings()
-        self.endpoint = A01Config().ensure_config().endpoint_uri
+        self.cassette = get_cassette()
+        if self.cassette and self.cassette.replaying:
+            self.endpoint = endpoint_uri or self.cassette.endpoint
+        else:
+            self.endpoint = endpoint_uri or A01Config().ensure_config().endpoint_uri
+            if self.cassette:
+                self.cassette.set_endpoint(self.endpoint)
         self.logger = getLogger(__name__)
+        self._capabilities = None  # type: Set[str]
+
+    def request(self, method: str, url, **kwargs):
+        """Send the request through the cassette when recording or replaying. The shortcuts, e.g. get and post, are
+        routed here as well."""
+        if not self.cassette:
+            return super(AsyncSession, self).request(method, url, **kwargs)
+        return CassetteRequest(self.cassette, super(AsyncSession, self).request, method, url, **kwargs)
+
+    def get(self, url, **kwargs):  # pylint: disable=arguments-differ
+        return self.request('GET', url, **kwargs)
+
+    def head(self, url, **kwargs):  # pylint: disable=arguments-differ
+        kwargs.setdefault('allow_redirects', False)
+        return self.request('HEAD', url, **kwargs)
+
+    def post(self, url, **kwargs):  # pylint: disable=arguments-differ
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url, **kwargs):  # pylint: disable=arguments-differ
+        return self.request('PUT', url, **kwargs)
+
+    def patch(self, url, **kwargs):  # pylint: disable=arguments-differ
+        return self.request('PATCH', url, **kwargs)
+
+    def delete(self, url, **kwargs):  # pylint: disable=arguments-differ
+        return self.request('DELETE', url, **kwargs)
 
     def get_path(self, path: str) -> str:
         return f'{self.endpoint}/{path}'
 
-    async def get_json(self, path: str) -> Union[List, dict, float, str, None]:
+    def get_headers(self) -> dict:
+        if self.anonymous or (self.cassette and self.cassette.replaying):
+            return {'Accept-Encoding': ACCEPT_ENCODING}
+
         if self.auth.is_expired and not self.auth.refresh():
-            self.logger.error('Fail to refresh access token. Please login again.')
-            sys.exit(1)
+            raise AuthenticationError('Fail to refresh access token. Please login again.')
+
+        return {'Authorization': self.auth.access_token, 'Accept-Encoding': ACCEPT_ENCODING}
+
+    async def get_json(self, path: str) -> Union[List, dict, float, str, None]:
+        async with self.get(self.get_path(path), headers=self.get_headers()) as resp:
+            try:
+                return await resp.json(loads=loads)
+            except ContentTypeError:
+                self.logger.error('Incorrect content type')
+                self.logger.error(await resp.text())
+                raise
+
+    async def get_json_if_supported(self, path: str) -> Union[List, dict, None]:
+        """Returns the JSON body, or None if the task store doesn't support the request, i.e. it responds 400 or 501.
+        Any other error, e.g. 404 for a missing run, raises ClientResponseError."""
+        async with self.get(self.get_path(path), headers=self.get_headers()) as resp:
+            if resp.status in (400, 501):
+                return None
+            resp.raise_for_status()
+            return await resp.json(loads=loads)
+
+    async def get_capabilities(self) -> Set[str]:
+        """Returns the optional features the task store advertises. An older store advertises nothing."""
+        if self._capabilities is None:
+            try:
+                body = await self.get_json_if_supported('capabilities')
+            except ClientResponseError as ex:
+                if ex.status not in (404, 405):
+                    raise
+                body = None  # the store predates the capabilities
+            if isinstance(body, dict):
+                body = body.get('features', [])
+            self._capabilities = set(body) if isinstance(body, list) else set()
+        return self._capabilities
+
+    async def post_json(self, path: str, data: Union[List, dict]) -> Union[List, dict, None]:
+        async with self.post(self.get_path(path), json=data, headers=self.get_headers()) as resp:
+            resp.raise_for_status()
+            return await resp.json(loads=loads)
+
+    async def send(self, method: str, path: str) -> None:
+        """Send a request which expects no content back. Raise ClientResponseError if the request fails."""
+        async with self.request(method, self.get_path(path), headers=self.get_headers()) as resp:
+            resp.raise_for_status()
 
-        headers = {'Authorization': self.auth.access_token}
+    async def get_json_if_changed(self, path: str, etag: str = None) -> Tuple[Optional[str], Union[List, dict, None]]:
+        """Conditional GET. Returns the new ETag and the JSON body, or the same ETag and None if the resource is not
+        modified since the given ETag."""
+        headers = self.get_headers()
+        if etag:
+            headers['If-None-Match'] = etag
 
         async with self.get(self.get_path(path), headers=headers) as resp:
+            if resp.status == 304:
+                return etag, None
             try:
-                return await resp.json()
+                return resp.headers.get('ETag', None), await resp.json(loads=loads)
             except ContentTypeError:
                 self.logger.error('Incorrect content type')
                 self.logger.error(await resp.text())
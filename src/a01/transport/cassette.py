@@ -0,0 +1,258 @@
+import os
+import gzip
+import json
+import time
+import atexit
+import asyncio
+import base64
+import threading
+from collections import defaultdict, deque
+from typing import Optional, Dict, Deque, Callable, List, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from aiohttp import ClientResponseError
+from multidict import CIMultiDict
+
+from a01.common import get_logger
+
+RECORD_ENV = 'A01_RECORD'
+REPLAY_ENV = 'A01_REPLAY'
+REPLAY_SPEED_ENV = 'A01_REPLAY_SPEED'
+
+# the parameters of the Azure storage shared access signatures, which grant access to whoever holds the URL
+SAS_PARAMETERS = ('sig', 'se', 'st', 'sp', 'sv', 'sr', 'spr', 'si', 'ss', 'srt', 'skoid', 'sktid', 'skt', 'ske',
+                  'sks', 'skv')
+
+
+def scrub_url(url: str) -> str:
+    """Redact the shared access signature in the query string of the URL."""
+    parts = urlsplit(url)
+    if not parts.query:
+        return url
+    query = [(key, 'REDACTED' if key.lower() in SAS_PARAMETERS else value)
+             for key, value in parse_qsl(parts.query, keep_blank_values=True)]
+    return urlunsplit(parts._replace(query=urlencode(query, safe=',')))
+
+
+class Interaction(object):  # pylint: disable=too-few-public-methods
+    def __init__(self, method: str, url: str, status: int, headers: List[Tuple[str, str]], body: bytes,
+                 elapsed: float) -> None:
+        self.method = method.upper()
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.elapsed = elapsed
+
+    def to_dict(self) -> dict:
+        result = {'method': self.method, 'url': self.url, 'status': self.status, 'headers': self.headers,
+                  'elapsed': round(self.elapsed, 6)}
+        try:
+            result['text'] = self.body.decode('utf-8')
+        except UnicodeDecodeError:
+            result['base64'] = base64.b64encode(self.body).decode('ascii')
+        return result
+
+    @staticmethod
+    def from_dict(data: dict) -> 'Interaction':
+        body = data['text'].encode('utf-8') if 'text' in data else base64.b64decode(data.get('base64', ''))
+        # the headers are a list of pairs to keep the repeated ones, the early recordings have a mapping
+        headers = data['headers'].items() if isinstance(data['headers'], dict) else data['headers']
+        return Interaction(data['method'], data['url'], data['status'], [tuple(each) for each in headers], body,
+                           data['elapsed'])
+
+
+class Cassette(object):
+    """Records the HTTP interactions to a gzip compressed JSON lines file, or replays them from it. The file also holds
+    the A01 endpoint so a replay doesn't need the local configuration. The shared access signatures in the URLs are
+    redacted before they are written. Replayed responses are matched by method and redacted URL in the recorded order,
+    and delayed by the recorded elapsed time divided by the speed. Speed 0 disables the delay."""
+
+    def __init__(self, path: str, replay: bool, speed: float = 1.0) -> None:
+        self.path = path
+        self.replaying = replay
+        self.speed = speed
+        self.endpoint = None
+        self._lock = threading.Lock()
+        self._interactions = defaultdict(deque)  # type: Dict[tuple, Deque[Interaction]]
+        self._file = None
+
+        if replay:
+            with gzip.open(path, 'rt', encoding='utf-8') as handler:
+                for line in handler:
+                    data = json.loads(line)
+                    if 'endpoint' in data:
+                        self.endpoint = data['endpoint']
+                        continue
+                    interaction = Interaction.from_dict(data)
+                    self._interactions[(interaction.method, interaction.url)].append(interaction)
+
+    def _write(self, data: dict) -> None:
+        if not self._file:
+            self._file = gzip.open(self.path, 'wt', encoding='utf-8')
+            atexit.register(self.close)
+        self._file.write(json.dumps(data, separators=(',', ':')) + '\n')
+
+    def set_endpoint(self, endpoint: str) -> None:
+        with self._lock:
+            if self.replaying or self.endpoint == endpoint:
+                return
+            self.endpoint = endpoint
+            self._write({'endpoint': endpoint})
+
+    def record(self, interaction: Interaction) -> None:
+        interaction.url = scrub_url(interaction.url)
+        with self._lock:
+            self._write(interaction.to_dict())
+
+    def find(self, method: str, url: str) -> Interaction:
+        """Returns the next recorded interaction of the request. The last one is repeated once they are exhausted."""
+        url = scrub_url(url)
+        with self._lock:
+            queue = self._interactions.get((method.upper(), url), None)
+            if not queue:
+                raise KeyError(f'No recorded response for {method.upper()} {url} in {self.path}')
+            return queue.popleft() if len(queue) > 1 else queue[0]
+
+    def get_delay(self, interaction: Interaction) -> float:
+        return interaction.elapsed / self.speed if self.speed > 0 else 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+
+class ReplayResponse(object):
+    """A stand-in of aiohttp.ClientResponse serving a recorded interaction."""
+
+    def __init__(self, interaction: Interaction) -> None:
+        self.method = interaction.method
+        self.url = interaction.url
+        self.status = interaction.status
+        self.headers = CIMultiDict(interaction.headers)
+        self._body = interaction.body
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def text(self, encoding: str = 'utf-8') -> str:
+        return self._body.decode(encoding)
+
+    async def json(self, loads=json.loads, **_) -> object:
+        return loads(self._body.decode('utf-8')) if self._body else None
+
+    def raise_for_status(self) -> None:
+        if self.status >= 400:
+            raise ClientResponseError(None, (), status=self.status, message=f'Replayed {self.status}',
+                                      headers=self.headers)
+
+    def release(self) -> None:
+        pass
+
+    async def wait_for_close(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class CassetteRequest(object):
+    """A request of an aiohttp session through the cassette. Like the object ClientSession.request returns, it is
+    either awaited for the response or used as an async context manager releasing the response on exit."""
+
+    def __init__(self, cassette: Cassette, send: Callable, method: str, url: str, **kwargs) -> None:
+        self.cassette = cassette
+        self._send = send
+        self._method = method
+        self._url = str(url)
+        self._kwargs = kwargs
+        self._resp = None
+
+    async def _request(self):
+        if self.cassette.replaying:
+            interaction = self.cassette.find(self._method, self._url)
+            delay = self.cassette.get_delay(interaction)
+            if delay:
+                await asyncio.sleep(delay)
+            return ReplayResponse(interaction)
+
+        start = time.time()
+        resp = await self._send(self._method, self._url, **self._kwargs)
+        body = await resp.read()
+        self.cassette.record(Interaction(self._method, self._url, resp.status, list(resp.headers.items()), body,
+                                         time.time() - start))
+        return resp
+
+    def __await__(self):
+        return self._request().__await__()
+
+    async def __aenter__(self):
+        self._resp = await self._request()
+        return self._resp
+
+    async def __aexit__(self, *_) -> None:
+        self._resp.release()
+
+
+class CassetteAdapter(HTTPAdapter):
+    """A requests transport adapter which records the responses to, or replays them from, the cassette."""
+
+    def __init__(self, cassette: Cassette) -> None:
+        super(CassetteAdapter, self).__init__()
+        self.cassette = cassette
+
+    # pylint: disable=arguments-differ
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        if self.cassette.replaying:
+            interaction = self.cassette.find(request.method, request.url)
+            delay = self.cassette.get_delay(interaction)
+            if delay:
+                time.sleep(delay)
+
+            resp = requests.Response()
+            resp.status_code = interaction.status
+            resp.headers = CaseInsensitiveDict(interaction.headers)
+            resp._content = interaction.body  # pylint: disable=protected-access
+            resp.url = request.url
+            resp.request = request
+            resp.encoding = requests.utils.get_encoding_from_headers(resp.headers)
+            return resp
+
+        start = time.time()
+        resp = super(CassetteAdapter, self).send(request, **kwargs)
+        self.cassette.record(Interaction(request.method, request.url, resp.status_code, list(resp.headers.items()),
+                                         resp.content, time.time() - start))
+        return resp
+
+
+_CASSETTE = None  # type: Optional[Cassette]
+_CASSETTE_LOADED = False
+
+
+def get_cassette() -> Optional[Cassette]:
+    """Returns the process wide cassette configured through A01_RECORD or A01_REPLAY, or None. It is resolved when the
+    modules are imported, so an invalid configuration is reported as a warning rather than failing every command."""
+    global _CASSETTE, _CASSETTE_LOADED  # pylint: disable=global-statement
+    if not _CASSETTE_LOADED:
+        _CASSETTE_LOADED = True
+        logger = get_logger(__name__)
+        if os.environ.get(REPLAY_ENV):
+            speed = os.environ.get(REPLAY_SPEED_ENV, '1')
+            try:
+                speed = float(speed)
+            except ValueError:
+                logger.warning(f'Invalid {REPLAY_SPEED_ENV} {speed!r}. Replay at speed 1.')
+                speed = 1.0
+            try:
+                _CASSETTE = Cassette(os.environ[REPLAY_ENV], replay=True, speed=speed)
+            except (IOError, EOFError, ValueError, KeyError) as ex:
+                logger.warning(f'Fail to load the cassette {os.environ[REPLAY_ENV]}: {ex}. The requests are not '
+                               f'replayed.')
+        elif os.environ.get(RECORD_ENV):
+            _CASSETTE = Cassette(os.environ[RECORD_ENV], replay=False)
+    return _CASSETTE
@@ -0,0 +1,26 @@
+"""The encodings and the JSON decoder used for the task store responses. The faster decoders are used when they are
+installed."""
+import json
+
+try:
+    import orjson
+
+    loads = orjson.loads  # pylint: disable=invalid-name, no-member
+except ImportError:
+    try:
+        import ujson
+
+        loads = ujson.loads  # pylint: disable=invalid-name, c-extension-no-member
+    except ImportError:
+        loads = json.loads  # pylint: disable=invalid-name
+
+ACCEPT_ENCODINGS = ['gzip', 'deflate']
+try:
+    # aiohttp decodes brotli content when the brotli package is installed
+    import brotli  # pylint: disable=unused-import
+
+    ACCEPT_ENCODINGS.append('br')
+except ImportError:
+    pass
+
+ACCEPT_ENCODING = ', '.join(ACCEPT_ENCODINGS)
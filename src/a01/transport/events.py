@@ -0,0 +1,116 @@
+"""Server-sent events subscription to the task store. The stream reconnects after a failure and resumes from the last
+event it received through the Last-Event-ID header."""
+import asyncio
+from logging import getLogger
+from typing import AsyncIterator, Optional
+
+from aiohttp import ClientError
+
+UNSUPPORTED_STATUS = (400, 404, 405, 406, 501)
+
+
+class EventStreamUnsupported(Exception):
+    """The task store doesn't offer the event stream, or the stream can't be used in this session."""
+
+
+class Event(object):  # pylint: disable=too-few-public-methods
+    def __init__(self, event_id: Optional[str], name: str, data: str) -> None:
+        self.id = event_id  # pylint: disable=invalid-name
+        self.name = name
+        self.data = data
+
+    def __repr__(self) -> str:
+        return f'Event({self.id!r}, {self.name!r}, {self.data!r})'
+
+
+class EventParser(object):  # pylint: disable=too-few-public-methods
+    """Incremental parser of the text/event-stream format. Feed it one line at a time."""
+
+    def __init__(self, last_event_id: str = None) -> None:
+        self.last_event_id = last_event_id
+        self.retry = None  # milliseconds, as requested by the server
+        self._name = None
+        self._data = []
+
+    def feed(self, line: str) -> Optional[Event]:
+        """Returns the event completed by the line, if any."""
+        line = line.rstrip('\r\n')
+        if not line:
+            return self._dispatch()
+        if line.startswith(':'):
+            return None  # comment, used by the servers as heartbeats
+
+        field, _, value = line.partition(':')
+        if value.startswith(' '):
+            value = value[1:]
+
+        if field == 'data':
+            self._data.append(value)
+        elif field == 'event':
+            self._name = value
+        elif field == 'id' and '\0' not in value:
+            self.last_event_id = value
+        elif field == 'retry' and value.isdigit():
+            self.retry = int(value)
+        return None
+
+    def _dispatch(self) -> Optional[Event]:
+        data, name = self._data, self._name
+        self._data, self._name = [], None
+        if not data:
+            return None
+        return Event(self.last_event_id, name or 'message', '\n'.join(data))
+
+
+async def subscribe_async(session, path: str, last_event_id: str = None, idle_timeout: float = 90,
+                          retries: int = 5) -> AsyncIterator[Event]:
+    """Yields the events from the stream at the path. The stream is reopened after it drops, resuming from the last
+    event, and None is yielded after each reconnect so the caller can resynchronize its state in case the server
+    can't replay the missed events.
+
+    Raises EventStreamUnsupported if a connection shows the stream is not available, or the last error after the
+    given number of consecutive failures."""
+    if session.cassette:
+        raise EventStreamUnsupported('Event streams are not recorded or replayed.')
+
+    logger = getLogger(__name__)
+    parser = EventParser(last_event_id)
+    failures = 0
+    connected_before = False
+
+    while True:
+        headers = session.get_headers()
+        headers['Accept'] = 'text/event-stream'
+        headers['Cache-Control'] = 'no-cache'
+        if parser.last_event_id:
+            headers['Last-Event-ID'] = parser.last_event_id
+
+        try:
+            async with session.get(session.get_path(path), headers=headers) as resp:
+                # checked on every connection, since a reconnect may reach a server without the stream
+                content_type = resp.headers.get('Content-Type', '')
+                if resp.status in UNSUPPORTED_STATUS or (resp.status == 200 and
+                                                         not content_type.startswith('text/event-stream')):
+                    raise EventStreamUnsupported(f'{path} responds {resp.status} {content_type}')
+                resp.raise_for_status()
+
+                if connected_before:
+                    yield None
+                connected_before = True
+                failures = 0
+
+                while True:
+                    line = await asyncio.wait_for(resp.content.readline(), idle_timeout)
+                    if not line:
+                        break  # the server closed the stream
+                    event = parser.feed(line.decode('utf-8'))
+                    if event:
+                        yield event
+        except (ClientError, asyncio.TimeoutError) as ex:
+            failures += 1
+            if failures > retries:
+                raise
+            logger.debug(f'Event stream {path} dropped: {ex!r}. Reconnect attempt {failures}.')
+
+        delay = parser.retry / 1000 if parser.retry is not None else min(2 ** failures, 30)
+        await asyncio.sleep(delay)
@@ -0,0 +1,70 @@
+import asyncio
+
+from a01.models import Task
+
+
+def make_task(identifier: str, result: str = 'Passed', duration: int = None, agent: str = None,
+              status: str = 'completed') -> Task:
+    task = Task(name=identifier.rsplit('.', 1)[-1], annotation=None,
+                settings={'classifier': {'identifier': identifier}})
+    task.id = identifier
+    task.status = status
+    task.result = result
+    task.duration = duration
+    task.result_details = {'agent': agent}
+    return task
+
+
+def task_data(task_id: int, status: str = 'initialized', result: str = None) -> dict:
+    return {'id': task_id, 'run_id': 1, 'name': f'test_{task_id}', 'annotation': None, 'status': status,
+            'result': result, 'duration': None, 'result_details': {},
+            'settings': {'classifier': {'identifier': f't.test_{task_id}'}}}
+
+
+class StalledStream(object):  # pylint: disable=too-few-public-methods
+    """An event stream which never sends an event."""
+    status = 200
+    headers = {'Content-Type': 'text/event-stream'}
+
+    def __init__(self):
+        self.content = self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        pass
+
+    def raise_for_status(self):
+        pass
+
+    async def readline(self):
+        await asyncio.Future()
+
+
+class FakeSession(object):
+    """Serves the tasks and a sequence of run statuses, the last one repeated. The event stream never sends an event."""
+
+    def __init__(self, tasks, run_statuses, events=False):
+        self.tasks = tasks
+        self.run_statuses = list(run_statuses)
+        self.cassette = None if events else 'replay'
+
+    async def get_json_if_changed(self, _, etag):
+        return None, self.tasks
+
+    async def get_json(self, _):
+        status = self.run_statuses.pop(0) if len(self.run_statuses) > 1 else self.run_statuses[0]
+        if isinstance(status, Exception):
+            raise status
+        return {'id': 1, 'name': 'run', 'settings': {}, 'details': {}, 'creation': '2018-04-01T10:00:00Z',
+                'status': status}
+
+    def get_headers(self):
+        return {}
+
+    def get_path(self, path):
+        return path
+
+    def get(self, *_, **__):
+        return StalledStream()
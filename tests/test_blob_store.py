@@ -0,0 +1,118 @@
+import os
+import base64
+import asyncio
+import hashlib
+import tempfile
+import unittest
+
+from a01.operations.blob_store import BlobStore
+
+
+class FakeResponse(object):
+    def __init__(self, status, headers=None, body=b''):
+        self.status = status
+        self.headers = headers or {}
+        self.body = body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        pass
+
+    async def read(self):
+        return self.body
+
+
+class FakeSession(object):
+    def __init__(self, blobs):
+        self.blobs = blobs
+        self.requests = []
+
+    def _respond(self, method, uri, with_body):
+        self.requests.append((method, uri))
+        if uri not in self.blobs:
+            return FakeResponse(404)
+        etag, body = self.blobs[uri]
+        md5 = base64.b64encode(hashlib.md5(body).digest()).decode('ascii')
+        return FakeResponse(200, {'ETag': etag, 'Content-MD5': md5}, body if with_body else b'')
+
+    def head(self, uri):
+        return self._respond('HEAD', uri, False)
+
+    def get(self, uri):
+        return self._respond('GET', uri, True)
+
+
+class TestBlobStore(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = self.directory.name
+        self.store = BlobStore(os.path.join(self.root, 'store'))
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+        self.loop.close()
+
+    def fetch(self, uri, session):
+        return self.loop.run_until_complete(self.store.fetch_async(uri, session))
+
+    def test_put(self):
+        digest = self.store.put(b'content')
+        self.assertEqual(digest, hashlib.sha256(b'content').hexdigest())
+        self.assertTrue(self.store.has(digest))
+        self.assertEqual(self.store.put(b'content'), digest)
+        with open(self.store.get_path(digest), 'rb') as blob:
+            self.assertEqual(blob.read(), b'content')
+
+    def test_materialize_writable_copy(self):
+        digest = self.store.put(b'content')
+        path = os.path.join(self.root, 'out', 'recording.yaml')
+        self.store.materialize(digest, path)
+        with open(path, 'ab') as materialized:
+            materialized.write(b' edited')
+
+        with open(self.store.get_path(digest), 'rb') as blob:
+            self.assertEqual(blob.read(), b'content')
+        self.store.materialize(digest, path)
+        with open(path, 'rb') as materialized:
+            self.assertEqual(materialized.read(), b'content')
+
+    @unittest.skipUnless(hasattr(os, 'link'), 'hardlinks are not supported')
+    def test_materialize_link(self):
+        store = BlobStore(os.path.join(self.root, 'store'), link=True)
+        digest = store.put(b'content')
+        path = os.path.join(self.root, 'linked.yaml')
+        store.materialize(digest, path)
+        self.assertTrue(os.path.samefile(path, store.get_path(digest)))
+        store.close()
+
+    def test_fetch_downloads_once(self):
+        session = FakeSession({'https://blob/run1/a.yaml': ('"1"', b'recording'),
+                               'https://blob/run2/a.yaml': ('"2"', b'recording')})
+
+        digest = self.fetch('https://blob/run1/a.yaml', session)
+        self.assertEqual(digest, hashlib.sha256(b'recording').hexdigest())
+        self.assertEqual(self.fetch('https://blob/run1/a.yaml', session), digest)
+        self.assertEqual(self.fetch('https://blob/run2/a.yaml', session), digest)
+        self.assertEqual([method for method, _ in session.requests], ['HEAD', 'GET', 'HEAD', 'HEAD'])
+
+    def test_fetch_changed_etag(self):
+        session = FakeSession({'https://blob/a.yaml': ('"1"', b'old')})
+        old = self.fetch('https://blob/a.yaml', session)
+        session.blobs['https://blob/a.yaml'] = ('"2"', b'new')
+        new = self.fetch('https://blob/a.yaml', session)
+        self.assertNotEqual(old, new)
+        self.assertEqual(new, hashlib.sha256(b'new').hexdigest())
+
+    def test_fetch_missing(self):
+        session = FakeSession({})
+        self.assertIsNone(self.fetch('https://blob/missing.yaml', session))
+        self.assertIsNone(self.fetch(None, session))
+        self.assertEqual(session.requests, [('HEAD', 'https://blob/missing.yaml')])
+
+
+if __name__ == '__main__':
+    unittest.main()
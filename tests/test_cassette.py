@@ -0,0 +1,68 @@
+import os
+import shutil
+import asyncio
+import tempfile
+import unittest
+from unittest import mock
+
+from a01.transport import cassette
+from a01.transport.cassette import Cassette, Interaction, ReplayResponse, scrub_url
+
+
+class TestCassette(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, 'cassette.jsonl.gz')
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_replay_keeps_repeated_headers(self):
+        recorder = Cassette(self.path, replay=False)
+        recorder.set_endpoint('https://a01.example.com')
+        recorder.record(Interaction('get', 'https://a01.example.com/run/1', 200,
+                                    [('Set-Cookie', 'a=1'), ('Set-Cookie', 'b=2')], b'{"id": 1}', 0.5))
+        recorder.close()
+
+        player = Cassette(self.path, replay=True, speed=0)
+        self.assertEqual(player.endpoint, 'https://a01.example.com')
+        resp = ReplayResponse(player.find('GET', 'https://a01.example.com/run/1'))
+        self.assertEqual(resp.headers.getall('Set-Cookie'), ['a=1', 'b=2'])
+        loop = asyncio.new_event_loop()
+        try:
+            self.assertEqual(loop.run_until_complete(resp.json()), {'id': 1})
+        finally:
+            loop.close()
+
+    def test_headers_recorded_as_mapping(self):
+        interaction = Interaction.from_dict({'method': 'GET', 'url': 'https://a01.example.com', 'status': 200,
+                                             'headers': {'ETag': '"1"'}, 'text': '', 'elapsed': 0})
+        self.assertEqual(interaction.headers, [('ETag', '"1"')])
+
+    def test_scrub_url(self):
+        self.assertEqual(scrub_url('https://blob.example.com/log.txt?sv=2017&sig=abc%2F&x=1'),
+                         'https://blob.example.com/log.txt?sv=REDACTED&sig=REDACTED&x=1')
+
+
+class TestGetCassette(unittest.TestCase):
+    def get_cassette(self, **environ):
+        with mock.patch.dict(os.environ, environ, clear=True), \
+                mock.patch.object(cassette, '_CASSETTE', None), mock.patch.object(cassette, '_CASSETTE_LOADED', False):
+            return cassette.get_cassette()
+
+    def test_not_configured(self):
+        self.assertIsNone(self.get_cassette())
+
+    def test_missing_replay_file(self):
+        with self.assertLogs(cassette.__name__, 'WARNING'):
+            self.assertIsNone(self.get_cassette(A01_REPLAY='/nonexistent/cassette.jsonl.gz'))
+
+    def test_invalid_speed(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, 'cassette.jsonl.gz')
+            recorder = Cassette(path, replay=False)
+            recorder.set_endpoint('https://a01.example.com')
+            recorder.close()
+            with self.assertLogs(cassette.__name__, 'WARNING'):
+                player = self.get_cassette(A01_REPLAY=path, A01_REPLAY_SPEED='fast')
+            self.assertEqual((player.endpoint, player.speed), ('https://a01.example.com', 1.0))
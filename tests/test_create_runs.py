@@ -0,0 +1,52 @@
+import asyncio
+import unittest
+
+from aiohttp import ClientConnectorError, ClientResponseError
+
+from a01.operations.create_runs import expand_matrix, post_runs_async, _is_retriable
+
+
+class TestExpandMatrix(unittest.TestCase):
+    def test_scalars(self):
+        self.assertEqual(expand_matrix({'image': 'a:1', 'live': True}), [{'image': 'a:1', 'live': True}])
+
+    def test_cartesian_product(self):
+        runs = expand_matrix({'image': ['a:1', 'b:1'], 'mode': ['x', 'y'], 'live': False})
+        self.assertEqual(runs, [{'image': 'a:1', 'mode': 'x', 'live': False},
+                                {'image': 'a:1', 'mode': 'y', 'live': False},
+                                {'image': 'b:1', 'mode': 'x', 'live': False},
+                                {'image': 'b:1', 'mode': 'y', 'live': False}])
+
+    def test_list_of_mappings(self):
+        runs = expand_matrix([{'image': 'a:1'}, {'image': ['b:1', 'c:1'], 'query': 'test_x'}])
+        self.assertEqual(runs, [{'image': 'a:1'}, {'image': 'b:1', 'query': 'test_x'},
+                                {'image': 'c:1', 'query': 'test_x'}])
+
+    def test_empty_list_value_expands_to_nothing(self):
+        self.assertEqual(expand_matrix({'image': 'a:1', 'mode': []}), [])
+
+    def test_invalid(self):
+        for matrix in ('a:1', None, [{'image': 'a:1'}, 'b:1']):
+            with self.subTest(matrix=matrix), self.assertRaises(ValueError):
+                expand_matrix(matrix)
+
+
+class TestPostRuns(unittest.TestCase):
+    def test_retriable_errors(self):
+        self.assertTrue(_is_retriable(ClientConnectorError(None, OSError(111, 'Connection refused'))))
+        for status, retriable in ((429, True), (503, True), (500, False), (502, False), (400, False)):
+            with self.subTest(status=status):
+                self.assertEqual(_is_retriable(ClientResponseError(None, (), status=status)), retriable)
+        self.assertFalse(_is_retriable(asyncio.TimeoutError()))
+
+    def test_negative_retries(self):
+        loop = asyncio.new_event_loop()
+        try:
+            with self.assertRaises(ValueError):
+                loop.run_until_complete(post_runs_async([], retries=-1))
+        finally:
+            loop.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
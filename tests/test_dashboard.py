@@ -0,0 +1,40 @@
+import sys
+import asyncio
+import unittest
+from unittest import mock
+
+from a01.auth import AuthenticationError
+from a01.commands.dashboard import RunPanel
+from tests.helpers import FakeSession, task_data
+
+# the command function of the package shadows its module
+DASHBOARD_MODULE = sys.modules[RunPanel.__module__]
+
+
+class TestRunPanel(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.panel = RunPanel('1', max_failures=5)
+
+    def tearDown(self):
+        asyncio.set_event_loop(None)
+        self.loop.close()
+
+    def follow(self, session):
+        self.loop.run_until_complete(asyncio.wait_for(self.panel.follow(session, 0), 5))
+
+    def test_canceled_run_with_unfinished_tasks(self):
+        self.follow(FakeSession([task_data(1, 'completed', 'Passed'), task_data(2)], ['Canceled']))
+        self.assertTrue(self.panel.progress.is_finished)
+        self.assertEqual(self.panel.progress.completed, 1)
+
+    def test_failed_run_while_subscribed(self):
+        with mock.patch.object(DASHBOARD_MODULE, 'MAX_POLL_INTERVAL', 0.01):
+            self.follow(FakeSession([task_data(1)], ['Running', 'Running', 'Failed'], events=True))
+        self.assertEqual(self.panel.run.status, 'Failed')
+        self.assertTrue(self.panel.progress.is_finished)
+
+    def test_authentication_error_is_raised(self):
+        with self.assertRaises(AuthenticationError):
+            self.follow(FakeSession([task_data(1)], [AuthenticationError('Please login again.')]))
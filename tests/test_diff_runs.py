@@ -0,0 +1,42 @@
+import unittest
+
+from a01.operations.diff_runs import RunDiff
+from tests.helpers import make_task
+
+
+class TestRunDiff(unittest.TestCase):
+    def setUp(self):
+        base = [make_task('t.broken', 'Passed', 1000),
+                make_task('t.fixed', 'Failed', 1000),
+                make_task('t.slower', 'Passed', 10000),
+                make_task('t.slightly_slower', 'Passed', 10000),
+                make_task('t.removed', 'Passed', 1000),
+                make_task('t.same', 'Error', 1000)]
+        head = [make_task('t.same', 'Failed', 1000),
+                make_task('t.added', 'Passed', 1000),
+                make_task('t.slightly_slower', 'Passed', 18000),
+                make_task('t.slower', 'Passed', 40000),
+                make_task('t.fixed', 'Passed', 1000),
+                make_task('t.broken', 'Error', 1000)]
+        self.diff = RunDiff(base, head, slower_ratio=1.5, min_delta=10000)
+
+    def test_failures_and_fixes(self):
+        self.assertEqual([head.identifier for _, head in self.diff.new_failures], ['t.broken'])
+        self.assertEqual([head.identifier for _, head in self.diff.fixes], ['t.fixed'])
+
+    def test_regressions_need_both_ratio_and_delta(self):
+        self.assertEqual([(base.duration, head.duration) for base, head in self.diff.regressions], [(10000, 40000)])
+
+    def test_missing(self):
+        self.assertEqual([t.identifier for t in self.diff.missing_in_head], ['t.removed'])
+        self.assertEqual([t.identifier for t in self.diff.missing_in_base], ['t.added'])
+
+    def test_identical_runs(self):
+        tasks = [make_task('t.one', 'Passed', 1000), make_task('t.two', 'Failed', 2000)]
+        diff = RunDiff(tasks, tasks)
+        self.assertFalse(diff.new_failures or diff.fixes or diff.regressions or diff.missing_in_head or
+                         diff.missing_in_base)
+
+
+if __name__ == '__main__':
+    unittest.main()
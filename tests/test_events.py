@@ -0,0 +1,123 @@
+import json
+import socket
+import asyncio
+import unittest
+
+from aiohttp import web
+
+from a01.operations.watch_run import watch_run_async
+from a01.transport import AsyncSession
+from a01.transport.events import EventParser
+from tests.helpers import task_data
+
+
+def feed_all(parser, text):
+    return [event for event in (parser.feed(line) for line in text.splitlines(True)) if event]
+
+
+class TestEventParser(unittest.TestCase):
+    def test_events(self):
+        events = feed_all(EventParser(), 'id: 1\nevent: task\ndata: {"id": 7}\n\ndata: plain\n\n')
+        self.assertEqual([(e.id, e.name, e.data) for e in events],
+                         [('1', 'task', '{"id": 7}'), ('1', 'message', 'plain')])
+
+    def test_multiline_data_and_crlf(self):
+        events = feed_all(EventParser(), 'data: first\r\ndata:second\r\n\r\n')
+        self.assertEqual(events[0].data, 'first\nsecond')
+
+    def test_comments_and_empty_events_are_skipped(self):
+        parser = EventParser()
+        self.assertEqual(feed_all(parser, ': heartbeat\n\n\nid: 5\n\n'), [])
+        self.assertEqual(parser.last_event_id, '5')
+
+    def test_last_event_id_is_kept_across_events(self):
+        parser = EventParser('3')
+        events = feed_all(parser, 'data: a\n\nid: 4\ndata: b\n\n')
+        self.assertEqual([e.id for e in events], ['3', '4'])
+        self.assertEqual(parser.last_event_id, '4')
+
+    def test_id_with_null_is_ignored(self):
+        parser = EventParser('1')
+        feed_all(parser, 'id: 2\0\ndata: x\n\n')
+        self.assertEqual(parser.last_event_id, '1')
+
+    def test_retry(self):
+        parser = EventParser()
+        feed_all(parser, 'retry: 2500\nretry: soon\n')
+        self.assertEqual(parser.retry, 2500)
+
+    def test_event_name_is_reset(self):
+        events = feed_all(EventParser(), 'event: task\ndata: a\n\ndata: b\n\n')
+        self.assertEqual([e.name for e in events], ['task', 'message'])
+
+
+class EventStore(object):
+    """A local task store whose event stream makes one task change per connection, sends it and then drops the
+    connection."""
+
+    def __init__(self, tasks):
+        self.tasks = tasks
+        self.changes = []
+        self.task_polls = 0
+        self.last_event_ids = []
+
+    async def get_run(self, _):
+        return web.json_response({'id': 1, 'name': 'run', 'settings': {}, 'details': {}, 'status': 'Running',
+                                  'creation': '2018-04-01T10:00:00Z'})
+
+    async def get_tasks(self, _):
+        self.task_polls += 1
+        return web.json_response(self.tasks, headers={'ETag': f'"{self.task_polls}"'})
+
+    async def get_events(self, request):
+        self.last_event_ids.append(request.headers.get('Last-Event-ID', None))
+        resp = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+        await resp.prepare(request)
+        await resp.write(b'retry: 10\n\n')
+        if self.changes:
+            event_id, change = self.changes.pop(0)
+            next(task for task in self.tasks if task['id'] == change['id']).update(change)
+            await resp.write(f'id: {event_id}\nevent: task\ndata: {json.dumps(change)}\n\n'.encode('utf-8'))
+        return resp
+
+
+class TestSubscription(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        asyncio.set_event_loop(None)
+        self.loop.close()
+
+    async def _watch(self, store):
+        app = web.Application()
+        app.router.add_get('/run/1', store.get_run)
+        app.router.add_get('/run/1/tasks', store.get_tasks)
+        app.router.add_get('/run/1/events', store.get_events)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        await web.SockSite(runner, sock).start()
+        try:
+            async with AsyncSession(f'http://127.0.0.1:{sock.getsockname()[1]}', anonymous=True) as session:
+                return await asyncio.wait_for(watch_run_async('1', session, min_interval=0), 10)
+        finally:
+            await runner.cleanup()
+
+    def test_changes_are_applied_across_reconnects(self):
+        store = EventStore([task_data(1), task_data(2)])
+        store.changes = [('1', {'id': 1, 'status': 'completed', 'result': 'Passed'}),
+                         ('2', {'id': 2, 'status': 'completed', 'result': 'Failed', 'duration': 3000})]
+        progress = self.loop.run_until_complete(self._watch(store))
+
+        self.assertTrue(progress.is_finished)
+        self.assertEqual((progress.passed, progress.failed), (1, 1))
+        self.assertEqual(store.last_event_ids, [None, '1'])
+        # one poll before the subscription and one to resynchronize after the reconnect
+        self.assertEqual(store.task_polls, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import asyncio
+import unittest
+
+from a01.operations.load_test import LoadGenerator, parse_mix
+from a01.operations.stub_store import StubStore
+from a01.transport import AsyncSession
+
+
+class TestParseMix(unittest.TestCase):
+    def test_mix(self):
+        self.assertEqual(dict(parse_mix('task=6, log=2')), {'task': 6, 'log': 2})
+
+    def test_invalid(self):
+        for value in ('task', 'tasks=x', 'runs=1,other=1', 'log=0'):
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                parse_mix(value)
+
+
+class TestLoadGenerator(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        asyncio.set_event_loop(None)
+        self.loop.close()
+
+    async def _run_step(self):
+        async with StubStore(runs=2, tasks=50, latency=0) as store:
+            async with AsyncSession(endpoint_uri=store.endpoint, anonymous=True) as session:
+                generator = LoadGenerator(session)
+                await generator.discover()
+                self.assertEqual({name: len(targets) for name, targets in generator.targets.items()},
+                                 {'tasks': 2, 'task': 100, 'log': 100})
+                return await generator.run_step(rate=100, duration=0.2)
+
+    def test_step_on_stub_store(self):
+        result = self.loop.run_until_complete(self._run_step())
+        self.assertEqual((result.completed, result.error_count, result.dropped), (20, 0, 0))
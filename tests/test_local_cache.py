@@ -0,0 +1,27 @@
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from a01.operations.local_cache import ImageCache
+
+
+class TestImageCache(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.cache = ImageCache(self.root)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_new_digest_replaces_the_entries(self):
+        self.cache.put('image:latest', 'sha256:1', 'index', ['t.one'])
+        self.cache.put('image:latest', 'sha256:2', 'index', ['t.two'])
+        self.assertIsNone(self.cache.get('sha256:1', 'index'))
+        self.assertEqual(self.cache.get('sha256:2', 'index'), ['t.two'])
+
+    def test_concurrent_puts(self):
+        with ThreadPoolExecutor(8) as executor:
+            list(executor.map(lambda i: self.cache.put(f'image:{i}', f'sha256:{i}', 'index', [i]), range(64)))
+        self.assertEqual(len(self.cache._load_digests()), 64)  # pylint: disable=protected-access
+        self.assertEqual([self.cache.get(f'sha256:{i}', 'index') for i in range(64)], [[i] for i in range(64)])
@@ -0,0 +1,60 @@
+import shutil
+import tempfile
+import unittest
+
+from a01.operations.log_index import LogIndex, tokenize
+from tests.helpers import make_task
+
+
+def make_log_task(identifier: str, run_id: str = '1'):
+    task = make_task(identifier)
+    task.run_id = run_id
+    return task
+
+
+class TestTokenize(unittest.TestCase):
+    def test_lowercase_words(self):
+        self.assertEqual(tokenize('AssertionError: Expected 404, got 500!'),
+                         ['assertionerror', 'expected', '404', 'got', '500'])
+
+    def test_no_words(self):
+        self.assertEqual(tokenize(' -- '), [])
+
+
+class TestLogIndex(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.index = LogIndex(self.root)
+        self.index.add(make_log_task('t.one'), b'starting\nConnection reset by peer\ndone')
+        self.index.add(make_log_task('t.two'), b'peer reset the connection\ndone')
+        self.index.add(make_log_task('t.three', run_id='2'), b'Connection reset by peer')
+        self.index.commit()
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.root)
+
+    def test_terms_match_on_the_same_line(self):
+        self.assertEqual(self.index.query(['connection', 'reset']),
+                         [('t.one', 't.one', 1, 'Connection reset by peer'),
+                          ('t.three', 't.three', 0, 'Connection reset by peer'),
+                          ('t.two', 't.two', 0, 'peer reset the connection')])
+        self.assertEqual(self.index.query(['starting', 'done']), [])
+
+    def test_phrase(self):
+        self.assertEqual([task_id for task_id, _, _, _ in self.index.query(['reset by peer'])], ['t.one', 't.three'])
+        self.assertEqual(self.index.query(['peer by reset']), [])
+
+    def test_run_filter_and_limit(self):
+        self.assertEqual([task_id for task_id, _, _, _ in self.index.query(['reset'], run_id='2')], ['t.three'])
+        self.assertEqual(len(self.index.query(['reset'], limit=1)), 1)
+
+    def test_indexed_tasks_are_skipped(self):
+        self.assertEqual(self.index.get_indexed_task_ids('1'), {'t.one', 't.two'})
+        self.assertEqual(self.index.get_indexed_task_ids('3'), set())
+
+    def test_add_again_replaces_the_postings(self):
+        self.index.add(make_log_task('t.one'), b'all good')
+        self.index.commit()
+        self.assertEqual([task_id for task_id, _, _, _ in self.index.query(['reset by peer'])], ['t.three'])
+        self.assertEqual(self.index.query(['good']), [('t.one', 't.one', 0, 'all good')])
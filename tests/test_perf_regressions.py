@@ -0,0 +1,34 @@
+import unittest
+
+from a01.operations.perf_regressions import find_median_shift
+
+
+class TestFindMedianShift(unittest.TestCase):
+    def test_shift(self):
+        self.assertEqual(find_median_shift([10000, 11000, 10500, 30000, 31000, 29000, 30500]), (3, 10500, 30250.0))
+
+    def test_spike_is_not_a_shift(self):
+        self.assertIsNone(find_median_shift([10000, 11000, 10500, 30000, 11000, 10000, 10500]))
+
+    def test_speedup_is_not_a_shift(self):
+        self.assertIsNone(find_median_shift([30000, 31000, 29000, 10000, 11000, 10500]))
+
+    def test_thresholds(self):
+        values = [1000, 1100, 1050, 3000, 3100, 2900]
+        self.assertIsNone(find_median_shift(values))
+        self.assertEqual(find_median_shift(values, min_delta=1000)[0], 3)
+        self.assertIsNone(find_median_shift(values, ratio=3.5, min_delta=1000))
+
+    def test_noisy_history_needs_a_larger_shift(self):
+        after = [45000, 45000, 45000]
+        self.assertEqual(find_median_shift([20000, 19000, 21000, 20000, 19000, 21000] + after), (6, 20000, 45000))
+        self.assertIsNone(find_median_shift([20000, 5000, 35000, 20000, 5000, 35000] + after))
+
+    def test_min_samples(self):
+        values = [10000, 10000, 30000, 30000]
+        self.assertIsNone(find_median_shift(values))
+        self.assertEqual(find_median_shift(values, min_samples=2), (2, 10000, 30000))
+
+
+if __name__ == '__main__':
+    unittest.main()
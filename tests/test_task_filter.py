@@ -0,0 +1,74 @@
+import unittest
+
+from a01.operations.task_filter import compile_filter, sort_tasks, FilterSyntaxError
+from tests.helpers import make_task
+
+
+class TestCompileFilter(unittest.TestCase):
+    def setUp(self):
+        self.tasks = [make_task('a.A.test_one', 'Passed', 1000, 'pod-1'),
+                      make_task('a.A.test_two', 'Failed', 90000, 'pod-3'),
+                      make_task('b.B.test_three', 'Error', None, 'pod-3'),
+                      make_task('b.B.test_four', None, None, None, status='running')]
+
+    def select(self, expression):
+        predicate = compile_filter(expression)
+        return [task.id for task in self.tasks if predicate(task)]
+
+    def test_comparisons(self):
+        self.assertEqual(self.select("result == 'Failed'"), ['a.A.test_two'])
+        self.assertEqual(self.select('result != "Passed"'), ['a.A.test_two', 'b.B.test_three', 'b.B.test_four'])
+        self.assertEqual(self.select('duration > 60000'), ['a.A.test_two'])
+        self.assertEqual(self.select('duration <= 1000'), ['a.A.test_one'])
+
+    def test_ordered_comparisons_skip_missing_values(self):
+        self.assertEqual(self.select('duration < 100000'), ['a.A.test_one', 'a.A.test_two'])
+
+    def test_regex(self):
+        self.assertEqual(self.select("agent ~ 'pod-3'"), ['a.A.test_two', 'b.B.test_three'])
+        self.assertEqual(self.select("identifier !~ '^a\\.'"), ['b.B.test_three', 'b.B.test_four'])
+
+    def test_null(self):
+        self.assertEqual(self.select('result == null'), ['b.B.test_four'])
+
+    def test_precedence_and_parentheses(self):
+        self.assertEqual(self.select("result == 'Passed' or result == 'Failed' and agent ~ '1'"), ['a.A.test_one'])
+        self.assertEqual(self.select("(result == 'Passed' or result == 'Failed') and agent ~ '3'"), ['a.A.test_two'])
+        self.assertEqual(self.select("not agent ~ 'pod' and status == 'running'"), ['b.B.test_four'])
+
+    def test_syntax_errors(self):
+        for expression in ('', 'result', "result = 'Passed'", "owner == 'me'", "(result == 'Passed'",
+                           "result == 'Passed' )", "result == 'Passed' and", 'duration > $', "agent ~ 'pod-(3'"):
+            with self.subTest(expression=expression), self.assertRaises(FilterSyntaxError):
+                compile_filter(expression)
+
+    def test_syntax_error_is_value_error(self):
+        with self.assertRaises(ValueError):
+            compile_filter('result ==')
+
+
+class TestSortTasks(unittest.TestCase):
+    def setUp(self):
+        self.tasks = [make_task('c', duration=300), make_task('a', duration=None), make_task('b', duration=100),
+                      make_task('d', duration=200)]
+
+    def test_ascending_places_missing_last(self):
+        self.assertEqual([t.id for t in sort_tasks(self.tasks, 'duration')], ['b', 'd', 'c', 'a'])
+        self.assertEqual([t.id for t in sort_tasks(self.tasks, 'duration:asc')], ['b', 'd', 'c', 'a'])
+
+    def test_descending_places_missing_last(self):
+        self.assertEqual([t.id for t in sort_tasks(self.tasks, 'duration:desc')], ['c', 'd', 'b', 'a'])
+
+    def test_limit(self):
+        self.assertEqual([t.id for t in sort_tasks(self.tasks, 'duration:desc', 2)], ['c', 'd'])
+        self.assertEqual([t.id for t in sort_tasks(iter(self.tasks), 'identifier', 3)], ['a', 'b', 'c'])
+
+    def test_invalid_field_or_order(self):
+        with self.assertRaises(ValueError):
+            sort_tasks(self.tasks, 'owner')
+        with self.assertRaises(ValueError):
+            sort_tasks(self.tasks, 'duration:down')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+
+from a01.models import Run
+from a01.operations.task_table import TaskTableWriter, split_identifier
+from tests.helpers import make_task
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+class TestSplitIdentifier(unittest.TestCase):
+    def test_split(self):
+        self.assertEqual(split_identifier('azure.cli.tests.TestVm.test_create'),
+                         ['azure.cli.tests', 'TestVm', 'test_create'])
+        self.assertEqual(split_identifier('test_create'), [None, None, 'test_create'])
+
+
+@unittest.skipUnless(pyarrow, 'The pyarrow package is not installed.')
+class TestTaskTableWriter(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.run = Run(name='run', settings={'a01.reserved.imagename': 'image:1'}, details={}, owner='me',
+                       status='Completed')
+        self.run.id = 1
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def export(self, fmt):
+        path = os.path.join(self.directory.name, f'tasks.{fmt}')
+        with TaskTableWriter(path, fmt, batch_size=2) as writer:
+            for index in range(5):
+                writer.add(self.run, make_task(f'a.Test.test_{index}', duration=index))
+        self.assertEqual(writer.rows, 5)
+        return path
+
+    def test_parquet(self):
+        table = pyarrow.parquet.read_table(self.export('parquet'))
+        self.assertEqual(table.column('duration').to_pylist(), [0, 1, 2, 3, 4])
+        self.assertEqual(set(table.column('run_image').to_pylist()), {'image:1'})
+
+    def test_arrow_stream(self):
+        table = pyarrow.ipc.open_stream(self.export('arrow')).read_all()
+        self.assertEqual(table.column('method').to_pylist(), [f'test_{index}' for index in range(5)])
+
+    def test_unsupported_format(self):
+        with self.assertRaises(ValueError):
+            TaskTableWriter(os.path.join(self.directory.name, 'tasks.csv'), 'csv')
@@ -0,0 +1,20 @@
+import unittest
+
+from a01.output.task_tree_output import TaskTreeOutput
+from tests.helpers import make_task
+
+
+class TestTaskTreeOutput(unittest.TestCase):
+    def test_group_by_module(self):
+        tasks = [make_task('azure.cli.network.tests.TestNic.test_create', 'Passed', 1000),
+                 make_task('azure.cli.network.tests.TestNic.test_delete', 'Failed', 2000),
+                 make_task('azure.cli.vm.tests.TestVm.test_create', 'Error', 3000)]
+        rows = list(TaskTreeOutput(tasks, 'module').get_table_view())
+        self.assertEqual(rows, [('azure.cli', 3, 1, 1, 1, 6000),
+                                ('  network.tests', 2, 1, 1, 0, 3000),
+                                ('  vm.tests', 1, 0, 0, 1, 3000)])
+
+    def test_node_with_own_tasks_is_not_collapsed(self):
+        tasks = [make_task('a.b', 'Passed', 1000), make_task('a.b.c.d', 'Failed', 2000)]
+        rows = list(TaskTreeOutput(tasks, 'depth=3').get_table_view())
+        self.assertEqual(rows, [('a.b', 2, 1, 1, 0, 3000), ('  c', 1, 0, 1, 0, 2000)])
@@ -0,0 +1,45 @@
+import asyncio
+import unittest
+
+from a01.operations.watch_run import watch_run_async, backoff_interval
+from tests.helpers import FakeSession, task_data
+
+
+class TestWatchRun(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        asyncio.set_event_loop(None)
+        self.loop.close()
+
+    def watch(self, session):
+        return self.loop.run_until_complete(asyncio.wait_for(
+            watch_run_async('1', session, min_interval=0, max_interval=0.01), 5))
+
+    def test_completed_tasks(self):
+        session = FakeSession([task_data(1, 'completed', 'Passed'), task_data(2, 'completed', 'Failed')], ['Running'])
+        progress = self.watch(session)
+        self.assertTrue(progress.is_finished)
+        self.assertEqual((progress.passed, progress.failed), (1, 1))
+
+    def test_canceled_run_with_unfinished_tasks(self):
+        session = FakeSession([task_data(1, 'completed', 'Passed'), task_data(2)], ['Running', 'Running', 'Canceled'])
+        progress = self.watch(session)
+        self.assertTrue(progress.is_finished)
+        self.assertFalse(progress.succeeded)
+        self.assertEqual(progress.run_status, 'Canceled')
+
+    def test_canceled_run_while_subscribed(self):
+        session = FakeSession([task_data(1)], ['Running', 'Running', 'Failed'], events=True)
+        progress = self.watch(session)
+        self.assertEqual(progress.run_status, 'Failed')
+        self.assertEqual(progress.completed, 0)
+
+
+class TestBackoffInterval(unittest.TestCase):
+    def test_backoff(self):
+        self.assertEqual(backoff_interval(5, False), 7.5)
+        self.assertEqual(backoff_interval(50, False), 60)
+        self.assertEqual(backoff_interval(60, True), 5)